@@ -9,12 +9,14 @@ This package contains the agent system components:
 - WorkflowAgent: Bioinformatics workflow specialist agent
 - AgentFactory: Factory for creating and managing agents
 - PromptTemplates: Specialized prompts for each agent type
+- ConversationMemory: Token-bounded per-session conversation history
 """
 
 from .agent_config import AgentType, AgentConfig, AgentConfigManager
 from .agents import BaseAgent, QAAgent, CodeAssistantAgent, WorkflowAgent
 from .agent_factory import AgentFactory, AgentManager
 from .prompt_templates import PromptTemplates
+from .conversation_memory import ConversationMemory
 
 __all__ = [
     "AgentType",
@@ -26,5 +28,6 @@ __all__ = [
     "WorkflowAgent",
     "AgentFactory",
     "AgentManager",
-    "PromptTemplates"
+    "PromptTemplates",
+    "ConversationMemory"
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List
 
 from rag_chatbot.config import settings
@@ -24,6 +24,9 @@ class AgentConfig:
     language_priorities: List[str]
     enable_code_execution: bool = False
     enable_state_management: bool = False
+    provider: str = "google"
+    example_queries: List[str] = field(default_factory=list)  # used to build /auto routing centroids
+    search_shards: List[str] = field(default_factory=list)  # SEARCH_SHARDS to search in the source_type layout; empty searches all
     
 class AgentConfigManager:
     """Manages configurations for different agent types"""
@@ -46,7 +49,21 @@ class AgentConfigManager:
                 file_category_weights={"documentation": 0.7, "code": 0.3},
                 language_priorities=["markdown", "text"],
                 enable_code_execution=False,
-                enable_state_management=False
+                enable_state_management=False,
+                provider=getattr(settings, 'llm_provider', "google"),
+                search_shards=["docs", "repo_docs"],
+                example_queries=[
+                    "What is Shesmu?",
+                    "What does Vidarr do?",
+                    "How do I submit a request to the GSI team?",
+                    "What deliverables are included in whole genome analysis?",
+                    "What is the difference between Dashi and Shesmu?",
+                    "Explain the glossary term olive",
+                    "Where is the documentation for data review and reporting?",
+                    "What assays does the informatics group support?",
+                    "Who maintains the infrastructure?",
+                    "What does the WGTS deliverable contain?"
+                ]
             ),
             
             AgentType.CODE_ASSISTANT: AgentConfig(
@@ -61,7 +78,20 @@ class AgentConfigManager:
                 file_category_weights={"code": 0.8, "documentation": 0.2},
                 language_priorities=["python", "java", "wdl", "bash", "yaml"],
                 enable_code_execution=getattr(settings, 'enable_code_execution', False),
-                enable_state_management=getattr(settings, 'enable_state_management', True)
+                enable_state_management=getattr(settings, 'enable_state_management', True),
+                provider=getattr(settings, 'llm_provider', "google"),
+                example_queries=[
+                    "Why does this Java method throw a NullPointerException?",
+                    "How is the REST endpoint implemented in miso-lims?",
+                    "Show me the Python function that parses the config file",
+                    "Fix the error in this class constructor",
+                    "Explain what this code does",
+                    "How can I make this query faster?",
+                    "Which dependency version does the project use in pom.xml?",
+                    "Review this function for bugs",
+                    "Where is the database connection created in the source?",
+                    "How do I implement a new plugin in djerba?"
+                ]
             ),
             
             AgentType.WORKFLOW_AGENT: AgentConfig(
@@ -76,7 +106,20 @@ class AgentConfigManager:
                 file_category_weights={"code": 0.6, "documentation": 0.4},
                 language_priorities=["wdl", "yaml", "bash", "python"],
                 enable_code_execution=False,
-                enable_state_management=getattr(settings, 'enable_state_management', True)
+                enable_state_management=getattr(settings, 'enable_state_management', True),
+                provider=getattr(settings, 'llm_provider', "google"),
+                example_queries=[
+                    "What does the bwaMem WDL task do?",
+                    "How much memory does the STAR alignment workflow request?",
+                    "Which docker image does the GATK task use?",
+                    "What are the inputs of the bamMergePreprocessing workflow?",
+                    "How do I run the rsem pipeline on RNA-seq data?",
+                    "What outputs does the sequenza workflow produce?",
+                    "How are samtools and picard used in the markduplicates step?",
+                    "Explain the runtime block of the delly task",
+                    "How does the umiConsensus pipeline process reads?",
+                    "What modules does the mutect2 workflow load?"
+                ]
             )
         }
     
@@ -2,14 +2,19 @@ from typing import Dict, Optional
 
 from rag_chatbot.agent.agent_config import AgentConfigManager, AgentType, AgentConfig
 from rag_chatbot.agent.agents import BaseAgent, QAAgent, CodeAssistantAgent, WorkflowAgent
+from rag_chatbot.agent.conversation_memory import ConversationMemory
+from rag_chatbot.agent.agent_router import AgentRouter
 from rag_chatbot.services.vector_service import VectorService
+from rag_chatbot.services.llm_service import llm_gateway
+from rag_chatbot.utils.profiling import request_profiler
 from rag_chatbot.config import settings
 
 class AgentFactory:
     """Factory class for creating and managing different agent types"""
     
-    def __init__(self, vector_service: VectorService):
+    def __init__(self, vector_service: VectorService, memory: Optional[ConversationMemory] = None):
         self.vector_service = vector_service
+        self.memory = memory
         self.config_manager = AgentConfigManager()
         self._agents: Dict[AgentType, BaseAgent] = {}
         
@@ -21,11 +26,11 @@ class AgentFactory:
         
         # Create agent based on type
         if agent_type == AgentType.QA_AGENT:
-            return QAAgent(config, self.vector_service)
+            return QAAgent(config, self.vector_service, self.memory)
         elif agent_type == AgentType.CODE_ASSISTANT:
-            return CodeAssistantAgent(config, self.vector_service)
+            return CodeAssistantAgent(config, self.vector_service, self.memory)
         elif agent_type == AgentType.WORKFLOW_AGENT:
-            return WorkflowAgent(config, self.vector_service)
+            return WorkflowAgent(config, self.vector_service, self.memory)
         else:
             raise ValueError(f"Unknown agent type: {agent_type}")
     
@@ -59,12 +64,32 @@ class AgentFactory:
         }
 
 class AgentManager:
-    """High-level manager for agent operations in the chat interface"""
+    """High-level manager for agent operations in the chat interface (one per chat session)"""
     
-    def __init__(self, vector_service: VectorService):
-        self.factory = AgentFactory(vector_service)
+    def __init__(self, vector_service: VectorService, router: Optional[AgentRouter] = None,
+                 user_id: Optional[str] = None):
+        # History is shared by all agents in the session so it survives /switch
+        self.memory = ConversationMemory()
+        self.factory = AgentFactory(vector_service, self.memory)
         self.current_agent = self.factory.get_default_agent()
         self.agent_switching_enabled = True
+        
+        # /auto mode picks an agent per message; the router is shared across sessions
+        self.router = router
+        self.auto_routing = False
+        
+        # /profile writes stack samples of every session's requests to disk, so only listed users may arm it
+        allowed = {name.strip() for name in settings.profile_command_users.split(',') if name.strip()}
+        self.can_profile = user_id is not None and user_id in allowed
+    
+    def select_agent(self, message_content: str) -> BaseAgent:
+        """Route the message to an agent when /auto is on, otherwise keep the current one"""
+        if self.auto_routing:
+            if self.router is None:
+                self.router = AgentRouter(self.factory.vector_service, self.factory.config_manager)
+            agent_type, _ = self.router.route(message_content)
+            self.current_agent = self.factory.get_agent(agent_type)
+        return self.current_agent
     
     async def handle_agent_commands(self, message_content: str) -> Optional[str]:
         """Handle special commands for agent management"""
@@ -83,11 +108,23 @@ class AgentManager:
             response += "Use `/switch <agent_type>` to change agents."
             return response
         
+        # Automatic per-message routing
+        if content in ['/auto', '/auto on', '!auto']:
+            self.auto_routing = True
+            return ("🧭 **Automatic routing on**\n"
+                   "Each message will go to the agent that best matches it. "
+                   "Use `/auto off` or `/switch <agent_type>` to pick an agent yourself.")
+        if content in ['/auto off', '!auto off']:
+            self.auto_routing = False
+            info = self.factory.get_current_agent_info(self.current_agent)
+            return f"🧭 Automatic routing off. Staying with **{info['name']}**."
+        
         # Switch agent
         if content.startswith('/switch ') or content.startswith('!switch '):
             agent_type_str = content.split(' ', 1)[1].strip()
             try:
                 agent_type = AgentType(agent_type_str)
+                self.auto_routing = False
                 old_agent_info = self.factory.get_current_agent_info(self.current_agent)
                 self.current_agent = self.factory.switch_agent(agent_type)
                 new_agent_info = self.factory.get_current_agent_info(self.current_agent)
@@ -110,13 +147,73 @@ class AgentManager:
                    f"**Temperature:** {info['temperature']}\n\n"
                    f"_{info['description']}_")
         
+        # LLM gateway load
+        if content in ['/llm-stats', '!llm-stats']:
+            stats = llm_gateway.stats()
+            if not stats:
+                return "📈 No LLM calls yet."
+            response = "📈 **LLM Gateway:**\n\n"
+            for model, model_stats in stats.items():
+                response += (f"**{model}** - running: {model_stats['in_flight']}, "
+                             f"queued: {model_stats['queue_depth']} (max {model_stats['max_queue_depth']}), "
+                             f"calls: {model_stats['calls']}, coalesced: {model_stats['coalesced']}, "
+                             f"rejected: {model_stats['rejected']}, "
+                             f"avg wait: {model_stats['avg_wait_ms']:.0f} ms, "
+                             f"max wait: {model_stats['max_wait_ms']:.0f} ms\n")
+            return response
+        
+        # Knowledge base contents
+        if content in ['/stats', '!stats']:
+            stats = self.factory.vector_service.get_collection_stats()
+            response = (f"📊 **Knowledge Base:** {stats['total_chunks']} chunks "
+                        f"({stats['backend']} backend, collection `{stats['collection_name']}` "
+                        f"served by `{stats['serving_collection']}`, embeddings `{stats['embedding_model']}`)\n")
+            for key, title in [('source_types', 'By source type'), ('repos', 'By repository'),
+                               ('languages', 'By language'), ('file_categories', 'By file category')]:
+                if stats.get(key):
+                    counts = sorted(stats[key].items(), key=lambda item: item[1], reverse=True)
+                    response += f"\n**{title}:**\n" + "".join(f"- {name}: {count}\n" for name, count in counts)
+            glossary = stats.get('glossary')
+            if glossary and glossary['terms']:
+                response += (f"\n**Glossary:** {glossary['terms']} terms, "
+                             f"{glossary['hits']} of {glossary['lookups']} questions answered from it "
+                             f"({glossary['hit_rate']:.0%}), avg lookup {glossary['avg_lookup_us']:.0f} µs\n")
+            return response
+        
+        # Sample the next requests with the stack profiler
+        if content.startswith('/profile') or content.startswith('!profile'):
+            if not self.can_profile:
+                return "❌ `/profile` is not enabled for this user (see PROFILE_COMMAND_USERS)."
+            argument = content.split(' ', 1)[1].strip() if ' ' in content else '1'
+            if argument == 'off':
+                request_profiler.disarm()
+                return "🔬 Profiling off."
+            if argument == 'status':
+                return (f"🔬 {request_profiler.remaining} requests left to profile, "
+                        f"{len(request_profiler.written)} profiles written to `{request_profiler.output_dir}`.")
+            if not argument.isdigit():
+                return "❌ Usage: `/profile [N|off|status]`"
+            armed = request_profiler.arm(int(argument))
+            return (f"🔬 Profiling the next {armed} requests. Collapsed stacks go to "
+                    f"`{request_profiler.output_dir}` (open them with speedscope or flamegraph.pl).")
+        
+        # Forget the conversation so far
+        if content in ['/clear', '!clear']:
+            self.memory.clear()
+            return "🧹 Conversation history cleared."
+        
         # Help command
         if content in ['/help', '!help', '/agent-help']:
             return ("""🔧 **Agent Commands:**
 
 `/agents` - List all available agents
 `/switch <agent_type>` - Switch to a different agent
+`/auto` - Route each message to the best agent automatically (`/auto off` to stop)
 `/current` - Show current agent information
+`/clear` - Forget the conversation history
+`/llm-stats` - Show LLM queue depth and wait times
+`/stats` - Show what the knowledge base contains
+`/profile [N|off|status]` - Profile the next N requests (users in PROFILE_COMMAND_USERS)
 `/help` - Show this help message
 
 **Available Agent Types:**
@@ -133,7 +230,10 @@ class AgentManager:
     
     async def process_message(self, message) -> str:
         """Process a message with the current agent"""
-        return await self.current_agent.process_message(message)
+        if not request_profiler.remaining:
+            return await self.current_agent.process_message(message)
+        return await request_profiler.run(self.current_agent.process_message(message),
+                                          self.current_agent.config.agent_type.value, message.content)
     
     def get_welcome_message(self) -> str:
         """Generate welcome message with current agent info"""
@@ -148,11 +248,12 @@ _{current_info['description']}_
 
 **Available Agents:** {', '.join([agent['type'] for agent in available_agents])}
 
-📊 **Knowledge Base:** {stats.get('total_chunks', 'many')} indexed document chunks
+📊 **Knowledge Base:** {stats.get('total_chunks', 'many')} indexed document chunks from {len(stats.get('repos', {}))} repositories (`/stats` for details)
 
 **Quick Commands:**
 - `/agents` - List all agents
 - `/switch <type>` - Change agent
+- `/auto` - Let the chatbot pick the agent for each message
 - `/help` - Show help
 
 **Agent Capabilities:**
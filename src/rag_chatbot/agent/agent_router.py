@@ -0,0 +1,99 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from rag_chatbot.agent.agent_config import AgentConfigManager, AgentType
+from rag_chatbot.agent.agents import detect_code_intent, detect_workflow_context
+from rag_chatbot.services.vector_service import ServingCollection, VectorService
+
+
+class AgentRouter:
+    """Picks an agent for each message without calling an LLM.
+
+    Each agent's example queries are embedded once into a centroid. A message
+    is scored by cosine similarity between its query embedding (the same one
+    search uses, served from VectorService's cache) and each centroid, plus
+    small boosts from the code-intent and workflow keyword detectors.
+    """
+
+    # Score bonuses from keyword features; small relative to cosine gaps so
+    # they break near-ties rather than override the embedding
+    CODE_FEATURE_BOOST = 0.04
+    WORKFLOW_FEATURE_BOOST = 0.05
+
+    def __init__(self, vector_service: VectorService, config_manager: AgentConfigManager = None):
+        self.vector_service = vector_service
+        self.config_manager = config_manager or AgentConfigManager()
+        self.agent_types: List[AgentType] = []
+        self.centroids = None
+        self.centroid_model = None
+        self.total_routes = 0
+        self.total_route_seconds = 0.0
+
+    def _build_centroids(self, serving: ServingCollection = None):
+        """Embed every agent's example queries and average them into unit centroids"""
+        if serving is None:
+            serving = self.vector_service.current_serving()
+        agent_types = []
+        centroids = []
+        for agent_type, config in self.config_manager.configs.items():
+            if not config.example_queries:
+                continue
+            vectors = np.asarray(serving.embeddings.embed_documents(config.example_queries), dtype=np.float32)
+            centroid = vectors.mean(axis=0)
+            centroids.append(centroid / np.linalg.norm(centroid))
+            agent_types.append(agent_type)
+
+        self.agent_types = agent_types
+        self.centroids = np.vstack(centroids)
+        self.centroid_model = serving.model
+
+    def score(self, query: str, query_embedding: List[float]) -> Dict[AgentType, float]:
+        """Routing score for every agent"""
+        if self.centroids is None:
+            self._build_centroids()
+
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        scores = self.centroids @ query_vector
+
+        code_config = self.config_manager.get_config(AgentType.CODE_ASSISTANT)
+        intent = detect_code_intent(query, code_config.language_priorities if code_config else [])
+        code_signals = sum([intent['is_debugging'], intent['is_implementation'],
+                            intent['is_analysis'], intent['is_optimization']]) + len(intent['languages'])
+
+        workflow = detect_workflow_context(query)
+        workflow_signals = (2 * workflow['has_wdl'] + workflow['has_pipeline'] +
+                            len(workflow['tools_mentioned']))
+
+        routed = {}
+        for agent_type, score in zip(self.agent_types, scores):
+            if agent_type == AgentType.CODE_ASSISTANT:
+                score += self.CODE_FEATURE_BOOST * min(code_signals, 3)
+            elif agent_type == AgentType.WORKFLOW_AGENT:
+                score += self.WORKFLOW_FEATURE_BOOST * min(workflow_signals, 3)
+            routed[agent_type] = float(score)
+        return routed
+
+    def route(self, query: str) -> Tuple[AgentType, Dict[AgentType, float]]:
+        """Best agent for the query and the scores behind the decision"""
+        # One snapshot, so the query vector and the centroids come from the same embedding model;
+        # re-embed the examples first if the collection has moved to another one
+        serving = self.vector_service.current_serving()
+        if self.centroids is None or self.centroid_model != serving.model:
+            self._build_centroids(serving)
+        # The embedding is cached and reused by search, so only scoring counts as routing cost
+        query_embedding = self.vector_service.embed_query(query, serving)
+
+        start = time.perf_counter()
+        scores = self.score(query, query_embedding)
+        best = max(scores, key=scores.get)
+        self.total_route_seconds += time.perf_counter() - start
+        self.total_routes += 1
+        return best, scores
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "routes": self.total_routes,
+            "avg_route_ms": (self.total_route_seconds / self.total_routes * 1000) if self.total_routes else 0.0
+        }
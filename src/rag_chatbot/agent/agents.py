@@ -1,26 +1,67 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 import chainlit as cl
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from rag_chatbot.agent.agent_config import AgentConfig, AgentType
+from rag_chatbot.agent.conversation_memory import ConversationMemory
 from rag_chatbot.agent.prompt_templates import PromptTemplates
-from rag_chatbot.services.vector_service import VectorService
+from rag_chatbot.services.vector_service import VectorService, agent_shards
+from rag_chatbot.services.llm_service import llm_gateway, llm_client_registry
+from rag_chatbot.utils.mmr import mmr_select
 from rag_chatbot.config import settings
 
+def detect_code_intent(query: str, language_priorities: List[str]) -> Dict[str, Any]:
+    """Detect what kind of code assistance is needed"""
+    query_lower = query.lower()
+    
+    intent = {
+        'is_debugging': any(word in query_lower for word in ['debug', 'error', 'fix', 'issue', 'problem']),
+        'is_implementation': any(word in query_lower for word in ['implement', 'create', 'build', 'develop']),
+        'is_analysis': any(word in query_lower for word in ['analyze', 'review', 'explain', 'understand']),
+        'is_optimization': any(word in query_lower for word in ['optimize', 'improve', 'faster', 'performance']),
+        'languages': []
+    }
+    
+    # Detect mentioned languages
+    for lang in language_priorities:
+        if lang.lower() in query_lower:
+            intent['languages'].append(lang)
+    
+    return intent
+
+# Common bioinformatics tools
+WORKFLOW_TOOLS = ['bwa', 'picard', 'gatk', 'samtools', 'bcftools', 'markduplicates']
+
+def detect_workflow_context(query: str) -> Dict[str, Any]:
+    """Detect workflow-related context"""
+    query_lower = query.lower()
+    
+    context = {
+        'has_wdl': 'wdl' in query_lower,
+        'has_pipeline': any(word in query_lower for word in ['pipeline', 'workflow']),
+        'tools_mentioned': [],
+        'workflow_stage': None
+    }
+    
+    for tool in WORKFLOW_TOOLS:
+        if tool in query_lower:
+            context['tools_mentioned'].append(tool)
+    
+    return context
+
 class BaseAgent(ABC):
     """Base class for all agents"""
     
-    def __init__(self, config: AgentConfig, vector_service: VectorService):
+    def __init__(self, config: AgentConfig, vector_service: VectorService,
+                 memory: Optional[ConversationMemory] = None):
         self.config = config
         self.vector_service = vector_service
+        self.memory = memory
         self.conversation_state = {}
         
-        # Initialize LLM with agent-specific settings
-        self.llm = ChatGoogleGenerativeAI(
-            model=config.model_name,
-            google_api_key=settings.google_api_key,
-            temperature=config.temperature
+        # Shared LLM client for this provider/model/temperature
+        self.llm = llm_client_registry.get_client(
+            config.provider, config.model_name, config.temperature
         )
     
     @abstractmethod
@@ -28,8 +69,42 @@ class BaseAgent(ABC):
         """Process user message and return response"""
         pass
     
+    async def invoke_llm(self, prompt: str):
+        """Call the agent's LLM through the shared gateway (coalescing + per-model limits)"""
+        return await llm_gateway.ainvoke(self.llm, prompt, f"{self.config.provider}:{self.config.model_name}")
+    
+    def get_history(self) -> str:
+        """Conversation history block for the prompt"""
+        return self.memory.render() if self.memory else ""
+    
+    def remember(self, user_question: str, answer: str):
+        """Record a finished exchange in the session memory"""
+        if self.memory:
+            self.memory.add_turn(user_question, answer, self.config.agent_type.value)
+    
+    def retrieve(self, query: str, n_results: int = 15) -> List[Dict[str, Any]]:
+        """Glossary definitions and exact symbol-name hits first, then vector search results ranked by the agent's strategy"""
+        exact_results = []
+        if settings.enable_glossary_lookup:
+            exact_results = self.vector_service.lookup_glossary(query, settings.glossary_max_hits)
+        if settings.enable_symbol_lookup:
+            symbol_results = self.vector_service.lookup_symbols(query, settings.symbol_lookup_max_hits)
+            # Leave room for semantic context even when the question names many symbols
+            exact_results += symbol_results[:max(1, self.config.max_search_results // 2)]
+        
+        search_results = self.vector_service.search(query, n_results=n_results,
+                                                     shards=agent_shards(self.config.search_shards,
+                                                                         self.vector_service.namespace_layout),
+                                                     include_embeddings=settings.enable_mmr)
+        exact_ids = {r['id'] for r in exact_results}
+        ranked = self.apply_search_strategy(query, [r for r in search_results if r['id'] not in exact_ids])
+        return (exact_results + ranked)[:self.config.max_search_results]
+    
     def apply_search_strategy(self, query: str, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply agent-specific search strategy to filter and rank results"""
+        if settings.enable_mmr:
+            search_results = self._diversify(search_results)
+        
         if self.config.search_strategy == "balanced":
             return self._balanced_search_strategy(search_results)
         elif self.config.search_strategy == "code_focused":
@@ -39,6 +114,19 @@ class BaseAgent(ABC):
         else:
             return search_results[:self.config.max_search_results]
     
+    def _diversify(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep a diverse max_search_results of the candidates (MMR), dropping near-duplicate chunks"""
+        if len(results) <= self.config.max_search_results or any('embedding' not in r for r in results):
+            for result in results:
+                result.pop('embedding', None)
+            return results
+        
+        picks = mmr_select([r['similarity'] for r in results], [r['embedding'] for r in results],
+                           self.config.max_search_results, settings.mmr_lambda)
+        for result in results:
+            del result['embedding']
+        return [results[i] for i in picks]
+    
     def _balanced_search_strategy(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Balanced search mixing documentation and code"""
         weighted_results = []
@@ -97,6 +185,10 @@ class BaseAgent(ABC):
             
             # Build source description
             source_desc = f"{repo_name}/{source_file}" if repo_name else source_file
+            if result.get('match_type') == 'symbol':
+                source_desc += f" [defines {result['symbol']}]"
+            elif result.get('match_type') == 'glossary':
+                source_desc += f" [glossary: {result['term']}]"
             
             # Format content based on type
             if file_category == 'code' and language:
@@ -117,17 +209,17 @@ class QAAgent(BaseAgent):
         user_question = message.content
         
         # Search for relevant documents
-        search_results = self.vector_service.search(user_question, n_results=15)
-        filtered_results = self.apply_search_strategy(user_question, search_results)
+        filtered_results = self.retrieve(user_question, n_results=15)
         
         # Format context and create prompt
         context = self.format_retrieved_context(filtered_results)
         prompt = PromptTemplates.get_prompt_by_template_name(
-            self.config.prompt_template, user_question, context
+            self.config.prompt_template, user_question, context, history=self.get_history()
         )
         
         # Get LLM response
-        response = await self.llm.ainvoke(prompt)
+        response = await self.invoke_llm(prompt)
+        self.remember(user_question, response.content)
         
         # Format sources
         sources_info = self._format_sources(filtered_results)
@@ -153,8 +245,9 @@ class QAAgent(BaseAgent):
 class CodeAssistantAgent(BaseAgent):
     """Code Assistant Agent for development tasks"""
     
-    def __init__(self, config: AgentConfig, vector_service: VectorService):
-        super().__init__(config, vector_service)
+    def __init__(self, config: AgentConfig, vector_service: VectorService,
+                 memory: Optional[ConversationMemory] = None):
+        super().__init__(config, vector_service, memory)
         # Initialize conversation state for code assistance
         self.conversation_state = {
             'current_task': '',
@@ -172,17 +265,18 @@ class CodeAssistantAgent(BaseAgent):
         self._update_conversation_state(intent, user_question)
         
         # Search with code-focused strategy
-        search_results = self.vector_service.search(user_question, n_results=20)
-        filtered_results = self.apply_search_strategy(user_question, search_results)
+        filtered_results = self.retrieve(user_question, n_results=20)
         
         # Format context and create prompt
         context = self.format_retrieved_context(filtered_results)
         prompt = PromptTemplates.get_prompt_by_template_name(
-            self.config.prompt_template, user_question, context, self.conversation_state
+            self.config.prompt_template, user_question, context, self.conversation_state,
+            history=self.get_history()
         )
         
         # Get LLM response
-        response = await self.llm.ainvoke(prompt)
+        response = await self.invoke_llm(prompt)
+        self.remember(user_question, response.content)
         
         # Format sources with code-specific information
         sources_info = self._format_code_sources(filtered_results)
@@ -191,22 +285,7 @@ class CodeAssistantAgent(BaseAgent):
     
     def _detect_code_intent(self, query: str) -> Dict[str, Any]:
         """Detect what kind of code assistance is needed"""
-        query_lower = query.lower()
-        
-        intent = {
-            'is_debugging': any(word in query_lower for word in ['debug', 'error', 'fix', 'issue', 'problem']),
-            'is_implementation': any(word in query_lower for word in ['implement', 'create', 'build', 'develop']),
-            'is_analysis': any(word in query_lower for word in ['analyze', 'review', 'explain', 'understand']),
-            'is_optimization': any(word in query_lower for word in ['optimize', 'improve', 'faster', 'performance']),
-            'languages': []
-        }
-        
-        # Detect mentioned languages
-        for lang in self.config.language_priorities:
-            if lang.lower() in query_lower:
-                intent['languages'].append(lang)
-        
-        return intent
+        return detect_code_intent(query, self.config.language_priorities)
     
     def _update_conversation_state(self, intent: Dict[str, Any], query: str):
         """Update conversation state based on detected intent"""
@@ -243,8 +322,9 @@ class CodeAssistantAgent(BaseAgent):
 class WorkflowAgent(BaseAgent):
     """Workflow Agent for pipeline and workflow questions"""
     
-    def __init__(self, config: AgentConfig, vector_service: VectorService):
-        super().__init__(config, vector_service)
+    def __init__(self, config: AgentConfig, vector_service: VectorService,
+                 memory: Optional[ConversationMemory] = None):
+        super().__init__(config, vector_service, memory)
         self.conversation_state = {
             'current_pipeline': '',
             'workflow_context': {},
@@ -259,17 +339,18 @@ class WorkflowAgent(BaseAgent):
         self._update_workflow_state(workflow_context)
         
         # Search with workflow-focused strategy
-        search_results = self.vector_service.search(user_question, n_results=15)
-        filtered_results = self.apply_search_strategy(user_question, search_results)
+        filtered_results = self.retrieve(user_question, n_results=15)
         
         # Format context and create prompt
         context = self.format_retrieved_context(filtered_results)
         prompt = PromptTemplates.get_prompt_by_template_name(
-            self.config.prompt_template, user_question, context, self.conversation_state
+            self.config.prompt_template, user_question, context, self.conversation_state,
+            history=self.get_history()
         )
         
         # Get LLM response
-        response = await self.llm.ainvoke(prompt)
+        response = await self.invoke_llm(prompt)
+        self.remember(user_question, response.content)
         
         # Format sources with workflow-specific information
         sources_info = self._format_workflow_sources(filtered_results)
@@ -278,22 +359,7 @@ class WorkflowAgent(BaseAgent):
     
     def _detect_workflow_context(self, query: str) -> Dict[str, Any]:
         """Detect workflow-related context"""
-        query_lower = query.lower()
-        
-        context = {
-            'has_wdl': 'wdl' in query_lower,
-            'has_pipeline': any(word in query_lower for word in ['pipeline', 'workflow']),
-            'tools_mentioned': [],
-            'workflow_stage': None
-        }
-        
-        # Common bioinformatics tools
-        tools = ['bwa', 'picard', 'gatk', 'samtools', 'bcftools', 'markduplicates']
-        for tool in tools:
-            if tool in query_lower:
-                context['tools_mentioned'].append(tool)
-        
-        return context
+        return detect_workflow_context(query)
     
     def _update_workflow_state(self, context: Dict[str, Any]):
         """Update workflow conversation state"""
@@ -0,0 +1,130 @@
+from collections import deque
+from dataclasses import dataclass
+
+import tiktoken
+
+from rag_chatbot.config import settings
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, falling back to ~4 chars/token if the encoding can't be loaded"""
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is False:
+        return text[:max_tokens * 4].rstrip() + " ..."
+    return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip() + " ..."
+
+
+@dataclass
+class Turn:
+    """One user question and the agent's answer"""
+    user: str
+    assistant: str
+    agent_type: str = ""
+    tokens: int = 0
+
+
+class ConversationMemory:
+    """Per-session conversation history with a fixed token budget.
+
+    Recent turns are kept verbatim in a ring buffer. When the buffer is full
+    or over its token budget, the oldest turn is folded into a rolling
+    summary, which is itself capped, so the history block in the prompt stays
+    roughly the same size however long the conversation runs.
+    """
+
+    def __init__(self, max_turns: int = None, max_history_tokens: int = None,
+                 max_summary_tokens: int = None, max_turn_tokens: int = None):
+        self.max_turns = max_turns or settings.conversation_memory_size
+        self.max_history_tokens = max_history_tokens or settings.conversation_history_tokens
+        self.max_summary_tokens = max_summary_tokens or settings.conversation_summary_tokens
+        self.max_turn_tokens = max_turn_tokens or max(self.max_history_tokens // 4, 64)
+
+        self.turns: deque = deque()
+        self.summary_lines: deque = deque()
+        self._history_tokens = 0
+        self._summary_tokens = 0
+        self.total_turns = 0
+
+    def add_turn(self, user: str, assistant: str, agent_type: str = ""):
+        """Record a completed exchange, compacting older turns as needed"""
+        half = self.max_turn_tokens // 2
+        turn = Turn(
+            user=truncate_to_tokens(user.strip(), half),
+            assistant=truncate_to_tokens(assistant.strip(), self.max_turn_tokens - half),
+            agent_type=agent_type
+        )
+        turn.tokens = count_tokens(self._format_turn(turn))
+
+        self.turns.append(turn)
+        self._history_tokens += turn.tokens
+        self.total_turns += 1
+
+        while self.turns and (len(self.turns) > self.max_turns or
+                              self._history_tokens > self.max_history_tokens):
+            self._compact(self.turns.popleft())
+
+    def _compact(self, turn: Turn):
+        """Fold an evicted turn into the rolling summary"""
+        self._history_tokens -= turn.tokens
+
+        question = " ".join(turn.user.split())
+        answer = " ".join(turn.assistant.split())
+        first_sentence = answer.split(". ")[0]
+        line = f"- Asked: {truncate_to_tokens(question, 40)} -> {truncate_to_tokens(first_sentence, 40)}"
+        line_tokens = count_tokens(line)
+
+        self.summary_lines.append((line, line_tokens))
+        self._summary_tokens += line_tokens
+        while self.summary_lines and self._summary_tokens > self.max_summary_tokens:
+            _, dropped_tokens = self.summary_lines.popleft()
+            self._summary_tokens -= dropped_tokens
+
+    @staticmethod
+    def _format_turn(turn: Turn) -> str:
+        return f"User: {turn.user}\nAssistant: {turn.assistant}"
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(line for line, _ in self.summary_lines)
+
+    def render(self) -> str:
+        """History block for the prompt; empty when nothing has been said yet"""
+        if not self.turns and not self.summary_lines:
+            return ""
+
+        parts = []
+        if self.summary_lines:
+            parts.append(f"EARLIER IN THIS CONVERSATION:\n{self.summary}")
+        if self.turns:
+            parts.append("RECENT CONVERSATION:\n" + "\n\n".join(self._format_turn(t) for t in self.turns))
+        return "\n\n".join(parts)
+
+    def token_usage(self) -> dict:
+        return {
+            "turns_in_buffer": len(self.turns),
+            "history_tokens": self._history_tokens,
+            "summary_tokens": self._summary_tokens,
+            "total_turns": self.total_turns
+        }
+
+    def clear(self):
+        self.turns.clear()
+        self.summary_lines.clear()
+        self._history_tokens = 0
+        self._summary_tokens = 0
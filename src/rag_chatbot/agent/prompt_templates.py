@@ -1,19 +1,17 @@
 from typing import Dict, Any
 
 class PromptTemplates:
-    """Collection of prompt templates for different agent types"""
-    
-    @staticmethod
-    def get_qa_prompt(user_question: str, context: str) -> str:
-        """Prompt template for Q&A agent"""
-        return f"""You are a helpful technical assistant specializing in answering questions about documentation and systems.
+    """Collection of prompt templates for different agent types
 
-Use the following context to answer the user's question accurately and comprehensively.
+    Every prompt is laid out from most stable to least stable: the agent's
+    fixed instructions first, then session state and conversation history,
+    then the retrieved context and question for this turn. Keeping reused
+    text contiguous at the front lets provider-side prompt caching reuse it.
+    """
 
-CONTEXT:
-{context}
+    QA_PREFIX = """You are a helpful technical assistant specializing in answering questions about documentation and systems.
 
-QUESTION: {user_question}
+Use the provided context to answer the user's question accurately and comprehensively.
 
 INSTRUCTIONS:
 - Answer based on the provided context
@@ -21,25 +19,9 @@ INSTRUCTIONS:
 - Provide clear, well-structured answers
 - Reference specific documents when relevant
 - Be concise but thorough
+- Use the conversation history to resolve follow-up questions"""
 
-ANSWER:"""
-
-    @staticmethod
-    def get_code_assistant_prompt(user_question: str, context: str, conversation_state: Dict[str, Any] = None) -> str:
-        """Prompt template for code assistant agent"""
-        state_info = ""
-        if conversation_state:
-            current_task = conversation_state.get('current_task', '')
-            if current_task:
-                state_info = f"\nCURRENT TASK CONTEXT: {current_task}\n"
-        
-        return f"""You are an expert code assistant specializing in bioinformatics pipelines, software development, and code analysis.
-
-{state_info}
-CONTEXT:
-{context}
-
-QUESTION: {user_question}
+    CODE_ASSISTANT_PREFIX = """You are an expert code assistant specializing in bioinformatics pipelines, software development, and code analysis.
 
 INSTRUCTIONS:
 - Analyze code thoroughly and provide detailed explanations
@@ -57,26 +39,9 @@ CAPABILITIES:
 - Debugging assistance
 - Implementation suggestions
 - Best practices recommendations
-- Version and dependency analysis
+- Version and dependency analysis"""
 
-ANSWER:"""
-
-    @staticmethod
-    def get_workflow_prompt(user_question: str, context: str, conversation_state: Dict[str, Any] = None) -> str:
-        """Prompt template for workflow agent"""
-        pipeline_context = ""
-        if conversation_state:
-            current_pipeline = conversation_state.get('current_pipeline', '')
-            if current_pipeline:
-                pipeline_context = f"\nCURRENT PIPELINE: {current_pipeline}\n"
-        
-        return f"""You are a bioinformatics workflow specialist with expertise in pipeline design, WDL workflows, and computational biology.
-
-{pipeline_context}
-CONTEXT:
-{context}
-
-QUESTION: {user_question}
+    WORKFLOW_PREFIX = """You are a bioinformatics workflow specialist with expertise in pipeline design, WDL workflows, and computational biology.
 
 INSTRUCTIONS:
 - Focus on workflow design and pipeline optimization
@@ -94,24 +59,69 @@ SPECIALIZATIONS:
 - Resource management
 - Tool integration
 - Data processing workflows
-- Computational biology best practices
+- Computational biology best practices"""
+
+    @staticmethod
+    def _assemble(prefix: str, user_question: str, context: str, state_info: str = "",
+                  history: str = "") -> str:
+        """Join prompt sections in stable-to-volatile order"""
+        sections = [prefix]
+        if state_info:
+            sections.append(state_info)
+        if history:
+            sections.append(history)
+        sections.append(f"CONTEXT:\n{context}")
+        sections.append(f"QUESTION: {user_question}")
+        sections.append("ANSWER:")
+        return "\n\n".join(sections)
+
+    @staticmethod
+    def get_qa_prompt(user_question: str, context: str, history: str = "") -> str:
+        """Prompt template for Q&A agent"""
+        return PromptTemplates._assemble(PromptTemplates.QA_PREFIX, user_question, context, history=history)
+
+    @staticmethod
+    def get_code_assistant_prompt(user_question: str, context: str, conversation_state: Dict[str, Any] = None,
+                                  history: str = "") -> str:
+        """Prompt template for code assistant agent"""
+        state_info = ""
+        if conversation_state:
+            current_task = conversation_state.get('current_task', '')
+            if current_task:
+                state_info = f"CURRENT TASK CONTEXT: {current_task}"
 
-ANSWER:"""
+        return PromptTemplates._assemble(
+            PromptTemplates.CODE_ASSISTANT_PREFIX, user_question, context, state_info, history
+        )
 
     @staticmethod
-    def get_prompt_by_template_name(template_name: str, user_question: str, context: str, 
-                                   conversation_state: Dict[str, Any] = None) -> str:
+    def get_workflow_prompt(user_question: str, context: str, conversation_state: Dict[str, Any] = None,
+                            history: str = "") -> str:
+        """Prompt template for workflow agent"""
+        pipeline_context = ""
+        if conversation_state:
+            current_pipeline = conversation_state.get('current_pipeline', '')
+            if current_pipeline:
+                pipeline_context = f"CURRENT PIPELINE: {current_pipeline}"
+
+        return PromptTemplates._assemble(
+            PromptTemplates.WORKFLOW_PREFIX, user_question, context, pipeline_context, history
+        )
+
+    @staticmethod
+    def get_prompt_by_template_name(template_name: str, user_question: str, context: str,
+                                   conversation_state: Dict[str, Any] = None, history: str = "") -> str:
         """Get prompt by template name"""
         template_map = {
             "qa_prompt": PromptTemplates.get_qa_prompt,
             "code_assistant_prompt": PromptTemplates.get_code_assistant_prompt,
             "workflow_prompt": PromptTemplates.get_workflow_prompt
         }
-        
+
         template_func = template_map.get(template_name, PromptTemplates.get_qa_prompt)
-        
+
         # Check if template function accepts conversation_state
         if template_name in ["code_assistant_prompt", "workflow_prompt"]:
-            return template_func(user_question, context, conversation_state)
+            return template_func(user_question, context, conversation_state, history)
         else:
-            return template_func(user_question, context)
\ No newline at end of file
+            return template_func(user_question, context, history)
@@ -6,12 +6,27 @@ class Settings(BaseSettings):
     google_api_key: str = ""
     database_url: str = ""
     chromadb_path: str = "./chroma_db"
+    vector_backend: str = "chroma"  # "chroma" or "memory"
+    # "single" collection, "repo": one collection per repository, "source_type": one per search shard
+    vector_namespace_layout: str = "single"
+    shard_search_workers: int = 4  # namespaces queried concurrently
+    shard_score_calibration: bool = False  # map per-shard distances onto a pooled distribution before merging
+    # Model for new collections; an existing collection keeps the model recorded in embedding_registry.json
+    # until reembed_collection.py migrates it
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_device: str = "cpu"
+    reembed_batch_size: int = 256
+    # Seconds before retrying to load the model of a collection another process swapped in
+    embedding_load_retry_interval: float = 30.0
     log_level: str = "INFO"
     
     # Agent configuration
     default_agent: str = "qa_agent"
 
-    # Model configurations
+    # Model configurations ("google", "openai", or "fake" for offline testing)
+    llm_provider: str = "google"
+    fake_llm_latency: float = 0.5
+    llm_prewarm_connections: bool = False
     qa_agent_model: str = "gemini-2.5-flash"
     code_assistant_model: str = "gemini-2.5-flash" 
     workflow_agent_model: str = "gemini-2.5-flash"
@@ -21,19 +36,63 @@ class Settings(BaseSettings):
     code_assistant_temperature: float = 0.2
     workflow_agent_temperature: float = 0.3
 
+    # LLM gateway: concurrent calls per model, callers allowed to queue, max seconds in queue
+    llm_max_concurrency: int = 8
+    llm_max_queue: int = 32
+    llm_queue_timeout: float = 30.0
+
     # Search and features
     max_search_results: int = 10
     vector_collection_name: str = "rag_documents"
     enable_code_execution: bool = False
     enable_state_management: bool = True
     enable_agent_switching: bool = True
+    enable_symbol_lookup: bool = True
+    symbol_lookup_max_hits: int = 3  # exact-name hits taken per identifier in a question
+    enable_glossary_lookup: bool = True  # pin the glossary definition for "What is X?" questions
+    glossary_max_hits: int = 2  # entries pinned when several glossaries define the term
+    enable_mmr: bool = True  # diversify vector results (maximal marginal relevance) before the agent strategy
+    mmr_lambda: float = 0.7  # 1.0 = relevance only, lower = more diversity
+    # Small-to-big: index small child chunks, send their parent chunk (section / whole WDL task) to the LLM
+    small_to_big: bool = False
+    child_chunk_size: int = 400
+    child_chunk_overlap: int = 50
+    small_to_big_fanout: int = 3  # child hits fetched per requested result
     conversation_memory_size: int = 10
+    conversation_history_tokens: int = 1500
+    conversation_summary_tokens: int = 300
+
+    # Chat history persistence ("" disables it, "postgres" uses database_url, "sqlite" is a local stand-in)
+    chat_store_backend: str = ""
+    chat_store_sqlite_path: str = "./chat_history.db"
+    chat_store_pool_min: int = 2
+    chat_store_pool_max: int = 10
+    chat_store_batch_size: int = 200
+    chat_store_flush_interval: float = 0.5
+
+    # Repository ingestion: retries for a failed embedding batch, first backoff in seconds
+    ingest_max_retries: int = 3
+    ingest_retry_backoff: float = 2.0
+    ingestion_report_dir: str = "./ingestion_reports"  # one JSON report per ingest_repositories.py run
+    # Chunk Python/Java along function/class boundaries, with the symbol metadata enable_symbol_lookup uses.
+    # Off until it is as fast as the separator splitter (see benchmark_code_chunking.py)
+    symbol_chunking: bool = False
 
     # Server settings (if not already present)
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = False
 
+    # Profiling: sample the next N requests (also /profile N), tracemalloc snapshots during ingestion
+    profile_requests: int = 0
+    # Chat user identifiers (comma-separated) allowed to use /profile; empty leaves only PROFILE_REQUESTS
+    profile_command_users: str = ""
+    profile_max_requests: int = 50
+    profile_interval: float = 0.005  # seconds between stack samples
+    profile_dir: str = "./profiles"
+    profile_ingestion_memory: bool = False
+    profile_tracemalloc_frames: int = 10
+
     # Logging
     log_agent_switches: bool = True
     log_search_queries: bool = True
@@ -4,18 +4,46 @@ from typing import Optional
 # Import agent components
 from rag_chatbot.agent.agent_factory import AgentManager
 from rag_chatbot.services.vector_service import VectorService
+from rag_chatbot.services.chat_store import create_chat_store, make_step
+from rag_chatbot.services.llm_service import LLMBackpressureError, llm_client_registry
+from rag_chatbot.agent.agent_config import AgentConfigManager
+from rag_chatbot.agent.agent_router import AgentRouter
 from rag_chatbot.config import settings
 
-# Initialize services
+# Initialize shared services; agent managers are created per session
 vector_service = VectorService()
-agent_manager = AgentManager(vector_service)
+agent_router = AgentRouter(vector_service)
+chat_store = create_chat_store()
+
+# Create the shared LLM clients once, before the first session needs them
+llm_client_registry.prewarm(
+    (config.provider, config.model_name, config.temperature)
+    for config in AgentConfigManager().configs.values()
+)
+llm_connections_warm = False
 
 @cl.on_chat_start
 async def start():
     """Initialize the chat session with multi-agent support"""
-    # Store agent manager in user session
+    # Open provider connections on the first session (needs the running event loop)
+    global llm_connections_warm
+    if settings.llm_prewarm_connections and not llm_connections_warm:
+        llm_connections_warm = True
+        await llm_client_registry.aprewarm_connections()
+    
+    # Each session gets its own agent manager so conversation history stays private
+    user = cl.user_session.get("user")
+    agent_manager = AgentManager(vector_service, agent_router, user_id=getattr(user, 'identifier', None))
     cl.user_session.set("agent_manager", agent_manager)
     
+    # Register the thread for history persistence
+    if chat_store:
+        await chat_store.connect()
+        await chat_store.upsert_thread(
+            cl.context.session.thread_id,
+            user_id=getattr(user, 'identifier', None)
+        )
+    
     # Send welcome message with agent information
     welcome_msg = agent_manager.get_welcome_message()
     await cl.Message(content=welcome_msg).send()
@@ -38,6 +66,9 @@ async def main(message: cl.Message):
             await cl.Message(content=command_response).send()
             return
         
+        # Pick the agent (routes automatically in /auto mode)
+        agent_manager.select_agent(message.content)
+        
         # Show processing message
         current_agent_info = agent_manager.factory.get_current_agent_info(agent_manager.current_agent)
         processing_msg = f"🔍 {current_agent_info['name']} is processing your request..."
@@ -47,7 +78,23 @@ async def main(message: cl.Message):
         response = await agent_manager.process_message(message)
         
         # Send the response
-        await cl.Message(content=response).send()
+        response_msg = cl.Message(content=response)
+        await response_msg.send()
+        
+        # Queue both sides of the exchange; the store writes them in batches
+        if chat_store:
+            thread_id = cl.context.session.thread_id
+            await chat_store.add_step(make_step(
+                thread_id, "user_message", "user", input=user_input, step_id=message.id
+            ))
+            await chat_store.add_step(make_step(
+                thread_id, "assistant_message", current_agent_info['name'], output=response,
+                step_id=response_msg.id,
+                metadata={"agent_type": current_agent_info['type']}
+            ))
+        
+    except LLMBackpressureError:
+        await cl.Message(content="⏳ The assistant is busy right now. Please try again in a moment.").send()
         
     except Exception as e:
         error_msg = f"❌ Error processing your request: {str(e)}"
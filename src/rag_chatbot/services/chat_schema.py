@@ -0,0 +1,59 @@
+# Chat history schema; no settings imported here, so create_db_schema.py runs without an API key
+
+# Indexes for the access paths the chat UI uses: a user's threads newest first,
+# a thread's steps in order, child steps of a step, and a thread's elements.
+INDEX_STATEMENTS = [
+    'CREATE INDEX IF NOT EXISTS "Thread_userId_createdAt_idx" ON "Thread" ("userId", "createdAt" DESC)',
+    'CREATE INDEX IF NOT EXISTS "Thread_createdAt_idx" ON "Thread" ("createdAt" DESC)',
+    'CREATE INDEX IF NOT EXISTS "Step_threadId_createdAt_idx" ON "Step" ("threadId", "createdAt")',
+    'CREATE INDEX IF NOT EXISTS "Step_parentId_idx" ON "Step" ("parentId")',
+    'CREATE INDEX IF NOT EXISTS "Element_threadId_idx" ON "Element" ("threadId")',
+    'CREATE INDEX IF NOT EXISTS "Element_stepId_idx" ON "Element" ("stepId")',
+]
+
+# SQLite equivalent of the Postgres schema in src/scripts/create_db_schema.py
+SQLITE_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS "Thread" (
+        id TEXT PRIMARY KEY,
+        "createdAt" TEXT,
+        "updatedAt" TEXT,
+        name TEXT,
+        "userId" TEXT,
+        metadata TEXT DEFAULT '{}'
+    )''',
+    '''CREATE TABLE IF NOT EXISTS "Step" (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        type TEXT,
+        "threadId" TEXT REFERENCES "Thread"(id) ON DELETE CASCADE,
+        "showInput" TEXT,
+        "parentId" TEXT,
+        "createdAt" TEXT,
+        "updatedAt" TEXT,
+        "startTime" TEXT,
+        "endTime" TEXT,
+        input TEXT,
+        output TEXT,
+        metadata TEXT DEFAULT '{}',
+        tags TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS "Element" (
+        id TEXT PRIMARY KEY,
+        "threadId" TEXT REFERENCES "Thread"(id) ON DELETE CASCADE,
+        "stepId" TEXT REFERENCES "Step"(id) ON DELETE CASCADE,
+        name TEXT,
+        type TEXT,
+        url TEXT,
+        "objectKey" TEXT,
+        mime TEXT,
+        "createdAt" TEXT,
+        "updatedAt" TEXT,
+        metadata TEXT DEFAULT '{}'
+    )''',
+    '''CREATE TABLE IF NOT EXISTS "User" (
+        id TEXT PRIMARY KEY,
+        "createdAt" TEXT,
+        "updatedAt" TEXT,
+        metadata TEXT DEFAULT '{}'
+    )''',
+]
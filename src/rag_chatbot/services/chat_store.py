@@ -0,0 +1,307 @@
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+import aiosqlite
+import asyncpg
+
+from rag_chatbot.config import settings
+from rag_chatbot.services.chat_schema import INDEX_STATEMENTS, SQLITE_SCHEMA
+
+
+def utc_now() -> datetime:
+    """Naive UTC timestamp, matching the TIMESTAMP (without time zone) columns"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def make_step(thread_id: str, step_type: str, name: str, input: str = "", output: str = "",
+              parent_id: str = None, step_id: str = None, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Build a step record in the shape ChatStore.add_step expects"""
+    return {
+        "id": step_id or str(uuid.uuid4()),
+        "threadId": thread_id,
+        "parentId": parent_id,
+        "name": name,
+        "type": step_type,
+        "input": input,
+        "output": output,
+        "createdAt": utc_now(),
+        "metadata": metadata or {}
+    }
+
+
+class ChatStore(ABC):
+    """Persistence for chat threads and steps.
+
+    Thread writes go straight to the database. Step writes are queued with
+    add_step() and a background task coalesces them into batched inserts,
+    so saving history never sits on the response path.
+    """
+
+    def __init__(self, batch_size: int = None, flush_interval: float = None):
+        self.batch_size = batch_size or settings.chat_store_batch_size
+        self.flush_interval = flush_interval or settings.chat_store_flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self.connected = False
+        self.steps_written = 0
+        self.batches_written = 0
+
+    async def connect(self):
+        """Open connections and create schema; safe to call more than once"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return
+            await self._open()
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            self.connected = True
+
+    async def close(self):
+        """Write out queued steps and release connections"""
+        if not self.connected:
+            return
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        await self.flush()
+        await self._close()
+        self.connected = False
+
+    async def add_step(self, step: Dict[str, Any]):
+        """Queue a step for the next batched write"""
+        self._pending.append(step)
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write every queued step now"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    await self._write_steps(batch)
+                    self.steps_written += len(batch)
+                    self.batches_written += 1
+                except Exception as e:
+                    print(f"✗ Error writing {len(batch)} chat steps: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    @abstractmethod
+    async def _open(self):
+        pass
+
+    @abstractmethod
+    async def _close(self):
+        pass
+
+    @abstractmethod
+    async def _write_steps(self, steps: List[Dict[str, Any]]):
+        """Insert or update a batch of steps in one round trip"""
+        pass
+
+    @abstractmethod
+    async def upsert_thread(self, thread_id: str, name: str = None, user_id: str = None,
+                            metadata: Dict[str, Any] = None):
+        pass
+
+    @abstractmethod
+    async def list_threads(self, user_id: str, limit: int = 20,
+                           before: datetime = None) -> List[Dict[str, Any]]:
+        """A user's threads, newest first; pass the last createdAt as `before` to page"""
+        pass
+
+    @abstractmethod
+    async def get_thread_steps(self, thread_id: str) -> List[Dict[str, Any]]:
+        """All steps of a thread in creation order"""
+        pass
+
+
+class PostgresChatStore(ChatStore):
+    """ChatStore on a shared asyncpg connection pool"""
+
+    def __init__(self, database_url: str = None, min_size: int = None, max_size: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.database_url = database_url or settings.database_url
+        self.min_size = min_size or settings.chat_store_pool_min
+        self.max_size = max_size or settings.chat_store_pool_max
+        self.pool = None
+
+    async def _open(self):
+        self.pool = await asyncpg.create_pool(self.database_url, min_size=self.min_size, max_size=self.max_size)
+        async with self.pool.acquire() as conn:
+            for statement in INDEX_STATEMENTS:
+                await conn.execute(statement)
+
+    async def _close(self):
+        await self.pool.close()
+
+    async def _write_steps(self, steps):
+        rows = [
+            (s["id"], s["threadId"], s.get("parentId"), s.get("name"), s.get("type"),
+             s.get("input"), s.get("output"), s["createdAt"], json.dumps(s.get("metadata") or {}))
+            for s in steps
+        ]
+        thread_ids = list({s["threadId"] for s in steps})
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany('''
+                    INSERT INTO "Step" (id, "threadId", "parentId", name, type, input, output, "createdAt", metadata)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9::jsonb)
+                    ON CONFLICT (id) DO UPDATE SET
+                        output = EXCLUDED.output,
+                        metadata = EXCLUDED.metadata,
+                        "updatedAt" = NOW()
+                ''', rows)
+                await conn.execute(
+                    'UPDATE "Thread" SET "updatedAt" = NOW() WHERE id = ANY($1::uuid[])',
+                    thread_ids
+                )
+
+    async def upsert_thread(self, thread_id, name=None, user_id=None, metadata=None):
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                INSERT INTO "Thread" (id, name, "userId", metadata)
+                VALUES ($1, $2, $3, $4::jsonb)
+                ON CONFLICT (id) DO UPDATE SET
+                    name = COALESCE(EXCLUDED.name, "Thread".name),
+                    "userId" = COALESCE(EXCLUDED."userId", "Thread"."userId"),
+                    "updatedAt" = NOW()
+            ''', thread_id, name, user_id, json.dumps(metadata or {}))
+
+    async def list_threads(self, user_id, limit=20, before=None):
+        async with self.pool.acquire() as conn:
+            if before is None:
+                rows = await conn.fetch('''
+                    SELECT id, name, "createdAt", "updatedAt", metadata FROM "Thread"
+                    WHERE "userId" = $1 ORDER BY "createdAt" DESC LIMIT $2
+                ''', user_id, limit)
+            else:
+                rows = await conn.fetch('''
+                    SELECT id, name, "createdAt", "updatedAt", metadata FROM "Thread"
+                    WHERE "userId" = $1 AND "createdAt" < $2 ORDER BY "createdAt" DESC LIMIT $3
+                ''', user_id, before, limit)
+        return [dict(row) for row in rows]
+
+    async def get_thread_steps(self, thread_id):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT id, "parentId", name, type, input, output, "createdAt", metadata FROM "Step"
+                WHERE "threadId" = $1 ORDER BY "createdAt"
+            ''', thread_id)
+        return [dict(row) for row in rows]
+
+
+class SQLiteChatStore(ChatStore):
+    """ChatStore on a local SQLite file, for development without Postgres"""
+
+    def __init__(self, path: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or settings.chat_store_sqlite_path
+        self.conn = None
+
+    async def _open(self):
+        self.conn = await aiosqlite.connect(self.path)
+        self.conn.row_factory = aiosqlite.Row
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA foreign_keys=ON")
+        for statement in SQLITE_SCHEMA + INDEX_STATEMENTS:
+            await self.conn.execute(statement)
+        await self.conn.commit()
+
+    async def _close(self):
+        await self.conn.close()
+
+    async def _write_steps(self, steps):
+        now = utc_now().isoformat()
+        rows = [
+            (s["id"], s["threadId"], s.get("parentId"), s.get("name"), s.get("type"),
+             s.get("input"), s.get("output"), _to_text(s["createdAt"]), now,
+             json.dumps(s.get("metadata") or {}))
+            for s in steps
+        ]
+        await self.conn.executemany('''
+            INSERT INTO "Step" (id, "threadId", "parentId", name, type, input, output, "createdAt", "updatedAt", metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                output = excluded.output,
+                metadata = excluded.metadata,
+                "updatedAt" = excluded."updatedAt"
+        ''', rows)
+        await self.conn.executemany(
+            'UPDATE "Thread" SET "updatedAt" = ? WHERE id = ?',
+            [(now, thread_id) for thread_id in {s["threadId"] for s in steps}]
+        )
+        await self.conn.commit()
+
+    async def upsert_thread(self, thread_id, name=None, user_id=None, metadata=None):
+        now = utc_now().isoformat()
+        await self.conn.execute('''
+            INSERT INTO "Thread" (id, "createdAt", "updatedAt", name, "userId", metadata)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = COALESCE(excluded.name, "Thread".name),
+                "userId" = COALESCE(excluded."userId", "Thread"."userId"),
+                "updatedAt" = excluded."updatedAt"
+        ''', (thread_id, now, now, name, user_id, json.dumps(metadata or {})))
+        await self.conn.commit()
+
+    async def list_threads(self, user_id, limit=20, before=None):
+        if before is None:
+            cursor = await self.conn.execute('''
+                SELECT id, name, "createdAt", "updatedAt", metadata FROM "Thread"
+                WHERE "userId" = ? ORDER BY "createdAt" DESC LIMIT ?
+            ''', (user_id, limit))
+        else:
+            cursor = await self.conn.execute('''
+                SELECT id, name, "createdAt", "updatedAt", metadata FROM "Thread"
+                WHERE "userId" = ? AND "createdAt" < ? ORDER BY "createdAt" DESC LIMIT ?
+            ''', (user_id, _to_text(before), limit))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def get_thread_steps(self, thread_id):
+        cursor = await self.conn.execute('''
+            SELECT id, "parentId", name, type, input, output, "createdAt", metadata FROM "Step"
+            WHERE "threadId" = ? ORDER BY "createdAt"
+        ''', (thread_id,))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+def _to_text(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def create_chat_store(backend: str = None) -> Optional[ChatStore]:
+    """Build the configured chat store, or None when persistence is disabled"""
+    backend = settings.chat_store_backend if backend is None else backend
+    if not backend:
+        return None
+    if backend == "postgres":
+        return PostgresChatStore()
+    elif backend == "sqlite":
+        return SQLiteChatStore()
+    else:
+        raise ValueError(f"Unknown chat store backend: {backend}")
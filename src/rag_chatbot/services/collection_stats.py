@@ -0,0 +1,148 @@
+import json
+import os
+from typing import Dict, Any, Iterable
+
+from rag_chatbot.config import settings
+
+# Metadata fields with a histogram in the catalog
+STAT_FIELDS = {
+    'source_type': 'source_types',
+    'repo_name': 'repos',
+    'language': 'languages',
+    'file_category': 'file_categories',
+}
+
+
+# Bumped when the catalog layout changes; an older catalog is rebuilt from the collection
+CATALOG_VERSION = 2
+
+
+class CollectionStats:
+    """Exact chunk counts for the collection, by source type, repository, language and file category.
+
+    Updated incrementally by every write and delete VectorService makes and
+    kept as JSON next to the vector store, so reading it never touches the
+    collection. Each repository also has its own breakdown, so deleting a
+    repository with a single filtered delete can be accounted for exactly.
+    Another process (ingestion) may update the file; snapshot() reloads it
+    when its mtime changes.
+    """
+
+    def __init__(self, persist_directory: str = None):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.path = os.path.join(persist_directory, "collection_stats.json")
+        self._mtime = None
+        self.data = self._empty()
+        self.loaded = self._load()
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {'version': CATALOG_VERSION, 'total_chunks': 0, 'by_repo': {},
+                **{name: {} for name in STAT_FIELDS.values()}}
+
+    @staticmethod
+    def _empty_repo() -> Dict[str, Any]:
+        return {'total_chunks': 0, **{name: {} for field, name in STAT_FIELDS.items() if field != 'repo_name'}}
+
+    def _load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CATALOG_VERSION:
+                return False
+            self.data = {**self._empty(), **data}
+            self._mtime = mtime
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load collection stats {self.path}: {e}")
+            return False
+
+    def save(self):
+        """Write the catalog to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    @staticmethod
+    def _count(histogram: Dict[str, int], value, delta: int):
+        count = histogram.get(value, 0) + delta
+        if count > 0:
+            histogram[value] = count
+        else:
+            histogram.pop(value, None)
+
+    def _apply(self, metadatas: Iterable[Dict[str, Any]], delta: int):
+        by_repo = self.data['by_repo']
+        for metadata in metadatas:
+            metadata = metadata or {}
+            self.data['total_chunks'] += delta
+            repo = metadata.get('repo_name')
+            repo_stats = None
+            if repo:
+                repo_stats = by_repo.setdefault(repo, self._empty_repo())
+                repo_stats['total_chunks'] += delta
+            for field, name in STAT_FIELDS.items():
+                value = metadata.get(field)
+                if value is None or value == '':
+                    continue
+                self._count(self.data[name], value, delta)
+                if repo_stats is not None and field != 'repo_name':
+                    self._count(repo_stats[name], value, delta)
+            if repo_stats is not None and repo_stats['total_chunks'] <= 0:
+                del by_repo[repo]
+
+    def add(self, metadatas: Iterable[Dict[str, Any]]):
+        """Count newly stored chunks"""
+        self._apply(metadatas, 1)
+
+    def remove(self, metadatas: Iterable[Dict[str, Any]]):
+        """Uncount deleted chunks"""
+        self._apply(metadatas, -1)
+
+    def repo_counts(self, repo_name: str) -> Dict[str, Any]:
+        """A copy of one repository's breakdown"""
+        return json.loads(json.dumps(self.data['by_repo'].get(repo_name, self._empty_repo())))
+
+    def remove_counts(self, repo_name: str, counts: Dict[str, Any]):
+        """Uncount a repository breakdown previously taken with repo_counts()"""
+        total = counts['total_chunks']
+        if not total:
+            return
+        self.data['total_chunks'] -= total
+        self._count(self.data['repos'], repo_name, -total)
+        repo_stats = self.data['by_repo'].get(repo_name)
+        if repo_stats is not None:
+            repo_stats['total_chunks'] -= total
+        for field, name in STAT_FIELDS.items():
+            if field == 'repo_name':
+                continue
+            for value, count in counts[name].items():
+                self._count(self.data[name], value, -count)
+                if repo_stats is not None:
+                    self._count(repo_stats[name], value, -count)
+        if repo_stats is not None and repo_stats['total_chunks'] <= 0:
+            del self.data['by_repo'][repo_name]
+
+    def remove_repo(self, repo_name: str):
+        """Uncount every chunk of a repository"""
+        self.remove_counts(repo_name, self.repo_counts(repo_name))
+
+    def reset(self):
+        self.data = self._empty()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counts, picking up changes another process saved"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != self._mtime:
+            self._load()
+        return self.data
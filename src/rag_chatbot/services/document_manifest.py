@@ -0,0 +1,86 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+
+from rag_chatbot.config import settings
+
+
+class DocumentManifest:
+    """Per-file record of which chunk ids a source file produced last time it was indexed.
+
+    Entries hold the file's size, mtime and content hash so an unchanged file
+    is recognised from a stat() call, and the chunk ids so that chunks which
+    disappear from an edited file can be deleted. Files are keyed by their
+    resolved directory and path relative to it (see key()), so directories
+    synced separately keep separate entries. Kept as JSON next to the
+    vector store.
+    """
+
+    def __init__(self, persist_directory: str = None, name: str = "markdown_manifest.json"):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.path = os.path.join(persist_directory, name)
+        # file key -> {"size", "mtime", "sha", "chunk_ids"}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load manifest {self.path}: {e}")
+            self.files = {}
+
+    def save(self):
+        """Write the manifest to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(docs_directory: Path, file_path: Path) -> str:
+        """Manifest key of a file: its synced directory, resolved, joined with its relative path"""
+        return (Path(docs_directory).resolve() / Path(file_path).relative_to(docs_directory)).as_posix()
+
+    def keys_under(self, docs_directory: Path) -> List[str]:
+        """Keys of files recorded from this directory"""
+        prefix = Path(docs_directory).resolve().as_posix().rstrip('/') + '/'
+        return [key for key in self.files if key.startswith(prefix)]
+
+    def adopt_legacy(self, file_name: str, key: str) -> bool:
+        """Move an entry recorded under a bare file name (before directories were tracked) to its key"""
+        if '/' in file_name or file_name not in self.files or key in self.files:
+            return False
+        self.files[key] = self.files.pop(file_name)
+        return True
+
+    def referenced_ids(self, excluding: str = None) -> Set[str]:
+        """Chunk ids recorded for any file other than `excluding` (identical sections share an id)"""
+        return {chunk_id for key, entry in self.files.items() if key != excluding for chunk_id in entry['chunk_ids']}
+
+    def get(self, file_name: str) -> Optional[Dict[str, Any]]:
+        return self.files.get(file_name)
+
+    def unchanged(self, file_name: str, size: int, mtime: float) -> bool:
+        """True if the file has the size and mtime recorded when it was last indexed"""
+        entry = self.files.get(file_name)
+        return entry is not None and entry['size'] == size and entry['mtime'] == mtime
+
+    def record(self, file_name: str, size: int, mtime: float, sha: str, chunk_ids: List[str]):
+        self.files[file_name] = {"size": size, "mtime": mtime, "sha": sha, "chunk_ids": chunk_ids}
+
+    def remove(self, file_name: str) -> List[str]:
+        """Forget a file; returns the chunk ids it had"""
+        entry = self.files.pop(file_name, None)
+        return entry['chunk_ids'] if entry else []
+
+    def clear(self):
+        self.files = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
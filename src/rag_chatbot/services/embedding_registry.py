@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from rag_chatbot.config import settings
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class EmbeddingRegistry:
+    """Which embedding model produced each physical collection, and which one serves an alias.
+
+    The application asks for a logical collection (the alias, "documents");
+    the registry maps it to the physical collection currently serving it and
+    records, for every physical collection, the model name and vector
+    dimension it was built with and its status: "building" or "ready"
+    (a shadow being re-embedded), "active", or "retired" (kept for
+    rollback). Switching models is a change of the alias, written
+    atomically, so readers see either the old collection or the new one.
+    Kept as JSON next to the vector store.
+    """
+
+    def __init__(self, persist_directory: str = None, name: str = "embedding_registry.json"):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.path = os.path.join(persist_directory, name)
+        # alias -> {"active": physical name, "generation": int, "collections": {physical name -> entry}}
+        self.aliases: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[tuple] = None
+        # The re-embed job updates progress from its own thread while searches check for swaps
+        self._lock = threading.RLock()
+        self._load()
+
+    def _file_version(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_ino, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        with self._lock:
+            self._version = self._file_version()
+            if self._version is None:
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.aliases = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load embedding registry {self.path}: {e}")
+                self.aliases = {}
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the file if another process rewrote it; True if it changed"""
+        with self._lock:
+            if self._file_version() == self._version:
+                return False
+            self._load()
+            return True
+
+    def save(self):
+        """Write the registry to disk atomically"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.aliases, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._version = self._file_version()
+
+    def ensure(self, alias: str, model: str) -> Dict[str, Any]:
+        """The alias's active entry, registering a collection named after the alias on first use"""
+        with self._lock:
+            if alias not in self.aliases:
+                self.aliases[alias] = {
+                    "active": alias,
+                    "generation": 1,
+                    "collections": {alias: {"model": model, "dimension": None, "status": "active",
+                                            "generation": 1, "created_at": _now()}},
+                }
+                self.save()
+            return self.active(alias)
+
+    def active(self, alias: str) -> Optional[Dict[str, Any]]:
+        """{"name", "model", "dimension", "status", ...} of the collection serving the alias"""
+        entry = self.aliases.get(alias)
+        if entry is None:
+            return None
+        return self.collection(alias, entry['active'])
+
+    def collection(self, alias: str, name: str) -> Optional[Dict[str, Any]]:
+        collection = self.aliases.get(alias, {}).get('collections', {}).get(name)
+        return {"name": name, **collection} if collection is not None else None
+
+    def collections(self, alias: str) -> List[Dict[str, Any]]:
+        return [{"name": name, **collection}
+                for name, collection in self.aliases.get(alias, {}).get('collections', {}).items()]
+
+    def update(self, alias: str, name: str, **fields):
+        with self._lock:
+            self.aliases[alias]['collections'][name].update(fields)
+            self.save()
+
+    def new_shadow(self, alias: str, model: str, dimension: int) -> str:
+        """Register an empty collection to re-embed the alias into; returns its name"""
+        with self._lock:
+            entry = self.aliases[alias]
+            entry['generation'] += 1
+            name = f"{alias}_v{entry['generation']}"
+            entry['collections'][name] = {"model": model, "dimension": dimension, "status": "building",
+                                          "generation": entry['generation'], "created_at": _now(),
+                                          "embedded": 0, "total": None}
+            self.save()
+            return name
+
+    def swap(self, alias: str, name: str) -> str:
+        """Point the alias at another collection; returns the collection it pointed to before"""
+        with self._lock:
+            entry = self.aliases[alias]
+            previous = entry['active']
+            now = _now()
+            entry['collections'][previous].update(status="retired", retired_at=now)
+            entry['collections'][name].update(status="active", activated_at=now)
+            entry['active'] = name
+            self.save()
+            return previous
+
+    def latest(self, alias: str, status: str) -> Optional[Dict[str, Any]]:
+        """The most recently created collection with the given status"""
+        matching = [collection for collection in self.collections(alias) if collection['status'] == status]
+        return max(matching, key=lambda collection: collection['generation']) if matching else None
+
+    def forget(self, alias: str, name: str):
+        with self._lock:
+            self.aliases[alias]['collections'].pop(name, None)
+            self.save()
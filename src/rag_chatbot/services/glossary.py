@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from rag_chatbot.config import settings
+
+# "## Term" sections (Shesmu) and "- term - definition" bullets (Víðarr)
+_HEADING_ENTRY = re.compile(r'^##\s+(.+?)\s*\n(.*)', re.DOTALL)
+_BULLET_ENTRY = re.compile(r'^[-*]\s+(.+?)\s+-\s+(.+)$', re.MULTILINE)
+_MARKUP = re.compile(r'[_*`\[\]"“”]')
+_NOT_WORD = re.compile(r'[^\w\s(),-]')
+_FOLDED_LETTERS = str.maketrans({'ð': 'd', 'þ': 'th', 'æ': 'ae', 'ø': 'o', 'ß': 'ss'})
+
+# Definitional questions: "What is an olive?", "what are gangs in Shesmu", "define refiller",
+# "What does 'workflow run' mean?", "Explain the glossary term olive"
+_DEFINITIONAL = re.compile(
+    r"^(?:what(?:\s?s|\s+is|\s+are)|define|definition\s+of|meaning\s+of|what\s+does|"
+    r"explain(?:\s+the)?(?:\s+glossary)?(?:\s+term)?|tell\s+me\s+about)\s+"
+    r"(?:(?:an?|the)\s+)?(?:(?:glossary\s+)?term\s+)?(?P<term>.+?)(?:\s+(?:mean|stand\s+for))?$"
+)
+# Trailing "in Shesmu" / "(in Vidarr)": narrows the lookup to that glossary
+_QUALIFIER = re.compile(r"^(?P<question>.+?)\s+\(?(?:in|for)\s+(?P<scope>[\w\s]+?)\)?$")
+
+
+def normalize_term(text: str) -> str:
+    """Case-folded, accent-free, markup-free form of a term (Víðarr -> vidarr)"""
+    text = unicodedata.normalize('NFKD', text.casefold().translate(_FOLDED_LETTERS))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = _NOT_WORD.sub(' ', _MARKUP.sub('', text))
+    return ' '.join(text.split())
+
+
+def singulars(term: str) -> List[str]:
+    """Possible singulars of a term's last word (olives -> olive, clauses -> clause, libraries -> library)"""
+    if term.endswith('ss') or not term.endswith('s') or len(term) < 4:
+        return []
+    candidates = [term[:-1]]
+    if term.endswith('es'):
+        candidates.append(term[:-2])
+    if term.endswith('ies'):
+        candidates.append(term[:-3] + 'y')
+    return candidates
+
+
+def term_aliases(term: str) -> List[str]:
+    """Normalized keys a glossary term is found under"""
+    key = normalize_term(term)
+    aliases = [key]
+    # "label (analysis output)" -> "analysis output label", "label"
+    qualified = re.match(r'^(.+?)\s*\((.+)\)$', key)
+    if qualified:
+        head, qualifier = qualified.group(1), qualified.group(2)
+        aliases += [f"{qualifier} {head}", head]
+    # "provisioner, input" -> "input provisioner", "provisioner"
+    inverted = re.match(r'^([^,]+),\s*(.+)$', key)
+    if inverted:
+        head, qualifier = inverted.group(1), inverted.group(2)
+        aliases += [f"{qualifier} {head}", head]
+    # "algebraic data type" -> "adt"
+    words = key.split()
+    if len(words) >= 3 and all(word.isalpha() for word in words):
+        aliases.append(''.join(word[0] for word in words))
+    return list(dict.fromkeys(aliases))
+
+
+def glossary_entries(text: str) -> List[Tuple[str, str]]:
+    """(term, entry text) pairs in a glossary_entry chunk"""
+    heading = _HEADING_ENTRY.match(text)
+    if heading:
+        return [(heading.group(1), text)]
+    return [(match.group(1), match.group(0)) for match in _BULLET_ENTRY.finditer(text)]
+
+
+def definitional_term(query: str) -> Optional[Tuple[str, Optional[str]]]:
+    """(normalized term, scope) asked about by a definitional question, or None"""
+    text = normalize_term(query.strip().rstrip('?.! '))
+    scope = None
+    qualified = _QUALIFIER.match(text)
+    if qualified:
+        text, scope = qualified.group('question'), qualified.group('scope')
+    match = _DEFINITIONAL.match(text)
+    if match:
+        text = match.group('term')
+    text = text.strip(' ,')
+    if text.count('(') != text.count(')'):
+        text = text.strip('()')
+    if not text or (not match and len(text.split()) > 4):
+        return None
+    return text, scope
+
+
+class GlossaryIndex:
+    """Term -> definition dictionary built from the glossary_entry chunks of the glossary files.
+
+    Each entry is keyed under its case-folded, accent-free term plus aliases
+    (the head of "label (analysis output)" or "provisioner, input", the
+    reversed form, acronyms of long terms). A definitional question ("What
+    is an olive?") is answered with one dict access, so the definition can
+    be pinned at the top of the context without embedding the question.
+    Kept as JSON next to the vector store and loaded into memory;
+    match_query() reloads it when another process (ingestion) saved it.
+    Lookup counts and time are tracked for /stats.
+    """
+
+    def __init__(self, persist_directory: str = None):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.path = os.path.join(persist_directory, "glossary.json")
+        # source file key (see DocumentManifest.key) -> [[term, entry text, chunk id], ...]
+        self.files: Dict[str, List[List[str]]] = {}
+        # alias -> [[term, entry text, chunk id, source file], ...]
+        self.terms: Dict[str, List[List[str]]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.definitional = 0
+        self.hits = 0
+        self.lookup_seconds = 0.0
+        self.max_lookup_seconds = 0.0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load glossary {self.path}: {e}")
+            self.files = {}
+        self._rebuild_terms()
+
+    def _refresh(self):
+        """Pick up a glossary another process saved"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def _rebuild_terms(self):
+        terms = {}
+        for source_key, entries in sorted(self.files.items()):
+            source_file = os.path.basename(source_key)
+            for term, text, chunk_id in entries:
+                for alias in term_aliases(term):
+                    terms.setdefault(alias, []).append([term, text, chunk_id, source_file])
+        self.terms = terms
+
+    def save(self):
+        """Write the dictionary to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def replace_file(self, source_file: str, chunks: Iterable[Dict[str, Any]]) -> int:
+        """Replace a glossary file's entries with those in its chunks; returns how many terms it defines"""
+        entries = []
+        for chunk in chunks:
+            if chunk['metadata'].get('chunk_type') != 'glossary_entry':
+                continue
+            for term, text in glossary_entries(chunk['text']):
+                entries.append([term, text, chunk['metadata']['chunk_id']])
+        if entries:
+            self.files[source_file] = entries
+        else:
+            self.files.pop(source_file, None)
+        self._rebuild_terms()
+        return len(entries)
+
+    def remove_file(self, source_file: str):
+        if self.files.pop(source_file, None) is not None:
+            self._rebuild_terms()
+
+    def rename_file(self, old: str, new: str):
+        if old in self.files and new not in self.files:
+            self.files[new] = self.files.pop(old)
+            self._rebuild_terms()
+
+    def clear(self):
+        self.files = {}
+        self.terms = {}
+        self._mtime = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def lookup(self, term: str) -> List[Dict[str, str]]:
+        """Entries for exactly this term or alias (case and accent insensitive, plural allowed)"""
+        key = normalize_term(term)
+        postings = self.terms.get(key)
+        for candidate in singulars(key):
+            if postings:
+                break
+            postings = self.terms.get(candidate)
+        postings = postings or ()
+        return [
+            {"term": name, "content": text, "id": chunk_id, "source_file": source_file}
+            for name, text, chunk_id, source_file in postings
+        ]
+
+    def match_query(self, query: str, max_hits: int = 2) -> List[Dict[str, str]]:
+        """Entries defining the term a definitional question asks about ("What is an olive?")"""
+        self._refresh()
+        start = time.perf_counter()
+        hits = []
+        asked = definitional_term(query)
+        if asked:
+            term, scope = asked
+            hits = self.lookup(term)
+            if scope and hits:
+                # "in Shesmu" picks that glossary when both define the term
+                scoped = [hit for hit in hits if normalize_term(scope) in normalize_term(hit['source_file'])]
+                hits = scoped or hits
+            hits = hits[:max_hits]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.lookups += 1
+            self.definitional += asked is not None
+            self.hits += bool(hits)
+            self.lookup_seconds += elapsed
+            self.max_lookup_seconds = max(self.max_lookup_seconds, elapsed)
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        """Terms, lookups, hit rate over all questions, and lookup time in microseconds"""
+        with self._lock:
+            return {
+                "terms": sum(len(entries) for entries in self.files.values()),
+                "aliases": len(self.terms),
+                "lookups": self.lookups,
+                "definitional": self.definitional,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "avg_lookup_us": self.lookup_seconds / self.lookups * 1e6 if self.lookups else 0.0,
+                "max_lookup_us": self.max_lookup_seconds * 1e6
+            }
+
+    def __len__(self) -> int:
+        return len(self.terms)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional
+
+from rag_chatbot.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo_url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,          -- 'started', 'done' or 'failed'
+    files INTEGER DEFAULT 0,
+    chunks INTEGER DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_key TEXT PRIMARY KEY,    -- hash of the chunk ids in the batch
+    repo_url TEXT,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL,          -- 'done' or 'failed'
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_batches_repo ON batches (repo_url, status);
+"""
+
+
+class IngestionJournal:
+    """Durable record of ingestion progress, so an interrupted run can resume.
+
+    Repositories are marked done only once every one of their embedding
+    batches has been written to the vector store; batches are keyed by the
+    ids they contain, which are deterministic, so a resumed run recognises
+    work it already committed without re-embedding it. Every update is
+    committed immediately (SQLite in WAL mode), so a killed process loses at
+    most the batch it was embedding.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.path.join(settings.chromadb_path, "ingestion_journal.db")
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    @staticmethod
+    def batch_key(ids: List[str]) -> str:
+        return hashlib.sha1("\n".join(ids).encode()).hexdigest()
+
+    def reset(self):
+        """Forget all progress (a fresh, non-resumed run)"""
+        self.conn.execute("DELETE FROM repos")
+        self.conn.execute("DELETE FROM batches")
+        self.conn.commit()
+
+    def repo_done(self, repo_url: str) -> bool:
+        row = self.conn.execute("SELECT status FROM repos WHERE repo_url = ?", (repo_url,)).fetchone()
+        return row is not None and row[0] == 'done'
+
+    def mark_repo(self, repo_url: str, status: str, files: int = 0, chunks: int = 0, error: str = None):
+        self.conn.execute(
+            "INSERT INTO repos (repo_url, status, files, chunks, error, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(repo_url) DO UPDATE SET status = excluded.status, files = excluded.files, "
+            "chunks = excluded.chunks, error = excluded.error, updated_at = excluded.updated_at",
+            (repo_url, status, files, chunks, error, time.time())
+        )
+        self.conn.commit()
+
+    def batch_done(self, batch_key: str) -> bool:
+        row = self.conn.execute("SELECT status FROM batches WHERE batch_key = ?", (batch_key,)).fetchone()
+        return row is not None and row[0] == 'done'
+
+    def record_batch(self, batch_key: str, size: int, status: str, attempts: int,
+                     repo_url: str = None, error: str = None):
+        self.conn.execute(
+            "INSERT INTO batches (batch_key, repo_url, size, status, attempts, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(batch_key) DO UPDATE SET status = excluded.status, "
+            "attempts = batches.attempts + excluded.attempts, error = excluded.error, "
+            "updated_at = excluded.updated_at",
+            (batch_key, repo_url, size, status, attempts, error, time.time())
+        )
+        self.conn.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts of repositories and batches by status"""
+        repos = dict(self.conn.execute("SELECT status, COUNT(*) FROM repos GROUP BY status").fetchall())
+        batches = dict(self.conn.execute("SELECT status, COUNT(*) FROM batches GROUP BY status").fetchall())
+        embedded = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM batches WHERE status = 'done'").fetchone()[0]
+        return {"repos": repos, "batches": batches, "chunks_embedded": embedded}
+
+    def failed_batches(self, repo_url: str = None) -> List[Dict[str, Any]]:
+        query = "SELECT batch_key, repo_url, size, attempts, error FROM batches WHERE status = 'failed'"
+        params = ()
+        if repo_url is not None:
+            query += " AND repo_url = ?"
+            params = (repo_url,)
+        return [
+            {"batch_key": key, "repo_url": url, "size": size, "attempts": attempts, "error": error}
+            for key, url, size, attempts, error in self.conn.execute(query, params)
+        ]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,143 @@
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from rag_chatbot.config import settings
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Pipeline stages in the order they run
+STAGES = ['git', 'walk', 'read', 'chunk', 'embed', 'write']
+COUNTERS = ['repos', 'files', 'bytes', 'chunks', 'embeddings']
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size of this process (or of its finished child processes) in MB"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss * scale / 1e6
+
+
+class IngestionReport:
+    """Per-stage time and throughput of an ingestion run, written as JSON.
+
+    Stages (git, walk, read, chunk, embed, write) accumulate seconds and
+    item counts, both for the whole run and for the repository being
+    ingested, along with per-repository durations and peak RSS. Stage timing
+    is wall-clock around each call, so work done in worker processes is
+    counted where the pipeline waits for it. Save one report per run and
+    diff them to spot regressions.
+    """
+
+    def __init__(self, run_name: str = "ingest"):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        self._repo: Optional[str] = None
+        self.summary: Dict[str, Any] = {}
+
+    @staticmethod
+    def _add_to(stages: Dict[str, Dict[str, float]], stage: str, seconds: float, counts: Dict[str, int]):
+        entry = stages.setdefault(stage, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        for counter, value in counts.items():
+            entry[counter] = entry.get(counter, 0) + value
+
+    def add(self, stage: str, seconds: float, **counts: int):
+        """Record `seconds` spent in a stage and the items it handled (files=, chunks=, embeddings=, ...)"""
+        self._add_to(self.stages, stage, seconds, counts)
+        if self._repo is not None:
+            self._add_to(self.repos[self._repo]['stages'], stage, seconds, counts)
+
+    def start_repo(self, name: str):
+        """Attribute the stages recorded from now on to one repository"""
+        self.repos[name] = {'stages': {}, 'seconds': 0.0, 'status': 'started', '_start': time.perf_counter()}
+        self._repo = name
+
+    def finish_repo(self, status: str = 'done', error: str = None):
+        """Close the current repository's entry with its duration and the peak RSS so far"""
+        if self._repo is None:
+            return
+        entry = self.repos[self._repo]
+        entry['seconds'] = time.perf_counter() - entry.pop('_start')
+        entry['status'] = status
+        if error is not None:
+            entry['error'] = error
+        entry['peak_rss_mb'] = peak_rss_mb()
+        self._repo = None
+
+    @staticmethod
+    def _with_rates(stages: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        ordered = sorted(stages.items(), key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES))
+        report = {}
+        for stage, entry in ordered:
+            entry = dict(entry)
+            seconds = entry['seconds']
+            for counter in COUNTERS:
+                if counter in entry and seconds > 0:
+                    entry[f"{counter}_per_s"] = entry[counter] / seconds
+            report[stage] = entry
+        return report
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._start
+        return {
+            'run': self.run_name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': elapsed,
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_children_mb': peak_rss_mb(children=True),
+            'stages': self._with_rates(self.stages),
+            'repos': {
+                name: {**{key: value for key, value in entry.items() if key not in ('stages', '_start')},
+                       'stages': self._with_rates(entry['stages'])}
+                for name, entry in self.repos.items()
+            },
+            'summary': self.summary,
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'vector_backend': settings.vector_backend,
+                'namespace_layout': settings.vector_namespace_layout,
+                'small_to_big': settings.small_to_big,
+            },
+        }
+
+    def save(self, path: str = None) -> str:
+        """Write the report atomically; the default path is timestamped under settings.ingestion_report_dir"""
+        if path is None:
+            stamp = self.started_at.strftime('%Y%m%d-%H%M%S')
+            path = os.path.join(settings.ingestion_report_dir, f"{self.run_name}_{stamp}.json")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def print_stages(self):
+        """One line per stage: time, share of the run and throughput"""
+        report = self.to_dict()
+        wall = report['wall_seconds'] or 1.0
+        print(f"\n  {'stage':8s} {'seconds':>9s} {'share':>6s}  throughput")
+        for stage, entry in report['stages'].items():
+            rates = ", ".join(f"{entry[f'{counter}_per_s']:,.1f} {counter}/s"
+                              for counter in COUNTERS if f"{counter}_per_s" in entry and counter != 'bytes')
+            print(f"  {stage:8s} {entry['seconds']:9.2f} {entry['seconds'] / wall:6.1%}  {rates}")
+        if report['peak_rss_mb'] is not None:
+            print(f"  Peak RSS: {report['peak_rss_mb']:.0f} MB "
+                  f"(child processes: {report['peak_rss_children_mb']:.0f} MB)")
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Tuple, Iterable
+
+from langchain_core.messages import AIMessage
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_openai import ChatOpenAI
+
+from rag_chatbot.config import settings
+
+
+class LLMBackpressureError(RuntimeError):
+    """Raised when a model's wait queue is full or a caller waited too long for a slot"""
+    pass
+
+
+class _ModelLimiter:
+    """Concurrency cap plus a bounded wait queue for one model"""
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, timeout: float):
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LLMBackpressureError(
+                f"LLM queue full ({self.waiting} waiting, {self.in_flight} running)"
+            )
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMBackpressureError(f"Timed out after {timeout:.0f}s waiting for an LLM slot")
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - start
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.in_flight += 1
+        self.calls += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "avg_wait_ms": (self.total_wait / self.calls * 1000) if self.calls else 0.0,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+
+class LLMGateway:
+    """Process-wide front door for LLM calls.
+
+    Identical prompts to the same client (so the same model and temperature)
+    that arrive while one is already in flight share that single call
+    (single-flight). Each model gets its own concurrency limit with a
+    bounded wait queue; callers beyond the queue, or who wait longer than
+    the timeout, get LLMBackpressureError instead of piling more load onto
+    a rate-limited provider.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_queue: int = None, queue_timeout: float = None):
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.max_queue = max_queue if max_queue is not None else settings.llm_max_queue
+        self.queue_timeout = queue_timeout or settings.llm_queue_timeout
+        self._limiters: Dict[str, _ModelLimiter] = {}
+        # (model key, client id, prompt hash) -> the call in flight
+        self._inflight: Dict[Tuple[str, int, str], asyncio.Task] = {}
+
+    def _limiter(self, model_key: str) -> _ModelLimiter:
+        if model_key not in self._limiters:
+            self._limiters[model_key] = _ModelLimiter(self.max_concurrency, self.max_queue)
+        return self._limiters[model_key]
+
+    async def ainvoke(self, llm, prompt: str, model_key: str):
+        """Invoke llm.ainvoke(prompt) through coalescing and the model's concurrency limit"""
+        # Clients differ in temperature and other sampling settings, so only calls to the same one are shared.
+        # The in-flight task holds llm, so its id cannot be reused by another client meanwhile
+        key = (model_key, id(llm), hashlib.sha256(prompt.encode()).hexdigest())
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._limiter(model_key).coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._call(llm, prompt, model_key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield() so one caller giving up does not cancel the call others are waiting on
+        return await asyncio.shield(task)
+
+    async def _call(self, llm, prompt: str, model_key: str):
+        limiter = self._limiter(model_key)
+        await limiter.acquire(self.queue_timeout)
+        try:
+            return await llm.ainvoke(prompt)
+        finally:
+            limiter.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model queue depth, wait time and call counts"""
+        return {model_key: limiter.stats() for model_key, limiter in self._limiters.items()}
+
+
+class FakeChatModel:
+    """Deterministic local stand-in for a chat model.
+
+    Sleeps for a fixed latency and answers with text derived from a hash of
+    the prompt, so load and latency tests run offline and repeatably.
+    """
+
+    def __init__(self, model: str, temperature: float = 0.0, latency: float = None):
+        self.model = model
+        self.temperature = temperature
+        self.latency = settings.fake_llm_latency if latency is None else latency
+        self.calls = 0
+
+    def _respond(self, prompt: str) -> AIMessage:
+        self.calls += 1
+        digest = hashlib.sha256(f"{self.model}|{self.temperature}|{prompt}".encode()).hexdigest()
+        return AIMessage(content=f"[{self.model} offline answer {digest[:12]}] Based on the provided context, "
+                                 f"this is a deterministic placeholder response of {len(prompt)} prompt characters.")
+
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+    def invoke(self, prompt: str) -> AIMessage:
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+
+class LLMClientRegistry:
+    """Process-wide chat model clients keyed by (provider, model, temperature).
+
+    Agents in every session share one client per key, so HTTP connections and
+    client setup are paid once per process instead of once per session.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, str, float], Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(provider: str, model: str, temperature: float) -> Tuple[str, str, float]:
+        return (provider, model, round(float(temperature), 3))
+
+    def get_client(self, provider: str, model: str, temperature: float):
+        """Get the shared client for this key, creating it on first use"""
+        key = self._key(provider, model, temperature)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create_client(*key)
+                    self._clients[key] = client
+        return client
+
+    def _create_client(self, provider: str, model: str, temperature: float):
+        if provider == "google":
+            return ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=settings.google_api_key,
+                temperature=temperature
+            )
+        elif provider == "openai":
+            return ChatOpenAI(
+                model=model,
+                api_key=settings.openai_api_key,
+                temperature=temperature
+            )
+        elif provider == "fake":
+            return FakeChatModel(model, temperature)
+        else:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+
+    def prewarm(self, specs: Iterable[Tuple[str, str, float]]):
+        """Create clients for (provider, model, temperature) specs ahead of the first request"""
+        for provider, model, temperature in specs:
+            self.get_client(provider, model, temperature)
+        print(f"LLM clients ready: {len(self._clients)}")
+
+    async def aprewarm_connections(self):
+        """Send a tiny request through each client so TLS/HTTP connections are open before users arrive"""
+        for key, client in list(self._clients.items()):
+            try:
+                await client.ainvoke("ping")
+            except Exception as e:
+                print(f"Warning: could not pre-warm LLM client {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "keys": [f"{provider}:{model}@{temperature}" for provider, model, temperature in self._clients]
+        }
+
+
+llm_gateway = LLMGateway()
+llm_client_registry = LLMClientRegistry()
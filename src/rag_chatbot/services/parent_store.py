@@ -0,0 +1,193 @@
+import json
+import mmap
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rag_chatbot.config import settings
+
+
+class ParentStore:
+    """Parent texts for small-to-big retrieval, read through a memory map.
+
+    Small child chunks are embedded and searched; the larger section or
+    whole WDL task each one was cut from (its parent) is what goes into the
+    prompt. Parent texts are appended to one UTF-8 data file and located by
+    a JSON index of parent id -> [offset, length, repo], so a lookup is a
+    slice of the mapped file and the texts never have to be held in memory
+    or in the vector store. Parent ids hash the full parent text (see
+    VectorService.parent_id), so re-ingesting an unchanged parent writes
+    nothing and an edited one is stored anew. Removed parents leave garbage in the
+    data file until compact() rewrites it. Another process (ingestion) may
+    append or compact; readers reload the index and remap the data file
+    when either of them changes.
+    """
+
+    def __init__(self, persist_directory: str = None, name: str = "parents"):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.data_path = os.path.join(persist_directory, f"{name}.dat")
+        self.index_path = os.path.join(persist_directory, f"{name}_index.json")
+        self.index: Dict[str, List] = {}
+        self._index_version = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        # (inode, size) of the data file when it was mapped
+        self._map_version = None
+        self._load_index()
+
+    @staticmethod
+    def _file_version(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+            return stat.st_ino, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            version = self._file_version(self.index_path)
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+            self._index_version = version
+            # Offsets may refer to a rewritten data file
+            self._close_map()
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load parent index {self.index_path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, parent_id: str) -> bool:
+        return parent_id in self.index
+
+    def put_many(self, parents: Iterable[Tuple[str, str, str]]) -> int:
+        """Append (parent id, text, repo) entries not stored yet; returns how many were written"""
+        new = [(parent_id, text.encode('utf-8'), repo) for parent_id, text, repo in parents
+               if parent_id not in self.index]
+        if not new:
+            return 0
+        os.makedirs(os.path.dirname(self.data_path) or '.', exist_ok=True)
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            for parent_id, data, repo in new:
+                f.write(data)
+                self.index[parent_id] = [offset, len(data), repo]
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(new)
+
+    def get_many(self, parent_ids: Iterable[str]) -> Dict[str, str]:
+        """Texts of the given parents (ids not in the store are left out)"""
+        self._refresh()
+        found = {}
+        for parent_id in parent_ids:
+            entry = self.index.get(parent_id)
+            if entry is None:
+                continue
+            offset, length = entry[0], entry[1]
+            view = self._view(offset + length)
+            if view is not None:
+                found[parent_id] = view[offset:offset + length].decode('utf-8')
+        return found
+
+    def get(self, parent_id: str) -> Optional[str]:
+        return self.get_many([parent_id]).get(parent_id)
+
+    def _refresh(self):
+        """Pick up an index another process saved"""
+        version = self._file_version(self.index_path)
+        if version is not None and version != self._index_version:
+            self._load_index()
+
+    def _view(self, end: int) -> Optional[mmap.mmap]:
+        """The mapped data file, remapped if it was replaced (compact()) or has grown"""
+        try:
+            stat = os.stat(self.data_path)
+        except OSError:
+            self._close_map()
+            return None
+        version = (stat.st_ino, stat.st_size)
+        if self._map is not None and self._map_version == version and len(self._map) >= end:
+            return self._map
+        self._close_map()
+        if stat.st_size < end:
+            return None
+        try:
+            self._file = open(self.data_path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_version = (os.fstat(self._file.fileno()).st_ino, len(self._map))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not map parent store {self.data_path}: {e}")
+            self._close_map()
+            return None
+        return self._map
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._map_version = None
+
+    def remove(self, parent_ids: Iterable[str]):
+        for parent_id in parent_ids:
+            self.index.pop(parent_id, None)
+
+    def remove_repo(self, repo: str, keep_ids: Iterable[str] = ()):
+        """Forget a repository's parents, except keep_ids"""
+        keep = set(keep_ids)
+        for parent_id in [pid for pid, entry in self.index.items() if entry[2] == repo and pid not in keep]:
+            del self.index[parent_id]
+
+    def garbage_ratio(self) -> float:
+        """Fraction of the data file no longer referenced by the index"""
+        try:
+            size = os.path.getsize(self.data_path)
+        except OSError:
+            return 0.0
+        live = sum(entry[1] for entry in self.index.values())
+        return 1.0 - live / size if size else 0.0
+
+    def compact(self):
+        """Rewrite the data file with only the parents still in the index"""
+        self._refresh()
+        tmp_path = f"{self.data_path}.tmp"
+        index = {}
+        with open(tmp_path, 'wb') as out:
+            offset = 0
+            if self.index:
+                view = self._view(max(entry[0] + entry[1] for entry in self.index.values()))
+                for parent_id, (start, length, repo) in sorted(self.index.items(), key=lambda item: item[1][0]):
+                    out.write(view[start:start + length])
+                    index[parent_id] = [offset, length, repo]
+                    offset += length
+            out.flush()
+            os.fsync(out.fileno())
+        self._close_map()
+        os.replace(tmp_path, self.data_path)
+        self.index = index
+        self.save()
+
+    def save(self):
+        """Write the index to disk atomically"""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self._index_version = self._file_version(self.index_path)
+
+    def clear(self):
+        self._close_map()
+        self.index = {}
+        for path in (self.data_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        self._close_map()
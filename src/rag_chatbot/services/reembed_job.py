@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from rag_chatbot.services.vector_service import VectorService
+
+
+class ReembedJob:
+    """Moves a VectorService to another embedding model on a background thread.
+
+    The job builds a shadow collection with VectorService.build_shadow()
+    while searches keep being served from the live collection, then (with
+    ``swap`` set) switches the alias over with swap_to(). With swap=False
+    the shadow is left "ready" to be swapped in later. The previous
+    collection is kept for rollback unless ``drop_previous`` is set.
+    """
+
+    def __init__(self, vector_service: VectorService, model_name: str, embeddings=None,
+                 batch_size: int = None, swap: bool = True, drop_previous: bool = False):
+        self.vector_service = vector_service
+        self.model_name = model_name
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.swap = swap
+        self.drop_previous = drop_previous
+        self.status = "pending"
+        self.embedded = 0
+        self.total: Optional[int] = None
+        self.shadow_name: Optional[str] = None
+        self.previous_name: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _progress(self, embedded: int, total: int):
+        self.embedded, self.total = embedded, total
+        if self.shadow_name is None and self.vector_service.shadow is not None:
+            self.shadow_name = self.vector_service.shadow.name
+
+    def _run(self):
+        self.status = "building"
+        try:
+            shadow = self.vector_service.build_shadow(self.model_name, self.embeddings, self.batch_size,
+                                                      progress=self._progress)
+            self.shadow_name = shadow.name
+            if self.swap:
+                self.status = "swapping"
+                self.previous_name = self.vector_service.swap_to(shadow.name)
+                if self.drop_previous:
+                    self.vector_service.drop_collection(self.previous_name)
+                self.status = "swapped"
+            else:
+                self.status = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+            print(f"✗ Re-embedding with {self.model_name} failed: {e}")
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def start(self) -> "ReembedJob":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="reembed", daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait for the job; True once it has finished"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished_at is not None
+
+    def progress(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.perf_counter()) - self.started_at) if self.started_at else 0.0
+        return {
+            "status": self.status,
+            "model": self.model_name,
+            "shadow": self.shadow_name,
+            "previous": self.previous_name,
+            "embedded": self.embedded,
+            "total": self.total,
+            "seconds": elapsed,
+            "chunks_per_s": self.embedded / elapsed if elapsed > 0 else 0.0,
+            "error": self.error,
+        }
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+from rag_chatbot.config import settings
+
+# Shesmu olives are anonymous; the names people ask about are Define'd olive
+# fragments, Functions and the actions an olive Runs
+_SHESMU_NAMES = re.compile(r'^[ \t]*(Define|Function)[ \t]+(\w+)|\bRun[ \t]+(\w+)', re.MULTILINE)
+_SHESMU_KINDS = {'Define': 'olive', 'Function': 'function'}
+
+# Identifiers in a question: `quoted`, camelCase, snake_case, with digits or followed by "("
+_BACKTICKED = re.compile(r'`([A-Za-z_][\w.]*)`')
+_WORD = re.compile(r'[A-Za-z_]\w*')
+_KIND_WORDS = {'task', 'workflow', 'function', 'method', 'class', 'olive', 'struct', 'def', 'action'}
+_STOPWORDS = {'a', 'an', 'the', 'this', 'that', 'my', 'our', 'your', 'which', 'what', 'does', 'do', 'is',
+              'of', 'in', 'for', 'to', 'and', 'or', 'show', 'me', 'explain', 'find', 'where', 'how'}
+
+
+def shesmu_names(content: str) -> List[Tuple[str, str]]:
+    """(name, kind) for every olive definition, function and run action in Shesmu source"""
+    names = []
+    for match in _SHESMU_NAMES.finditer(content):
+        if match.group(1):
+            names.append((match.group(2), _SHESMU_KINDS[match.group(1)]))
+        else:
+            names.append((match.group(3), 'action'))
+    return names
+
+
+def query_identifiers(query: str) -> List[str]:
+    """Words in a question that look like symbol names, in the order they appear.
+
+    Plain English words only count when quoted in backticks or when they sit
+    next to a kind word ("the align task", "workflow fastqc"), so ordinary
+    words do not pull in symbols that happen to share their name.
+    """
+    found = [m.group(1).rsplit('.', 1)[-1] for m in _BACKTICKED.finditer(query)]
+    words = [(m.group(), m.end()) for m in _WORD.finditer(query)]
+    for i, (word, end) in enumerate(words):
+        # Ordinary words are all-lowercase, all-caps or Capitalized letters; anything
+        # else has an underscore, a digit or camel-case humps
+        plain = word.isalpha() and (word.islower() or word.isupper() or word.istitle())
+        identifier_like = not plain or query.startswith('(', end)
+        near_kind = (
+            (i > 0 and words[i - 1][0].lower() in _KIND_WORDS)
+            or (i + 1 < len(words) and words[i + 1][0].lower() in _KIND_WORDS)
+        )
+        if (identifier_like or near_kind) and word.lower() not in _KIND_WORDS and word.lower() not in _STOPWORDS:
+            found.append(word)
+
+    unique = []
+    seen = set()
+    for name in found:
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            unique.append(name)
+    return unique
+
+
+class SymbolIndex:
+    """Exact name -> chunk id map for functions, classes, WDL tasks/workflows and Shesmu olives.
+
+    Built during ingestion from chunk metadata and kept as JSON next to the
+    vector store, so a lookup is a dict access rather than an embedding and
+    a nearest-neighbour search. Names are matched case-insensitively.
+    match_query() reloads the index when another process (ingestion) saved it.
+    """
+
+    def __init__(self, persist_directory: str = None):
+        if persist_directory is None:
+            persist_directory = settings.chromadb_path
+        self.path = os.path.join(persist_directory, "symbol_index.json")
+        # lowercased name -> [[chunk id, name, kind, repo name], ...]
+        self.entries: Dict[str, List[List[str]]] = {}
+        # (lowercased name, chunk id) of every posting, so add() need not scan a name's postings
+        self._postings: Set[Tuple[str, str]] = set()
+        self._mtime = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load symbol index {self.path}: {e}")
+            self.entries = {}
+        self._index_postings()
+
+    def _refresh(self):
+        """Pick up an index another process saved"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def _index_postings(self):
+        self._postings = {(key, entry[0]) for key, postings in self.entries.items() for entry in postings}
+
+    def save(self):
+        """Write the index to disk atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    @staticmethod
+    def symbols_for(content: str, metadata: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(name, kind) pairs a chunk defines, taken from its chunking metadata"""
+        symbols = []
+        if metadata.get('wdl_element_name'):
+            symbols.append((metadata['wdl_element_name'], metadata.get('wdl_element_type', 'wdl')))
+        if metadata.get('symbol_names'):
+            # every symbol of a chunk, several when small neighbours were packed together
+            symbols.extend(zip(metadata['symbol_names'], metadata['symbol_kinds']))
+        elif metadata.get('symbol_name'):
+            # chunks indexed before symbol_names existed joined packed names with commas
+            kind = metadata.get('symbol_kind', 'symbol')
+            for name in metadata['symbol_name'].split(', '):
+                symbols.append((name, kind))
+        if metadata.get('language') == 'shesmu' or metadata.get('file_type') == '.shesmu':
+            symbols.extend(shesmu_names(content))
+        return symbols
+
+    def add(self, doc_id: str, content: str, metadata: Dict[str, Any]):
+        """Index the symbols defined by one chunk"""
+        for name, kind in self.symbols_for(content, metadata):
+            key = name.lower()
+            if (key, doc_id) not in self._postings:
+                self._postings.add((key, doc_id))
+                self.entries.setdefault(key, []).append([doc_id, name, kind, metadata.get('repo_name', '')])
+
+    def add_many(self, records: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """Index (chunk id, content, metadata) records; returns how many names were added"""
+        before = len(self.entries)
+        for doc_id, content, metadata in records:
+            self.add(doc_id, content, metadata)
+        return len(self.entries) - before
+
+    def _retain(self, keep):
+        for key in list(self.entries):
+            remaining = [entry for entry in self.entries[key] if keep(entry)]
+            if remaining:
+                self.entries[key] = remaining
+            else:
+                del self.entries[key]
+        self._index_postings()
+
+    def remove_ids(self, ids: Iterable[str]):
+        """Drop postings for deleted chunks"""
+        ids = set(ids)
+        if ids:
+            self._retain(lambda entry: entry[0] not in ids)
+
+    def remove_repo(self, repo_name: str, keep_ids: Iterable[str] = ()):
+        """Drop a repository's postings, except for chunks listed in keep_ids"""
+        keep_ids = set(keep_ids)
+        self._retain(lambda entry: len(entry) < 4 or entry[3] != repo_name or entry[0] in keep_ids)
+
+    def clear(self):
+        self.entries = {}
+        self._postings = set()
+        self._mtime = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def lookup(self, name: str) -> List[Dict[str, str]]:
+        """Chunks defining exactly this name (case-insensitive)"""
+        return [
+            {"id": doc_id, "name": symbol, "kind": kind}
+            for doc_id, symbol, kind, *_ in self.entries.get(name.lower(), ())
+        ]
+
+    def match_query(self, query: str, max_hits_per_name: int = 3) -> List[Dict[str, str]]:
+        """Exact hits for every identifier mentioned in a question, in mention order"""
+        self._refresh()
+        hits = []
+        seen = set()
+        for identifier in query_identifiers(query):
+            postings = self.entries.get(identifier.lower())
+            if not postings:
+                continue
+            # Prefer definitions whose case matches what the user typed
+            exact = [p for p in postings if p[1] == identifier]
+            ordered = exact + [p for p in postings if p[1] != identifier]
+            for doc_id, symbol, kind, *_ in ordered[:max_hits_per_name]:
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    hits.append({"id": doc_id, "name": symbol, "kind": kind})
+        return hits
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,833 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Set
+
+import chromadb
+import numpy as np
+from chromadb.errors import NotFoundError
+
+
+class VectorBackend(ABC):
+    """Storage backend for a single collection of embedded chunks.
+
+    Query results are plain dicts with ``id``, ``content``, ``metadata`` and
+    ``distance`` (cosine distance), plus ``embedding`` when requested.
+    Filters use the Chroma ``where`` syntax so callers never need to know
+    which backend is serving them.
+    """
+
+    kind = "base"
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+            metadatas: List[Dict[str, Any]]):
+        """Add new records; ids must not already exist"""
+        pass
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+               metadatas: List[Dict[str, Any]]):
+        """Insert records, replacing any with the same id"""
+        pass
+
+    @abstractmethod
+    def query(self, embedding: List[float], n_results: int = 5, where: Dict[str, Any] = None,
+              include_embeddings: bool = False) -> List[Dict[str, Any]]:
+        """Return the nearest records to an embedding, best first"""
+        pass
+
+    @abstractmethod
+    def get(self, ids: List[str] = None, where: Dict[str, Any] = None, limit: int = None,
+            offset: int = None, include_documents: bool = True) -> List[Dict[str, Any]]:
+        """Fetch records by id and/or filter, without ranking"""
+        pass
+
+    @abstractmethod
+    def existing_ids(self, ids: List[str]) -> Set[str]:
+        """Return the subset of ids already stored"""
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None):
+        """Delete records by id list and/or metadata filter"""
+        pass
+
+    @abstractmethod
+    def ids_where(self, where: Dict[str, Any] = None, limit: int = None) -> List[str]:
+        """Ids of records matching a filter, without documents, metadata or embeddings"""
+        pass
+
+    def delete_where(self, where: Dict[str, Any], batch_size: int = 5000) -> int:
+        """Delete every record matching a filter in id batches; returns how many were deleted.
+
+        Only ids cross the backend boundary, and each delete is bounded in
+        size however large the matching set is.
+        """
+        deleted = 0
+        while True:
+            ids = self.ids_where(where, limit=batch_size)
+            if not ids:
+                return deleted
+            self.delete(ids=ids)
+            deleted += len(ids)
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of records in the collection"""
+        pass
+
+    @abstractmethod
+    def drop(self):
+        """Remove the collection and everything in it"""
+        pass
+
+    def rename(self, new_name: str):
+        """Give the collection a new name (used to swap a rebuilt collection into place)"""
+        self.name = new_name
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend-level information about the collection"""
+        return {
+            "backend": self.kind,
+            "collection_name": self.name,
+            "count": self.count()
+        }
+
+
+class ChromaBackend(VectorBackend):
+    """Backend over a Chroma collection"""
+
+    kind = "chroma"
+
+    def __init__(self, name: str, client):
+        super().__init__(name)
+        self.client = client
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            try:
+                self._collection = self.client.get_collection(name=self.name)
+                print(f"Using existing collection: {self.name}")
+            except Exception:
+                self._collection = self.client.create_collection(
+                    name=self.name,
+                    metadata={"hnsw:space": "cosine"}
+                )
+                print(f"Created new collection: {self.name}")
+        return self._collection
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def query(self, embedding, n_results=5, where=None, include_embeddings=False):
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        query_params = {
+            "query_embeddings": [embedding],
+            "n_results": n_results,
+            "include": include
+        }
+        if where:
+            query_params["where"] = where
+
+        try:
+            results = self.collection.query(**query_params)
+        except NotFoundError:
+            # Another process replaced the collection under this name (a rename); fetch it again
+            self._collection = self.client.get_collection(name=self.name)
+            results = self._collection.query(**query_params)
+
+        formatted = []
+        for i in range(len(results["ids"][0])):
+            record = {
+                "id": results["ids"][0][i],
+                "content": results["documents"][0][i],
+                "metadata": results["metadatas"][0][i],
+                "distance": results["distances"][0][i]
+            }
+            if include_embeddings:
+                record["embedding"] = results["embeddings"][0][i]
+            formatted.append(record)
+        return formatted
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include_documents=True):
+        include = ["metadatas", "documents"] if include_documents else ["metadatas"]
+        results = self.collection.get(ids=ids, where=where or None, limit=limit, offset=offset,
+                                      include=include)
+
+        documents = results.get("documents") or [None] * len(results["ids"])
+        return [
+            {"id": doc_id, "content": documents[i], "metadata": results["metadatas"][i]}
+            for i, doc_id in enumerate(results["ids"])
+        ]
+
+    def existing_ids(self, ids):
+        if not ids:
+            return set()
+        return set(self.collection.get(ids=list(ids), include=[])["ids"])
+
+    def ids_where(self, where=None, limit=None):
+        return self.collection.get(where=where or None, limit=limit, include=[])["ids"]
+
+    def delete(self, ids=None, where=None):
+        if ids is None and not where:
+            return
+        self.collection.delete(ids=ids, where=where or None)
+
+    def count(self):
+        return self.collection.count()
+
+    def drop(self):
+        try:
+            self.client.delete_collection(name=self.name)
+        finally:
+            self._collection = None
+
+    def rename(self, new_name):
+        self.collection.modify(name=new_name)
+        self.name = new_name
+
+    def stats(self):
+        stats = super().stats()
+        stats["metadata"] = self.collection.metadata or {}
+        return stats
+
+
+class InMemoryBackend(VectorBackend):
+    """NumPy backend that keeps every vector in one contiguous matrix.
+
+    Queries are a single matrix-vector product, so it is exact (no ANN
+    recall loss) and fast for corpora up to a few hundred thousand chunks.
+    Nothing is persisted.
+    """
+
+    kind = "memory"
+
+    def __init__(self, name: str, dimension: int = None):
+        super().__init__(name)
+        self.dimension = dimension
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+
+    def _ensure_capacity(self, extra: int, dimension: int):
+        if self._matrix is None:
+            self.dimension = self.dimension or dimension
+            self._matrix = np.zeros((max(extra, 1024), self.dimension), dtype=np.float32)
+        elif self._size + extra > self._matrix.shape[0]:
+            capacity = max(self._size + extra, self._matrix.shape[0] * 2)
+            grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _write(self, ids, embeddings, documents, metadatas, replace: bool):
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        if self.dimension and vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self.dimension}"
+            )
+
+        if not replace:
+            duplicates = [doc_id for doc_id in ids if doc_id in self._index]
+            if duplicates:
+                raise ValueError(f"IDs already exist in collection {self.name}: {duplicates[:5]}")
+
+        self._ensure_capacity(len(ids), vectors.shape[1])
+        for doc_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+            row = self._index.get(doc_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._index[doc_id] = row
+                self._ids.append(doc_id)
+                self._documents.append(document)
+                self._metadatas.append(dict(metadata or {}))
+            else:
+                self._documents[row] = document
+                self._metadatas[row] = dict(metadata or {})
+            self._matrix[row] = vector
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self._write(ids, embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self._write(ids, embeddings, documents, metadatas, replace=True)
+
+    def _filter_rows(self, where: Dict[str, Any] = None) -> np.ndarray:
+        if not where:
+            return np.arange(self._size)
+        return np.array(
+            [row for row in range(self._size) if matches_where(self._metadatas[row], where)],
+            dtype=np.int64
+        )
+
+    def query(self, embedding, n_results=5, where=None, include_embeddings=False):
+        if self._size == 0:
+            return []
+
+        rows = self._filter_rows(where)
+        if len(rows) == 0:
+            return []
+
+        query_vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        candidates = self._matrix[:self._size] if not where else self._matrix[rows]
+        similarities = candidates @ query_vector
+
+        k = min(n_results, len(rows))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+
+        formatted = []
+        for position in top:
+            row = int(rows[position])
+            record = {
+                "id": self._ids[row],
+                "content": self._documents[row],
+                "metadata": self._metadatas[row],
+                "distance": float(1.0 - similarities[position])
+            }
+            if include_embeddings:
+                record["embedding"] = self._matrix[row].copy()
+            formatted.append(record)
+        return formatted
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include_documents=True):
+        if ids is not None:
+            rows = [self._index[doc_id] for doc_id in ids if doc_id in self._index]
+            if where:
+                rows = [row for row in rows if matches_where(self._metadatas[row], where)]
+        else:
+            rows = self._filter_rows(where).tolist()
+
+        start = offset or 0
+        rows = rows[start:start + limit] if limit is not None else rows[start:]
+        return [
+            {
+                "id": self._ids[row],
+                "content": self._documents[row] if include_documents else None,
+                "metadata": self._metadatas[row]
+            }
+            for row in rows
+        ]
+
+    def existing_ids(self, ids):
+        return {doc_id for doc_id in ids if doc_id in self._index}
+
+    def ids_where(self, where=None, limit=None):
+        rows = self._filter_rows(where).tolist()
+        if limit is not None:
+            rows = rows[:limit]
+        return [self._ids[row] for row in rows]
+
+    def delete_where(self, where, batch_size=5000):
+        # Everything is in-process, so one pass over the rows is cheapest
+        before = self._size
+        self.delete(where=where)
+        return before - self._size
+
+    def delete(self, ids=None, where=None):
+        if ids is None and not where:
+            return
+
+        if ids is not None:
+            doomed = {self._index[doc_id] for doc_id in ids if doc_id in self._index}
+            if where:
+                doomed = {row for row in doomed if matches_where(self._metadatas[row], where)}
+        else:
+            doomed = set(self._filter_rows(where).tolist())
+
+        if not doomed:
+            return
+
+        keep = [row for row in range(self._size) if row not in doomed]
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self._ids = [self._ids[row] for row in keep]
+        self._documents = [self._documents[row] for row in keep]
+        self._metadatas = [self._metadatas[row] for row in keep]
+        self._index = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._size = len(keep)
+
+    def count(self):
+        return self._size
+
+    def drop(self):
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._index = {}
+        self._matrix = None
+        self._size = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats["dimension"] = self.dimension
+        stats["memory_bytes"] = int(self._matrix.nbytes) if self._matrix is not None else 0
+        return stats
+
+
+class NamespacedBackend(VectorBackend):
+    """One logical collection stored as several physical collections ("namespaces").
+
+    Writes are routed to a namespace by a function of the record's metadata
+    and reads fan out to every namespace, merging query results by
+    distance. Dropping a namespace (say, one repository) is a collection
+    drop however many records it holds, and a namespace can be rebuilt in a
+    staging collection and swapped in with a rename: between
+    begin_replace() and commit_replace() writes for it go to the staging
+    collection while reads keep being served from the live one.
+
+    Queries can be restricted to some namespaces and are sent to them
+    concurrently. With ``calibrate`` set, each namespace's distances are
+    mapped onto the distribution of distances across all namespaces
+    (running mean and standard deviation of the distances it has returned)
+    before merging, so a namespace whose records are all a little closer
+    to every query does not crowd out the others. Results then carry a
+    ``calibrated_distance`` that the merge is ordered by.
+
+    Namespaces are discovered with ``list_existing``. With a
+    ``generation_path``, every namespace created, dropped or swapped is
+    announced by rewriting that file, and instances in other processes
+    re-list their namespaces (and reopen their collections) when they see
+    it change.
+    """
+
+    kind = "namespaced"
+
+    # Distances a namespace must have returned before its calibration is used
+    CALIBRATION_MIN_SAMPLES = 50
+
+    def __init__(self, name: str, factory: Callable[[str], VectorBackend],
+                 route: Callable[[Dict[str, Any]], str], list_existing: Callable[[], List[str]] = None,
+                 max_workers: int = 4, calibrate: bool = False, generation_path: str = None):
+        super().__init__(name)
+        self.factory = factory
+        self.route = route
+        self.list_existing = list_existing
+        self.generation_path = generation_path
+        self.max_workers = max_workers
+        self.calibrate = calibrate
+        self.namespaces: Dict[str, VectorBackend] = {}
+        self._staging: Dict[str, VectorBackend] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # namespace -> [count, mean, sum of squared deviations] of returned distances (Welford)
+        self._distance_stats: Dict[str, List[float]] = {}
+        self._stats_lock = threading.Lock()
+        self._namespaces_lock = threading.Lock()
+        self._generation_version = self._file_version()
+        # Set when a query finds a namespace gone, to re-list before the next one
+        self._stale = False
+        if list_existing is not None:
+            self.namespaces = self._discover()
+
+    def _file_version(self) -> Optional[tuple]:
+        if self.generation_path is None:
+            return None
+        try:
+            stat = os.stat(self.generation_path)
+            return stat.st_ino, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def _discover(self) -> Dict[str, VectorBackend]:
+        prefix = f"{self.name}__"
+        namespaces = {}
+        for physical_name in self.list_existing():
+            if physical_name.startswith(prefix) and not physical_name.endswith(("__staging", "__retired")):
+                namespaces[physical_name[len(prefix):]] = self.factory(physical_name)
+        return namespaces
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-list namespaces if another process created, dropped or swapped one; True if it did"""
+        force = force or self._stale
+        if self.list_existing is None or (self.generation_path is None and not force):
+            return False
+        with self._namespaces_lock:
+            version = self._file_version()
+            if version == self._generation_version and not force:
+                return False
+            self._generation_version = version
+            self._stale = False
+            # Fresh backends too: a swapped namespace is a different collection under the same name
+            self.namespaces = self._discover()
+        with self._stats_lock:
+            for key in set(self._distance_stats) - set(self.namespaces):
+                del self._distance_stats[key]
+        return True
+
+    def _announce(self):
+        """Rewrite the generation file so other processes re-list namespaces"""
+        if self.generation_path is None:
+            return
+        with self._namespaces_lock:
+            os.makedirs(os.path.dirname(self.generation_path) or '.', exist_ok=True)
+            tmp_path = f"{self.generation_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"namespaces": sorted(self.namespaces)}, f)
+            os.replace(tmp_path, self.generation_path)
+            self._generation_version = self._file_version()
+
+    @staticmethod
+    def namespace_key(*parts: str) -> str:
+        """A key usable in a collection name (Chroma allows [A-Za-z0-9._-], at most 63 characters)"""
+        key = re.sub(r'[^A-Za-z0-9_-]+', '-', "-".join(parts)).strip('-_') or "default"
+        if len(key) > 40:
+            key = f"{key[:31]}-{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+        return key
+
+    def physical_name(self, key: str) -> str:
+        return f"{self.name}__{key}"
+
+    def _writer(self, key: str) -> VectorBackend:
+        if key in self._staging:
+            return self._staging[key]
+        if key not in self.namespaces:
+            self.namespaces[key] = self.factory(self.physical_name(key))
+        return self.namespaces[key]
+
+    def _write(self, method: str, ids, embeddings, documents, metadatas):
+        self.refresh()
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(self.route(metadata or {}), []).append(i)
+        created = False
+        for key, rows in groups.items():
+            created |= key not in self.namespaces and key not in self._staging
+            getattr(self._writer(key), method)(
+                ids=[ids[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows],
+                documents=[documents[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows]
+            )
+        if created:
+            self._announce()
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self._write("add", ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self._write("upsert", ids, embeddings, documents, metadatas)
+
+    def query(self, embedding, n_results=5, where=None, include_embeddings=False, namespaces=None):
+        """Top results across namespaces (all of them, or only the named ones that exist)"""
+        self.refresh()
+        if namespaces is None:
+            targets = list(self.namespaces.items())
+        else:
+            targets = [(key, self.namespaces[key]) for key in namespaces if key in self.namespaces]
+        if not targets:
+            return []
+
+        def search(target):
+            key, backend = target
+            try:
+                return key, backend.query(embedding, n_results=n_results, where=where,
+                                          include_embeddings=include_embeddings)
+            except NotFoundError:
+                # Dropped by another process since the last refresh: leave it out of this search
+                self._stale = True
+                return key, []
+
+        if len(targets) == 1 or self.max_workers <= 1:
+            per_namespace = [search(target) for target in targets]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"{self.name}-query")
+            per_namespace = list(self._executor.map(search, targets))
+
+        merged = []
+        if self.calibrate:
+            calibration = self._calibration([key for key, _ in per_namespace])
+            for key, records in per_namespace:
+                self._observe(key, [record["distance"] for record in records])
+                scale = calibration.get(key)
+                for record in records:
+                    record["namespace"] = key
+                    record["calibrated_distance"] = (
+                        scale[0] + scale[1] * record["distance"] if scale else record["distance"]
+                    )
+                merged.extend(records)
+            merged.sort(key=lambda record: record["calibrated_distance"])
+        else:
+            for key, records in per_namespace:
+                for record in records:
+                    record["namespace"] = key
+                merged.extend(records)
+            merged.sort(key=lambda record: record["distance"])
+        return merged[:n_results]
+
+    def _observe(self, key: str, distances: List[float]):
+        with self._stats_lock:
+            stats = self._distance_stats.setdefault(key, [0, 0.0, 0.0])
+            for distance in distances:
+                stats[0] += 1
+                delta = distance - stats[1]
+                stats[1] += delta / stats[0]
+                stats[2] += delta * (distance - stats[1])
+
+    def _calibration(self, keys: List[str]) -> Dict[str, tuple]:
+        """Per-namespace (offset, scale) mapping its distances onto the pooled distribution of the given namespaces"""
+        with self._stats_lock:
+            stats = {key: list(self._distance_stats[key]) for key in keys
+                     if key in self._distance_stats and self._distance_stats[key][0] >= self.CALIBRATION_MIN_SAMPLES}
+        if len(stats) < 2:
+            return {}
+        total = sum(n for n, _, _ in stats.values())
+        pooled_mean = sum(n * mean for n, mean, _ in stats.values()) / total
+        pooled_ss = sum(ss + n * (mean - pooled_mean) ** 2 for n, mean, ss in stats.values())
+        pooled_std = math.sqrt(pooled_ss / total)
+        calibration = {}
+        for key, (n, mean, ss) in stats.items():
+            std = math.sqrt(ss / n)
+            if std > 1e-9:
+                # pooled_mean + (d - mean) / std * pooled_std
+                scale = pooled_std / std
+                calibration[key] = (pooled_mean - mean * scale, scale)
+        return calibration
+
+    def calibration_stats(self) -> Dict[str, Dict[str, float]]:
+        """Running distance statistics per namespace"""
+        with self._stats_lock:
+            return {
+                key: {"samples": n, "mean": mean, "std": math.sqrt(ss / n) if n else 0.0}
+                for key, (n, mean, ss) in sorted(self._distance_stats.items())
+            }
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include_documents=True):
+        self.refresh()
+        skip = offset or 0
+        records = []
+        for key in sorted(self.namespaces):
+            if limit is not None and len(records) >= limit:
+                break
+            want = None if limit is None else skip + limit - len(records)
+            page = self.namespaces[key].get(ids=ids, where=where, limit=want, include_documents=include_documents)
+            if skip:
+                consumed = min(skip, len(page))
+                page = page[consumed:]
+                skip -= consumed
+            records.extend(page)
+        return records if limit is None else records[:limit]
+
+    def existing_ids(self, ids):
+        # Write-side check: for a namespace being rebuilt, what matters is the staging collection
+        self.refresh()
+        found = set()
+        for key, backend in list(self.namespaces.items()):
+            found |= self._staging.get(key, backend).existing_ids(ids)
+        for key, backend in self._staging.items():
+            if key not in self.namespaces:
+                found |= backend.existing_ids(ids)
+        return found
+
+    def ids_where(self, where=None, limit=None):
+        self.refresh()
+        ids = []
+        for backend in list(self.namespaces.values()):
+            ids.extend(backend.ids_where(where, limit=None if limit is None else limit - len(ids)))
+            if limit is not None and len(ids) >= limit:
+                break
+        return ids
+
+    def delete(self, ids=None, where=None):
+        self.refresh()
+        for backend in list(self.namespaces.values()):
+            backend.delete(ids=ids, where=where)
+
+    def delete_where(self, where, batch_size=5000):
+        self.refresh()
+        return sum(backend.delete_where(where, batch_size) for backend in list(self.namespaces.values()))
+
+    def count(self):
+        self.refresh()
+        return sum(backend.count() for backend in list(self.namespaces.values()))
+
+    def drop(self):
+        for key in list(self.namespaces):
+            self.drop_namespace(key)
+        for key in list(self._staging):
+            self.abort_replace(key)
+
+    def has_namespace(self, key: str) -> bool:
+        self.refresh()
+        return key in self.namespaces
+
+    def drop_namespace(self, key: str) -> int:
+        """Drop one namespace's collection; returns how many records it held"""
+        backend = self.namespaces.pop(key, None)
+        with self._stats_lock:
+            self._distance_stats.pop(key, None)
+        if backend is None:
+            return 0
+        count = backend.count()
+        backend.drop()
+        self._announce()
+        return count
+
+    def begin_replace(self, key: str):
+        """Start rebuilding a namespace: its writes go to an empty staging collection from now on"""
+        self.abort_replace(key)
+        staging = self.factory(self.physical_name(key) + "__staging")
+        try:
+            staging.drop()  # leftovers from an interrupted rebuild
+        except Exception:
+            pass
+        self._staging[key] = staging
+
+    def commit_replace(self, key: str):
+        """Swap the rebuilt staging collection in for the live one.
+
+        The live collection is renamed aside and only dropped once staging
+        holds its name. If a rename fails, the live collection is restored
+        and the rebuild stays staged, so it can be committed or aborted again.
+        """
+        staging = self._staging.pop(key)
+        live = self.namespaces.get(key)
+        live_name = self.physical_name(key)
+        retired_name = live_name + "__retired"
+        try:
+            if live is not None:
+                try:
+                    self.factory(retired_name).drop()  # leftovers from an interrupted swap
+                except Exception:
+                    pass
+                live.rename(retired_name)
+            try:
+                staging.rename(live_name)
+            except Exception:
+                if live is not None:
+                    live.rename(live_name)
+                raise
+        except Exception:
+            self._staging[key] = staging
+            raise
+
+        self.namespaces[key] = staging
+        with self._stats_lock:
+            self._distance_stats.pop(key, None)
+        self._announce()
+        if live is not None:
+            try:
+                live.drop()
+            except Exception as e:
+                print(f"Warning: Could not drop replaced collection {retired_name}: {e}")
+
+    def abort_replace(self, key: str):
+        staging = self._staging.pop(key, None)
+        if staging is not None:
+            staging.drop()
+
+    def stats(self):
+        self.refresh()
+        stats = super().stats()
+        stats["namespaces"] = {key: backend.count() for key, backend in sorted(self.namespaces.items())}
+        if self.calibrate:
+            stats["calibration"] = self.calibration_stats()
+        return stats
+
+
+def matches_where(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one metadata dict"""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for operator, expected in condition.items():
+            if operator == "$eq":
+                ok = value == expected
+            elif operator == "$ne":
+                ok = value != expected
+            elif operator == "$in":
+                ok = value in expected
+            elif operator == "$nin":
+                ok = value not in expected
+            elif operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                ok = {
+                    "$gt": value > expected,
+                    "$gte": value >= expected,
+                    "$lt": value < expected,
+                    "$lte": value <= expected,
+                }[operator]
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            if not ok:
+                return False
+    return True
+
+
+_chroma_clients: Dict[str, Any] = {}
+
+
+def _chroma_client(persist_directory: str):
+    if persist_directory not in _chroma_clients:
+        _chroma_clients[persist_directory] = chromadb.PersistentClient(path=persist_directory)
+    return _chroma_clients[persist_directory]
+
+
+def create_backend(kind: str, name: str, persist_directory: str = None) -> VectorBackend:
+    """Create a backend for one collection by name ("chroma" or "memory")"""
+    if kind == "chroma":
+        return ChromaBackend(name, _chroma_client(persist_directory))
+    elif kind == "memory":
+        return InMemoryBackend(name)
+    else:
+        raise ValueError(f"Unknown vector backend: {kind}")
+
+
+def create_namespaced_backend(kind: str, name: str, route: Callable[[Dict[str, Any]], str],
+                              persist_directory: str = None, max_workers: int = 4,
+                              calibrate: bool = False) -> NamespacedBackend:
+    """Create a NamespacedBackend whose namespaces are collections of the given kind
+
+    Chroma namespaces are shared with other processes on the same store, so
+    they are re-listed whenever ``<name>_namespaces.json`` there changes.
+    """
+    list_existing = None
+    generation_path = None
+    if kind == "chroma":
+        def list_existing():
+            return [getattr(collection, "name", collection)
+                    for collection in _chroma_client(persist_directory).list_collections()]
+        generation_path = os.path.join(persist_directory, f"{name}_namespaces.json")
+    return NamespacedBackend(name, lambda physical_name: create_backend(kind, physical_name, persist_directory),
+                             route, list_existing, max_workers=max_workers, calibrate=calibrate,
+                             generation_path=generation_path)
+
+
@@ -0,0 +1,657 @@
+import ast
+import bisect
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class CodeSymbol:
+    """A function, class or method and where it sits in the file"""
+    name: str
+    kind: str
+    start: int  # offset of the first line, including leading comments/decorators
+    end: int    # offset just past the last line
+    start_line: int = 0
+    end_line: int = 0
+    parent: str = ''
+    children: List['CodeSymbol'] = field(default_factory=list)
+
+
+@dataclass
+class CodeChunk:
+    text: str
+    start_line: int
+    end_line: int
+    symbol_name: str  # first symbol in the chunk ('' for code between symbols)
+    symbol_kind: str
+    parent_symbol: str
+    # Every symbol in the chunk, in file order; several when small neighbours were packed together
+    symbol_names: List[str] = field(default_factory=list)
+    symbol_kinds: List[str] = field(default_factory=list)
+
+
+class _LineCounter:
+    """Line numbers for offsets, counted from the previous query.
+
+    Queries arrive roughly in file order, so counting newlines between
+    consecutive offsets is linear overall and avoids splitting the file
+    into a list of lines.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.offset = 0
+        self.line = 1
+
+    def line_of(self, offset: int) -> int:
+        if offset >= self.offset:
+            self.line += self.content.count('\n', self.offset, offset)
+        else:
+            self.line -= self.content.count('\n', offset, self.offset)
+        self.offset = offset
+        return self.line
+
+
+def _line_start(content: str, offset: int) -> int:
+    return content.rfind('\n', 0, offset) + 1
+
+
+def _line_end(content: str, offset: int) -> int:
+    """Offset just past the newline ending the line that contains offset"""
+    newline = content.find('\n', offset)
+    return len(content) if newline < 0 else newline + 1
+
+
+def _leading_comment_start(content: str, start: int, prefixes: Tuple[str, ...]) -> int:
+    """Move a symbol's start up over the comment/decorator lines directly above it"""
+    while start > 0:
+        previous = _line_start(content, start - 1)
+        if not content[previous:start].lstrip().startswith(prefixes):
+            break
+        start = previous
+    return start
+
+
+def _number_lines(symbols: List[CodeSymbol], lines: _LineCounter):
+    for symbol in symbols:
+        symbol.start_line = lines.line_of(symbol.start)
+        _number_lines(symbol.children, lines)
+        symbol.end_line = lines.line_of(max(symbol.start, symbol.end - 1))
+
+
+# --- Python -----------------------------------------------------------------
+
+_PY_HEADER = re.compile(r'(def|class)[ \t]+(\w+)')
+
+
+@lru_cache(maxsize=32)
+def _py_block_end(indent: int):
+    """First line indented no deeper than `indent` that is not a comment or a closing bracket.
+
+    Searched in '\\n' + content: a literal first character lets re skip ahead
+    far faster than a MULTILINE ``^`` anchor.
+    """
+    return re.compile(r'\n[ \t]{0,%d}[^ \t\r\n#)\]}]' % indent)
+
+
+def python_symbols(content: str) -> List[CodeSymbol]:
+    """Top-level functions and classes, with their methods and nested classes.
+
+    Boundaries come from a scan of def/class headers and indentation,
+    widened to the decorators and comments directly above a symbol and to
+    comments indented under its body after its last statement. Where the
+    scan can be misled (an unclosed bracket or a backslash continuation
+    inside a block, a decorator spanning lines, quotes that confuse the
+    string scan) the file is parsed with ``ast`` instead; parsing every
+    file costs several times the scan. Definitions inside if/try/with
+    blocks count for the enclosing module or class; nested functions stay
+    part of the function that contains them.
+    """
+    symbols = _python_symbols(content)
+    _number_lines(symbols, _LineCounter(content))
+    return symbols
+
+
+_PY_NEWLINE = re.compile(r'\r\n?|\n')
+# Blocks whose definitions belong to the enclosing module or class
+_PY_COMPOUND = tuple(getattr(ast, name) for name in ('If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith',
+                                                     'Try', 'TryStar', 'Match') if hasattr(ast, name))
+# A quote next to a triple quote (or an escaped one) throws off _triple_quoted_spans
+_PY_AMBIGUOUS_QUOTES = ('\'"""', '"""\'', '"\'\'\'', '\'\'\'"', '\\"""', "\\'''")
+# So does a triple quote in a comment (or after a '#' inside a string, which costs only an ast parse)
+_PY_COMMENTED_QUOTES = re.compile(r'#[^\n]*?(?:"""|\'\'\')')
+
+
+def _python_symbols(content: str) -> List[CodeSymbol]:
+    scanned = _indented_python_symbols(content)
+    if not _scan_may_differ(content, scanned):
+        return scanned
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return scanned
+    # ast counts \r\n, \r and \n as line breaks
+    line_starts = [0]
+    line_starts.extend(match.end() for match in _PY_NEWLINE.finditer(content))
+    top_level: List[CodeSymbol] = []
+    _ast_symbols(content, tree.body, None, line_starts, top_level)
+    return top_level
+
+
+def _scan_may_differ(content: str, symbols: List[CodeSymbol]) -> bool:
+    """True if the indentation scan may have put a boundary where ast would not"""
+    # ast also breaks lines at a lone \r
+    if content.count('\r') != content.count('\r\n'):
+        return True
+    if any(quotes in content for quotes in _PY_AMBIGUOUS_QUOTES) or _PY_COMMENTED_QUOTES.search(content):
+        return True
+    # An unpaired triple quote sits inside a one-line string, so the spans are paired wrongly
+    if content.count('"""') % 2 or content.count("'''") % 2:
+        return True
+    return _blocks_may_differ(content, symbols, 0)
+
+
+def _blocks_may_differ(content: str, symbols: List[CodeSymbol], cursor: int) -> bool:
+    for symbol in symbols:
+        # Unbalanced brackets before a symbol: it may start inside the arguments of a decorator
+        # that _only_decorators miscounted (a bracket in a one-line string, say)
+        if _unbalanced_brackets(content[cursor:symbol.start]):
+            return True
+        # A block with unbalanced brackets or ending on a backslash was cut short at a continuation line
+        text = content[symbol.start:symbol.end]
+        if _unbalanced_brackets(text) or text.endswith('\\\n'):
+            return True
+        if symbol.children and _blocks_may_differ(content, symbol.children, symbol.start):
+            return True
+        cursor = symbol.end
+    return False
+
+
+def _unbalanced_brackets(text: str) -> bool:
+    return text.count('(') != text.count(')') or text.count('[') != text.count(']') or text.count('{') != text.count('}')
+
+
+def _ast_symbols(content: str, body: list, enclosing: Optional[CodeSymbol], line_starts: List[int],
+                 symbols: List[CodeSymbol]):
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            end = line_starts[node.end_lineno] if node.end_lineno < len(line_starts) else len(content)
+            kind = 'class' if isinstance(node, ast.ClassDef) else 'function'
+            symbol = CodeSymbol(
+                node.name,
+                'method' if enclosing and kind == 'function' else kind,
+                _leading_comment_start(content, line_starts[first_line - 1], ('#', '@')),
+                _trailing_comments_end(content, end, node.col_offset),
+                parent=enclosing.name if enclosing else ''
+            )
+            if kind == 'class':
+                _ast_symbols(content, node.body, symbol, line_starts, symbol.children)
+            symbols.append(symbol)
+        elif isinstance(node, _PY_COMPOUND):
+            for block in (node.body if hasattr(node, 'body') else [], getattr(node, 'orelse', []),
+                          getattr(node, 'finalbody', [])):
+                _ast_symbols(content, block, enclosing, line_starts, symbols)
+            for handler in getattr(node, 'handlers', []):
+                _ast_symbols(content, handler.body, enclosing, line_starts, symbols)
+            for case in getattr(node, 'cases', []):
+                _ast_symbols(content, case.body, enclosing, line_starts, symbols)
+    # try/except visits the else and finally blocks before the handlers; chunking needs file order
+    symbols.sort(key=lambda symbol: symbol.start)
+
+
+def _trailing_comments_end(content: str, end: int, indent: int) -> int:
+    """Extend a block over comment lines indented under it (blank lines only when a comment follows)"""
+    pos = end
+    while pos < len(content):
+        line_end = _line_end(content, pos)
+        line = content[pos:line_end]
+        stripped = line.lstrip()
+        if stripped.strip() and not (stripped.startswith('#') and len(line) - len(stripped) > indent):
+            break
+        pos = line_end
+        if stripped.strip():
+            end = pos
+    return end
+
+
+def _indented_python_symbols(content: str) -> List[CodeSymbol]:
+    """Symbols from def/class headers and indentation.
+
+    Headers inside triple-quoted strings are ignored. A continuation line
+    dedented to the header's level (a closing ``1)`` of a call, say) ends
+    the block early, which ast does not; _scan_may_differ catches that.
+    """
+    shifted = '\n' + content
+    strings = _triple_quoted_spans(content)
+    string_index = 0
+
+    top_level: List[CodeSymbol] = []
+    # Open blocks as (indent, symbol); symbol is None for blocks nested in a function
+    stack: List[Tuple[int, Optional[CodeSymbol]]] = []
+    previous_header = 0
+
+    for line_start, indent, match in _python_headers(content):
+        # Headers arrive in file order, so the string spans can be walked alongside them
+        while string_index < len(strings) and strings[string_index][1] <= line_start:
+            string_index += 1
+        if string_index < len(strings) and strings[string_index][0] <= line_start:
+            continue
+        # Decorators of this symbol can reach no further up than the previous header
+        decorator_floor, previous_header = previous_header, line_start
+
+        while stack and (stack[-1][0] >= indent or (stack[-1][1] is not None and stack[-1][1].end <= line_start)):
+            stack.pop()
+
+        enclosing = stack[-1][1] if stack else None
+        if stack and (enclosing is None or enclosing.kind != 'class'):
+            # Defined inside a function body: stays part of that function's chunk
+            stack.append((indent, None))
+            continue
+
+        kind = 'class' if match.group(1) == 'class' else 'function'
+        symbol = CodeSymbol(
+            match.group(2),
+            'method' if enclosing and kind == 'function' else kind,
+            _python_symbol_start(content, shifted, line_start, indent, strings, decorator_floor),
+            _python_block_end(content, shifted, match.end(), indent, strings, string_index),
+            parent=enclosing.name if enclosing else ''
+        )
+        (enclosing.children if enclosing else top_level).append(symbol)
+        stack.append((indent, symbol))
+
+    return top_level
+
+
+def _python_symbol_start(content: str, shifted: str, start: int, indent: int,
+                         strings: List[Tuple[int, int]], floor: int) -> int:
+    """Move a header's start up over the comments and decorators above it, including
+    decorators whose arguments span lines and blank lines between a decorator and the header"""
+    decorator_prefix = '\n' + content[start:start + indent] + '@'
+    while True:
+        start = _leading_comment_start(content, start, ('#', '@'))
+        # In shifted a line starting at offset k of content starts with its newline at k
+        decorator = shifted.rfind(decorator_prefix, floor, start + 1)
+        if decorator < 0 or _in_string(strings, decorator) or not _only_decorators(content, decorator, start, strings):
+            return start
+        start = decorator
+
+
+def _in_string(strings: List[Tuple[int, int]], pos: int) -> bool:
+    """True if pos lies inside one of the (start, end) triple-quoted spans"""
+    index = bisect.bisect_right(strings, (pos, float('inf'))) - 1
+    return index >= 0 and strings[index][0] < pos < strings[index][1]
+
+
+def _only_decorators(content: str, begin: int, end: int, strings: List[Tuple[int, int]]) -> bool:
+    """True if the lines from begin to end hold nothing but decorators, comments and blank lines"""
+    depth = 0
+    pos = begin
+    while pos < end:
+        line_end = _line_end(content, pos)
+        line = content[pos:line_end]
+        # Leave out the part of the line inside a triple-quoted string
+        string = bisect.bisect_left(strings, (line_end,)) - 1
+        if string >= 0 and strings[string][1] > pos:
+            string_start, string_end = strings[string]
+            line = content[pos:max(pos, string_start)] + content[min(string_end, line_end):line_end]
+        stripped = line.strip()
+        if not stripped or stripped[0] == '#':
+            pos = line_end
+            continue
+        if depth == 0 and stripped[0] != '@':
+            return False
+        depth += line.count('(') + line.count('[') + line.count('{')
+        depth -= line.count(')') + line.count(']') + line.count('}')
+        if depth < 0:
+            return False
+        pos = line_end
+    return depth == 0
+
+
+def _python_headers(content: str) -> List[Tuple[int, int, re.Match]]:
+    """(line start, indent, match) for each line that starts with def, async def or class.
+
+    Candidates come from str.find, which is several times faster than a
+    line-anchored regex over the whole file.
+    """
+    headers = []
+    for keyword in ('def ', 'class '):
+        pos = content.find(keyword)
+        while pos >= 0:
+            line_start = content.rfind('\n', 0, pos) + 1
+            prefix = content[line_start:pos]
+            if not prefix or prefix.isspace() or prefix.split() == ['async']:
+                match = _PY_HEADER.match(content, pos)
+                if match:
+                    headers.append((line_start, len(prefix) - len(prefix.lstrip()), match))
+            pos = content.find(keyword, pos + len(keyword))
+    headers.sort(key=lambda header: header[0])
+    return headers
+
+
+def _triple_quoted_spans(content: str) -> List[Tuple[int, int]]:
+    spans = []
+    pos = 0
+    double, single = content.find('"""'), content.find("'''")
+    while double >= 0 or single >= 0:
+        if single < 0 or 0 <= double < single:
+            start, quote = double, '"""'
+        else:
+            start, quote = single, "'''"
+        close = content.find(quote, start + 3)
+        pos = len(content) if close < 0 else close + 3
+        spans.append((start, pos))
+        if 0 <= double < pos:
+            double = content.find('"""', pos)
+        if 0 <= single < pos:
+            single = content.find("'''", pos)
+    return spans
+
+
+def _python_block_end(content: str, shifted: str, body_from: int, indent: int,
+                      strings: List[Tuple[int, int]], string_index: int) -> int:
+    """Offset just past the last line of the block whose header ends at body_from"""
+    pattern = _py_block_end(indent)
+    pos = body_from + 1  # positions in shifted are one past those in content
+    end = len(content)
+    while True:
+        match = pattern.search(shifted, pos)
+        if match is None:
+            break
+        first_char = match.end() - 2
+        while string_index < len(strings) and strings[string_index][1] <= first_char:
+            string_index += 1
+        # A line that opens a string is a statement of its own; one inside a string is not
+        if string_index < len(strings) and strings[string_index][0] < first_char:
+            pos = strings[string_index][1] + 1
+            continue
+        end = match.start()
+        break
+
+    # Back up to the block's last statement, then take the comments indented under it, as the ast path does
+    body_line_end = _line_end(content, body_from)
+    while end > body_line_end:
+        last_char = end
+        while last_char > body_line_end and content[last_char - 1] in ' \t\r\n':
+            last_char -= 1
+        if last_char == body_line_end:
+            end = body_line_end
+            break
+        end = _line_end(content, last_char - 1)
+        previous = _line_start(content, last_char - 1)
+        if not content[previous:end].lstrip().startswith('#'):
+            break
+        end = previous
+    return _trailing_comments_end(content, end, indent)
+
+
+# --- Java -------------------------------------------------------------------
+
+# Characters that may start a comment, a literal or a block; everything between them is skipped in C
+_JAVA_SPECIAL = re.compile(r'[/"\'{}]')
+_JAVA_STRING = re.compile(r'"""(?:[^\\]|\\.)*?"""|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'', re.DOTALL)
+_JAVA_LITERAL = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'', re.DOTALL)
+_JAVA_ANNOTATION = re.compile(r'@[\w.$]+(?:\s*\([^()]*\))?')
+_JAVA_TYPE = re.compile(r'\b(class|interface|enum|record)\s+([A-Za-z_$][\w$]*)')
+_JAVA_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*$')
+_JAVA_NOT_METHODS = {'if', 'for', 'while', 'switch', 'catch', 'synchronized', 'try', 'return', 'new', 'else', 'do'}
+
+
+def java_symbols(content: str) -> List[CodeSymbol]:
+    """Types, methods and constructors from one linear scan over Java source.
+
+    Only braces are tracked; comments and literals are skipped so their
+    braces do not count. The declaration header in front of a ``{`` (the
+    code since the previous ``;``, ``{`` or ``}``) is only examined at top
+    level and directly inside type bodies, so method bodies cost no more
+    than the scan. Raises ValueError on unbalanced braces.
+    """
+    symbols = _java_symbols(content)
+    _number_lines(symbols, _LineCounter(content))
+    return symbols
+
+
+def _java_symbols(content: str) -> List[CodeSymbol]:
+    top_level: List[CodeSymbol] = []
+    # One entry per open brace: the symbol it opened, or None for any other block
+    stack: List[Optional[CodeSymbol]] = []
+    boundary = 0  # end of the previous brace
+
+    pos = 0
+    while True:
+        match = _JAVA_SPECIAL.search(content, pos)
+        if match is None:
+            break
+        at = match.start()
+        char = content[at]
+        pos = at + 1
+
+        if char == '/':
+            following = content[pos:pos + 1]
+            if following == '/':
+                newline = content.find('\n', pos)
+                pos = len(content) if newline < 0 else newline
+            elif following == '*':
+                close = content.find('*/', pos + 1)
+                pos = len(content) if close < 0 else close + 2
+        elif char == '"' or char == "'":
+            string = _JAVA_STRING.match(content, at)
+            if string:
+                pos = string.end()
+        elif char == '{':
+            enclosing = stack[-1] if stack else None
+            symbol = None
+            # Declarations only count at top level or directly inside a type body
+            if not stack or (enclosing is not None and enclosing.kind not in ('method', 'constructor')):
+                symbol = _java_declaration(content, boundary, at, enclosing)
+                if symbol:
+                    (enclosing.children if enclosing else top_level).append(symbol)
+            stack.append(symbol)
+            boundary = pos
+        else:
+            if not stack:
+                raise ValueError("Unbalanced braces in Java source")
+            symbol = stack.pop()
+            if symbol:
+                symbol.end = _line_end(content, at)
+            boundary = pos
+
+    if stack:
+        raise ValueError("Unbalanced braces in Java source")
+    return top_level
+
+
+def _java_declaration(content: str, region_start: int, brace: int,
+                      enclosing: Optional[CodeSymbol]) -> Optional[CodeSymbol]:
+    """Symbol declared by the header in front of the brace at `brace`, if any"""
+    # Blank out comments and literals without moving offsets, then keep what follows the last statement
+    region = content[region_start:brace]
+    if '/' in region or '"' in region or "'" in region:
+        region = _JAVA_LITERAL.sub(lambda m: ' ' * len(m.group()), region)
+    header_offset = region.rfind(';') + 1
+    header = region[header_offset:]
+    stripped = header.lstrip()
+    if not stripped:
+        return None
+    header_start = region_start + header_offset + len(header) - len(stripped)
+
+    header = _JAVA_ANNOTATION.sub(' ', stripped).strip() if '@' in stripped else stripped.rstrip()
+    parent = enclosing.name if enclosing else ''
+
+    type_match = _JAVA_TYPE.search(header)
+    if type_match:
+        name, kind = type_match.group(2), type_match.group(1)
+    elif enclosing is None or '=' in header:
+        return None
+    else:
+        # name(params) [throws ...]: the identifier right before the parameter list
+        open_paren = header.find('(')
+        close_paren = header.rfind(')')
+        if open_paren <= 0 or close_paren < open_paren:
+            return None
+        trailer = header[close_paren + 1:].strip()
+        words = header[:open_paren].split()
+        if (trailer and not trailer.startswith('throws')) or not words:
+            return None
+        name = words[-1]
+        if not _JAVA_IDENTIFIER.match(name) or name in _JAVA_NOT_METHODS:
+            return None
+        kind = 'constructor' if name == enclosing.name else 'method'
+
+    start = _leading_comment_start(content, _line_start(content, header_start), ('//', '/*', '*'))
+    return CodeSymbol(name, kind, start, brace, parent=parent)
+
+
+# --- Chunking ---------------------------------------------------------------
+
+# Languages with a symbol scanner, and the line-comment prefix used to label chunks
+SYMBOL_LANGUAGES: Dict[str, str] = {'python': '#', 'java': '//'}
+
+
+@dataclass
+class _Piece:
+    start: int
+    end: int
+    name: str
+    kind: str
+    parent: str
+    label: str = ''        # line prepended to parts after the first of a sub-split symbol
+    packable: bool = True  # parts of a sub-split symbol are never packed with neighbours
+    members: Optional[List[Tuple[str, str]]] = None  # (name, kind) of each packed symbol
+
+    def symbols(self) -> List[Tuple[str, str]]:
+        if self.members is not None:
+            return self.members
+        return [(self.name, self.kind)] if self.name else []
+
+
+def chunk_code(content: str, language: str, max_chars: int) -> List[CodeChunk]:
+    """Chunk source along symbol boundaries.
+
+    A symbol that fits in max_chars stays whole. A larger class is broken
+    into its header and its members, each member's chunk starting with a
+    comment naming the class; symbols that are still too large are sub-split
+    at line boundaries, preferring blank lines. Consecutive small pieces
+    under the same parent are then packed together up to max_chars, so
+    files full of tiny functions do not turn into one chunk per function.
+
+    Raises ValueError if the source cannot be scanned.
+    """
+    comment_prefix = SYMBOL_LANGUAGES[language]
+    symbols = _python_symbols(content) if language == 'python' else _java_symbols(content)
+    pieces: List[_Piece] = []
+    _collect(content, symbols, 0, len(content), None, pieces, max_chars, comment_prefix)
+
+    lines = _LineCounter(content)
+    chunks = []
+    for piece in _pack(pieces, max_chars):
+        text = content[piece.start:piece.end]
+        if piece.label:
+            text = f"{piece.label}\n{text}"
+        # Members chunked apart from their class say which class they belong to
+        if piece.parent:
+            text = f"{comment_prefix} member of {piece.parent}\n{text}"
+        symbols = piece.symbols()
+        chunks.append(CodeChunk(
+            text,
+            lines.line_of(piece.start),
+            lines.line_of(max(piece.start, piece.end - 1)),
+            piece.name,
+            piece.kind,
+            piece.parent,
+            [name for name, _ in symbols],
+            [kind for _, kind in symbols]
+        ))
+    return chunks
+
+
+def _collect(content: str, symbols: List[CodeSymbol], region_start: int, region_end: int,
+             owner: Optional[CodeSymbol], pieces: List[_Piece], max_chars: int, comment_prefix: str):
+    # Code between symbols belongs to the enclosing class, or to the module at top level
+    gap = (owner.name, owner.kind, owner.parent) if owner else ('', 'module', '')
+    cursor = region_start
+    for symbol in symbols:
+        if symbol.start > cursor:
+            _emit(content, cursor, symbol.start, *gap, pieces, max_chars, comment_prefix)
+
+        start = max(cursor, symbol.start)
+        if symbol.end - start <= max_chars or not symbol.children:
+            _emit(content, start, symbol.end, symbol.name, symbol.kind, symbol.parent, pieces,
+                  max_chars, comment_prefix)
+        else:
+            first_child = max(_line_end(content, start), symbol.children[0].start)
+            _emit(content, start, first_child, symbol.name, symbol.kind, symbol.parent, pieces,
+                  max_chars, comment_prefix)
+            _collect(content, symbol.children, first_child, symbol.end, symbol, pieces, max_chars, comment_prefix)
+        cursor = max(cursor, symbol.end)
+
+    if cursor < region_end:
+        _emit(content, cursor, region_end, *gap, pieces, max_chars, comment_prefix)
+
+
+def _emit(content: str, start: int, end: int, name: str, kind: str, parent: str, pieces: List[_Piece],
+          max_chars: int, comment_prefix: str):
+    # Nothing to retrieve in blank lines or the closing brace left over after a split class
+    if end <= start or not content[start:end].strip(' \t\r\n};'):
+        return
+    if end - start <= max_chars:
+        pieces.append(_Piece(start, end, name, kind, parent))
+        return
+
+    # Oversized symbol: split it at line boundaries, labelling later parts with the symbol
+    parts = _split_lines(content, start, end, max_chars)
+    for part_index, (part_start, part_end) in enumerate(parts):
+        label = f"{comment_prefix} {kind} {name} (part {part_index + 1}/{len(parts)})" if part_index and name else ''
+        pieces.append(_Piece(part_start, part_end, name, kind, parent, label, packable=False))
+
+
+def _split_lines(content: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """Consecutive ranges of at most max_chars, cut after a blank line near the limit where possible"""
+    ranges = []
+    while start < end:
+        cut = end
+        if end - start > max_chars:
+            limit = start + max_chars
+            cut = content.rfind('\n', start, limit) + 1
+            if cut <= start:
+                # A single line longer than a chunk (generated data, minified code)
+                cut = limit
+            else:
+                blank = content.rfind('\n\n', start + max_chars // 2, cut)
+                if blank >= 0:
+                    cut = blank + 2
+        if content[start:cut].strip():
+            ranges.append((start, cut))
+        start = cut
+    return ranges
+
+
+def _pack(pieces: List[_Piece], max_chars: int) -> List[_Piece]:
+    packed: List[_Piece] = []
+    group: List[_Piece] = []
+
+    def flush():
+        if not group:
+            return
+        if len(group) == 1:
+            packed.append(group[0])
+        else:
+            # Named after the first symbol; every symbol is kept in members
+            members = list(dict.fromkeys(symbol for piece in group for symbol in piece.symbols()))
+            name, kind = members[0] if members else ('', group[0].kind)
+            packed.append(_Piece(group[0].start, group[-1].end, name, kind, group[0].parent, members=members))
+        group.clear()
+
+    for piece in pieces:
+        if not piece.packable:
+            flush()
+            packed.append(piece)
+            continue
+        if not group or piece.end - group[0].start > max_chars or group[0].parent != piece.parent:
+            flush()
+        group.append(piece)
+    flush()
+    return packed
@@ -0,0 +1,200 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+# Bytes read to decide whether a file is text
+SNIFF_BYTES = 8192
+# Control characters that do not occur in text files (NUL is checked separately)
+_NON_TEXT = bytes(set(range(32)) - {7, 8, 9, 10, 12, 13, 27})
+
+
+@dataclass
+class WalkedFile:
+    """A file found by walk_files, with the stat information scandir already had"""
+    path: str           # absolute path
+    relative_path: str  # path below the walk root, '/' separated
+    name: str
+    size: int
+
+
+class GitignoreRules:
+    """The patterns of one .gitignore file, matched against paths relative to its directory.
+
+    Supports the parts of the gitignore syntax repositories actually use:
+    ``*``/``?``/``[...]`` globs, ``**`` across directories, ``!`` negation,
+    a trailing ``/`` for directories only and a leading or inner ``/`` to
+    anchor the pattern to the .gitignore's directory.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, directories only)
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            if line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            regex = _glob_to_regex(line)
+            if not anchored:
+                regex = f'(?:.*/)?{regex}'
+            self.rules.append((re.compile(f'{regex}\\Z', re.DOTALL), negated, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional['GitignoreRules']:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a ``!`` rule, None if no rule applies"""
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                result = not negated
+        return result
+
+
+def _glob_to_regex(pattern: str) -> str:
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+                continue
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            close = pattern.find(']', i + 1)
+            if close == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = close
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return ''.join(parts)
+
+
+def walk_files(
+    root: str,
+    exclude_dirs: Set[str] = frozenset(),
+    exclude_paths: Set[str] = frozenset(),
+    use_gitignore: bool = True
+) -> Iterator[WalkedFile]:
+    """Yield every regular file below root in sorted order without entering excluded directories.
+
+    ``exclude_dirs`` are directory names pruned wherever they appear,
+    ``exclude_paths`` are '/'-separated relative directory paths pruned at
+    that location. ``.gitignore`` files are honoured at every level, with
+    deeper files taking precedence. Symlinks are not followed.
+    """
+    root = os.path.abspath(root)
+    # (directory, relative prefix, gitignore rules in effect as (base prefix, rules))
+    stack = [(root, '', [])]
+    while stack:
+        directory, prefix, rules = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        if use_gitignore and any(entry.name == '.gitignore' for entry in entries):
+            local = GitignoreRules.from_file(os.path.join(directory, '.gitignore'))
+            if local is not None:
+                rules = rules + [(prefix, local)]
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = prefix + entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+
+            if is_dir and (entry.name in exclude_dirs or relative_path in exclude_paths):
+                continue
+            if rules and _ignored(rules, relative_path, is_dir):
+                continue
+
+            if is_dir:
+                subdirectories.append((entry.path, relative_path + '/', rules))
+            else:
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                yield WalkedFile(entry.path, relative_path, entry.name, size)
+
+        # Reversed so the stack pops directories in sorted order
+        stack.extend(reversed(subdirectories))
+
+
+def _ignored(rules: List[Tuple[str, GitignoreRules]], relative_path: str, is_dir: bool) -> bool:
+    # The deepest .gitignore with an opinion wins
+    for base, gitignore in reversed(rules):
+        verdict = gitignore.match(relative_path[len(base):], is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+def is_binary(head: bytes) -> bool:
+    """Guess whether a file is binary from its first bytes (NUL bytes or mostly control characters)"""
+    if not head:
+        return False
+    if b'\0' in head:
+        return True
+    return len(head.translate(None, _NON_TEXT)) < len(head) * 0.9
+
+
+def read_text_file(path: str, max_bytes: int) -> Optional[str]:
+    """Read a file as UTF-8 text; None if it is binary, larger than max_bytes or unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes + 1)
+    except OSError as e:
+        print(f"  Error reading {path}: {e}")
+        return None
+    if len(data) > max_bytes or is_binary(data[:SNIFF_BYTES]):
+        return None
+    return data.decode('utf-8', errors='ignore')
+
+
+def read_text_files(paths: List[str], max_bytes: int, workers: int = 8) -> List[Optional[str]]:
+    """read_text_file for many paths on a thread pool, results in input order"""
+    if workers <= 1 or len(paths) < 2:
+        return [read_text_file(path, max_bytes) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_text_file, paths, [max_bytes] * len(paths)))
@@ -0,0 +1,286 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urljoin, urldefrag
+
+import lxml.html
+
+# Main-content containers, most specific first (ReadTheDocs / Sphinx themes, then generic HTML5)
+CONTENT_XPATHS = [
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' rst-content ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' document ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' body ')]",
+    "//main",
+    "//article",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+    "//div[@id='main-content']",
+]
+
+# Navigation and page chrome, removed from the content tree before conversion
+_REMOVE_TAGS = ['nav', 'footer', 'header', 'aside', 'script', 'style', 'noscript', 'form', 'button']
+_REMOVE_CLASSES = [
+    'navigation', 'nav', 'sidebar', 'toctree-wrapper', 'breadcrumb', 'breadcrumbs', 'edit-on-github',
+    'version-selector', 'search-box', 'social-links', 'prev-next-buttons', 'page-nav', 'site-footer',
+    'admonition-title', 'headerlink', 'rst-footer-buttons', 'wy-breadcrumbs',
+]
+_REMOVE_XPATH = " | ".join(
+    [f".//{tag}" for tag in _REMOVE_TAGS]
+    + [f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]" for cls in _REMOVE_CLASSES]
+)
+
+# Footer text that survives in some themes outside the elements above
+_BOILERPLATE_LINE = re.compile(
+    r'^\s*(Edit on GitHub|Previous\s*Next|© Copyright.*|Built with.*Sphinx.*|Hosted on.*Read the Docs.*)\s*$',
+    re.IGNORECASE
+)
+
+# Opening or closing line of a code block, also inside list items and quotes
+_FENCE = re.compile(r'[ \t>]*(?:(?:[-*]|\d+\.) +)?(`{3,})')
+
+_BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'ul', 'ol', 'pre', 'table', 'blockquote', 'dl', 'dt', 'dd',
+    'hr', 'figure', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'details', 'summary', 'center',
+}
+_HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_WHITESPACE = re.compile(r'\s+')
+_CODE_LANGUAGE = re.compile(r'\b(?:highlight|language|lang)-([\w+#-]+)')
+_PLAIN_LANGUAGES = {'default', 'none', 'text', 'console'}
+
+
+@dataclass
+class HtmlPage:
+    """A documentation page converted by html_to_markdown"""
+    title: str                # first <h1>, <title> or og:title ('' if none)
+    markdown: str             # main content, headings kept as '#' lines
+    links: List[str] = field(default_factory=list)  # absolute link targets, fragments removed
+
+
+def html_to_markdown(html, base_url: str = "") -> Optional[HtmlPage]:
+    """
+    Convert a documentation page to markdown in a single parse
+
+    Links are collected from the whole page, the main content container is
+    located, navigation and chrome nodes are removed from the tree and the
+    rest is written out as markdown that keeps headings, lists, code blocks
+    (with their language), tables and emphasis. Returns None for an empty
+    document.
+    """
+    if not html or not html.strip():
+        return None
+    try:
+        root = lxml.html.document_fromstring(html)
+    except Exception:
+        return None
+
+    links = sorted({
+        urldefrag(urljoin(base_url, href.strip()))[0]
+        for href in root.xpath("//a/@href")
+        if href.strip() and not href.strip().startswith(('#', 'mailto:', 'javascript:'))
+    })
+
+    title = _first_text(root, ["//h1", "//title"])
+    if not title:
+        og_title = root.xpath("//meta[@property='og:title']/@content")
+        title = og_title[0].strip() if og_title else ""
+
+    content = _content_root(root)
+    if content is None:
+        return None
+    for element in content.xpath(_REMOVE_XPATH):
+        if element.getparent() is not None:
+            element.drop_tree()
+
+    renderer = _MarkdownRenderer(base_url)
+    markdown = _tidy("\n\n".join(renderer.blocks(content)))
+    return HtmlPage(title=title, markdown=markdown, links=links)
+
+
+def _tidy(markdown: str) -> str:
+    """Drop footer boilerplate lines and repeated blank lines outside fenced code blocks"""
+    lines = []
+    fence = None  # backticks of the open code block
+    for line in markdown.split("\n"):
+        match = _FENCE.match(line)
+        if fence is not None:
+            lines.append(line)
+            if match and match.group(1) == fence and not line[match.end():].strip():
+                fence = None
+        elif match:
+            fence = match.group(1)
+            lines.append(line)
+        elif not _BOILERPLATE_LINE.match(line) and (line or not lines or lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _first_text(root, xpaths: List[str]) -> str:
+    for xpath in xpaths:
+        for element in root.xpath(xpath):
+            # Heading permalinks ("¶") are not part of the title
+            text = _WHITESPACE.sub(" ", element.text_content()).replace("¶", "").strip()
+            if len(text) > 3:
+                return text
+    return ""
+
+
+def _content_root(root):
+    for xpath in CONTENT_XPATHS:
+        found = root.xpath(xpath)
+        if found:
+            return found[0]
+    # Last resort: the div with the most text, else the body
+    divs = root.xpath("//div")
+    if divs:
+        return max(divs, key=lambda div: len(div.text_content().strip()))
+    body = root.find("body")
+    return body if body is not None else root
+
+
+class _MarkdownRenderer:
+    """Walks an lxml element tree once, producing markdown blocks"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def blocks(self, element) -> List[str]:
+        """Markdown blocks for an element's children (text runs become paragraphs)"""
+        blocks: List[str] = []
+        inline: List[str] = []
+
+        def flush():
+            text = _WHITESPACE.sub(" ", "".join(inline)).strip()
+            if text:
+                blocks.append(text)
+            inline.clear()
+
+        if element.text:
+            inline.append(element.text)
+        for child in element:
+            tag = child.tag if isinstance(child.tag, str) else None
+            if tag in _BLOCK_TAGS:
+                flush()
+                block = self.block(child)
+                if block:
+                    blocks.append(block)
+            elif tag == 'br':
+                flush()
+            elif tag is not None:
+                inline.append(self.inline(child))
+            if child.tail:
+                inline.append(child.tail)
+        flush()
+        return blocks
+
+    def block(self, element) -> str:
+        tag = element.tag
+        if tag in _HEADINGS:
+            text = _WHITESPACE.sub(" ", self.inline_children(element)).strip()
+            return f"{'#' * _HEADINGS[tag]} {text}" if text else ""
+        if tag == 'pre':
+            return self.code_block(element)
+        if tag in ('ul', 'ol'):
+            return self.list_block(element, ordered=tag == 'ol')
+        if tag == 'table':
+            return self.table(element)
+        if tag == 'blockquote':
+            inner = "\n\n".join(self.blocks(element))
+            return "\n".join(f"> {line}" if line else ">" for line in inner.split("\n"))
+        if tag == 'hr':
+            return "---"
+        if tag == 'dt':
+            text = _WHITESPACE.sub(" ", self.inline_children(element)).strip()
+            return f"**{text}**" if text else ""
+        if tag == 'li':
+            return self.list_block_items([element], ordered=False)
+        return "\n\n".join(self.blocks(element))
+
+    def code_block(self, element) -> str:
+        code = element.text_content().strip("\n")
+        if not code.strip():
+            return ""
+        language = ""
+        node = element
+        for _ in range(3):
+            if node is None:
+                break
+            match = _CODE_LANGUAGE.search(node.get('class') or "")
+            if match and match.group(1).lower() not in _PLAIN_LANGUAGES:
+                language = match.group(1).lower()
+                break
+            node = node.getparent()
+        fence = "````" if "```" in code else "```"
+        return f"{fence}{language}\n{code}\n{fence}"
+
+    def list_block(self, element, ordered: bool) -> str:
+        items = [child for child in element if child.tag == 'li']
+        return self.list_block_items(items, ordered)
+
+    def list_block_items(self, items, ordered: bool) -> str:
+        lines = []
+        for number, item in enumerate(items, 1):
+            marker = f"{number}. " if ordered else "- "
+            body = "\n".join(self.blocks(item))
+            if not body:
+                continue
+            indent = " " * len(marker)
+            item_lines = body.split("\n")
+            lines.append(marker + item_lines[0])
+            lines.extend(indent + line if line else "" for line in item_lines[1:])
+        return "\n".join(lines)
+
+    def table(self, element) -> str:
+        rows = []
+        for row in element.iter('tr'):
+            cells = [
+                _WHITESPACE.sub(" ", self.inline_children(cell)).strip().replace("|", "\\|")
+                for cell in row if cell.tag in ('th', 'td')
+            ]
+            if cells:
+                rows.append(cells)
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+        return "\n".join(lines)
+
+    def inline_children(self, element) -> str:
+        parts = [element.text or ""]
+        for child in element:
+            if isinstance(child.tag, str):
+                parts.append(" " if child.tag in _BLOCK_TAGS else "")
+                parts.append(self.inline(child))
+            parts.append(child.tail or "")
+        return "".join(parts)
+
+    def inline(self, element) -> str:
+        tag = element.tag
+        if tag in ('code', 'tt', 'kbd', 'samp'):
+            text = _WHITESPACE.sub(" ", element.text_content()).strip()
+            return f"`{text}`" if text else ""
+        if tag == 'br':
+            return "\n"
+        if tag == 'img':
+            return ""
+        inner = self.inline_children(element)
+        if not inner.strip():
+            return inner
+        if tag in ('strong', 'b'):
+            return self._wrap(inner, "**")
+        if tag in ('em', 'i'):
+            return self._wrap(inner, "*")
+        if tag == 'a':
+            href = (element.get('href') or "").strip()
+            if href and not href.startswith(('#', 'javascript:')):
+                text = _WHITESPACE.sub(" ", inner).strip()
+                return f"[{text}]({urljoin(self.base_url, href)})"
+        return inner
+
+    @staticmethod
+    def _wrap(text: str, marker: str) -> str:
+        """Emphasis markers hugging the text, whitespace kept outside"""
+        stripped = text.strip()
+        leading = text[:len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()):]
+        return f"{leading}{marker}{stripped}{marker}{trailing}"
@@ -0,0 +1,43 @@
+from typing import List, Sequence
+
+import numpy as np
+
+
+def mmr_select(relevance: Sequence[float], embeddings, k: int, lambda_mult: float = 0.7) -> List[int]:
+    """
+    Maximal marginal relevance: indices of k candidates, in selection order
+
+    Each step picks the candidate maximising
+    ``lambda_mult * relevance - (1 - lambda_mult) * max similarity to those already picked``,
+    so near-duplicates of a chosen chunk drop down the list. ``relevance``
+    is the candidates' similarity to the query and ``embeddings`` their
+    vectors (an (n, d) array or a list of vectors; normalised here). The
+    candidate-candidate similarity matrix is computed in one matrix
+    product and each step is a few vector operations over n values.
+    lambda_mult=1 keeps the relevance order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+    similarity = vectors @ vectors.T
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)  # max similarity to the selected set
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, similarity[pick], out=redundancy)
+    return selected
@@ -0,0 +1,216 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from rag_chatbot.config import settings
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+
+def _thread_stack(frame) -> list:
+    """Frame names from the outermost call down to `frame`"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return names[::-1]
+
+
+def _await_stack(coro) -> list:
+    """Frame names along a suspended coroutine's await chain, outermost first"""
+    names = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return names
+
+
+class StackSampler:
+    """Samples a thread's Python stack from a background thread, as collapsed stacks.
+
+    Every `interval` seconds it records the stack of `thread_id`. When that
+    thread is an event loop waiting in select() and `coro` is given, it
+    records where the coroutine is suspended instead, under "[awaiting]",
+    so time spent waiting on the LLM or a lock shows up in the profile.
+    Other coroutines that run on the same loop while it is being sampled
+    appear in the samples too.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, coro=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.coro = coro
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = _thread_stack(frame)
+        if self.coro is not None and stack and stack[-1].endswith(':select'):
+            awaiting = _await_stack(self.coro)
+            if awaiting:
+                stack = ['[awaiting]'] + awaiting
+        self.samples[';'.join(stack)] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+
+def write_collapsed(path: str, samples: Counter, header: str = ""):
+    """Write "frame;frame;frame count" lines (flamegraph.pl, speedscope and inferno read these)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        if header:
+            f.write(f"# {header}\n")
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def query_hash(text: str) -> str:
+    """Short stable tag for a query, so profiles can be grouped without storing the question"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]
+
+
+class RequestProfiler:
+    """Profiles the next N chat requests with a StackSampler when armed.
+
+    Armed from PROFILE_REQUESTS at startup or with the /profile command.
+    While disarmed the only cost per request is reading `remaining`. Each
+    profiled request writes <timestamp>_<agent type>_<query hash>.collapsed
+    to settings.profile_dir.
+    """
+
+    def __init__(self, output_dir: str = None, interval: float = None):
+        self.output_dir = output_dir or settings.profile_dir
+        self.interval = settings.profile_interval if interval is None else interval
+        self.remaining = 0
+        self.written = []
+        self._lock = threading.Lock()
+
+    def arm(self, requests: int) -> int:
+        with self._lock:
+            self.remaining = max(0, min(requests, settings.profile_max_requests))
+            return self.remaining
+
+    def disarm(self):
+        with self._lock:
+            self.remaining = 0
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    async def run(self, coro, agent_type: str, query: str):
+        """Await `coro`, sampling the event loop thread if a profiling slot is left"""
+        if not self._claim():
+            return await coro
+        sampler = StackSampler(threading.get_ident(), self.interval, coro).start()
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            elapsed = time.perf_counter() - start
+            samples = sampler.stop()
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            path = os.path.join(self.output_dir, f"{stamp}_{agent_type}_{query_hash(query)}.collapsed")
+            try:
+                write_collapsed(path, samples, f"agent={agent_type} query={query_hash(query)} "
+                                               f"wall={elapsed * 1000:.0f}ms interval={self.interval * 1000:.1f}ms")
+                self.written.append(path)
+                print(f"Profile written: {path} ({sum(samples.values())} samples, {elapsed * 1000:.0f} ms)")
+            except OSError as e:
+                print(f"Warning: Could not write profile {path}: {e}")
+
+
+class MemoryTracer:
+    """tracemalloc snapshots at ingestion checkpoints.
+
+    checkpoint() does nothing until start() is called (--trace-memory or
+    PROFILE_INGESTION_MEMORY). Each checkpoint writes the top allocation
+    sites as text and the raw snapshot (load it with
+    tracemalloc.Snapshot.load to diff two of them) to settings.profile_dir,
+    then resets the peak, so each checkpoint's peak covers only its own step.
+    """
+
+    def __init__(self, output_dir: str = None, frames: int = None, top: int = 30):
+        self.output_dir = output_dir or settings.profile_dir
+        self.frames = settings.profile_tracemalloc_frames if frames is None else frames
+        self.top = top
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        print(f"Tracing allocations; snapshots go to {self.output_dir}")
+
+    def checkpoint(self, label: str) -> Optional[str]:
+        """Write a snapshot of live allocations; returns the report path"""
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        safe_label = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in label)
+        base = os.path.join(self.output_dir, f"{stamp}_{safe_label}")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            snapshot.dump(f"{base}.tracemalloc")
+            with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                f.write(f"{label}: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+                for stat in snapshot.statistics('traceback')[:self.top]:
+                    f.write(f"{stat.size / 1e6:8.2f} MB {stat.count:8d} blocks\n")
+                    for line in stat.traceback.format(limit=5, most_recent_first=True):
+                        f.write(f"    {line}\n")
+        except OSError as e:
+            print(f"Warning: Could not write memory snapshot {base}: {e}")
+            return None
+        tracemalloc.reset_peak()
+        print(f"Memory snapshot {label}: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB -> {base}.txt")
+        return f"{base}.txt"
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+# Process-wide instances; the chat app and ingestion scripts share the settings
+request_profiler = RequestProfiler()
+if settings.profile_requests:
+    request_profiler.arm(settings.profile_requests)
+ingestion_memory = MemoryTracer()
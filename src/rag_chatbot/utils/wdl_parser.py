@@ -0,0 +1,145 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Characters/keywords that can change brace nesting; everything between them is skipped in C
+_SPECIAL = re.compile(r'[#"\'{}]|\b(?:command|task|workflow|struct)\b')
+# Quoted strings stop at end of line so a stray apostrophe cannot swallow the rest of a file
+_STRING = re.compile(r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'')
+_COMMAND = re.compile(r'command\s*(\{|<<<)')
+_HEADER = re.compile(r'(task|workflow|struct)\s+(\w+)\s*\{')
+# What can change nesting inside a ``command { }`` section: braces, and quotes around shell strings
+_COMMAND_SPECIAL = re.compile(r'[{}"\']')
+
+
+@dataclass
+class WDLBlock:
+    """A top-level task, workflow or struct and where it sits in the file"""
+    kind: str
+    name: str
+    start: int  # character offset of the keyword
+    end: int    # character offset just past the closing brace
+    start_line: int
+    end_line: int
+    start_byte: int  # the same range in the UTF-8 encoded file
+    end_byte: int
+
+    def text(self, content: str) -> str:
+        return content[self.start:self.end]
+
+
+def extract_wdl_blocks(content: str) -> List[WDLBlock]:
+    """Find every top-level task/workflow/struct block in one pass.
+
+    Braces inside comments, string literals, ``command <<< >>>`` heredocs and
+    ``command { }`` sections do not affect nesting. In a ``command { }``
+    section, braces in quoted shell strings on one line (``sed 's/{//'``)
+    are skipped; if the section still never closes, it is scanned as
+    ordinary WDL instead. A block left open by an unbalanced brace ends
+    where the next task/workflow/struct starts a line (they cannot nest),
+    or at the end of the file, so it cannot drop the blocks after it. Each character is examined a constant number of times, so this is
+    linear in the file size however many blocks there are.
+    """
+    blocks: List[WDLBlock] = []
+    depth = 0
+    line = 1
+    line_pos = 0  # offset up to which `line` (and `byte`) have been counted
+    byte = 0
+    ascii_only = content.isascii()
+    current = None  # (kind, name, start, start_line, start_byte) of the open top-level block
+
+    def advance(at: int):
+        nonlocal line, line_pos, byte
+        line += content.count('\n', line_pos, at)
+        byte = at if ascii_only else byte + len(content[line_pos:at].encode('utf-8'))
+        line_pos = at
+
+    pos = 0
+    while True:
+        match = _SPECIAL.search(content, pos)
+        if match is None:
+            break
+        at = match.start()
+        char = content[at]
+        pos = at + 1
+
+        if char == '#':
+            newline = content.find('\n', at)
+            pos = len(content) if newline == -1 else newline
+        elif char == '"' or char == "'":
+            string = _STRING.match(content, at)
+            if string:
+                pos = string.end()
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            if depth > 0:
+                depth -= 1
+                if depth == 0 and current is not None:
+                    advance(at)
+                    kind, name, start, start_line, start_byte = current
+                    blocks.append(WDLBlock(kind, name, start, at + 1, start_line, line, start_byte, byte + 1))
+                    current = None
+        elif char == 'c':
+            command = _COMMAND.match(content, at)
+            if command:
+                if command.group(1) == '<<<':
+                    close = content.find('>>>', command.end())
+                    pos = len(content) if close == -1 else close + 3
+                else:
+                    end = _skip_brace_section(content, command.end())
+                    # Never closes: read it as WDL, so the rest of the file is not swallowed
+                    pos = match.end() if end is None else end
+            else:
+                pos = match.end()
+        else:
+            header = _HEADER.match(content, at)
+            if header and depth > 0:
+                # Tasks, workflows and structs do not nest: one starting a line means the open block
+                # never closed, so it ends before this one
+                line_start = content.rfind('\n', 0, at) + 1
+                if current is None or content[line_start:at].strip():
+                    header = None
+                else:
+                    end = line_start
+                    while end > line_pos and content[end - 1].isspace():
+                        end -= 1
+                    advance(end)
+                    kind, name, start, start_line, start_byte = current
+                    blocks.append(WDLBlock(kind, name, start, end, start_line, line, start_byte, byte))
+            if header:
+                advance(at)
+                current = (header.group(1), header.group(2), at, line, byte)
+                depth = 1
+                pos = header.end()
+            else:
+                pos = match.end()
+
+    if current is not None:
+        # Unbalanced to the end of the file: keep what there is rather than drop the block
+        advance(len(content))
+        kind, name, start, start_line, start_byte = current
+        blocks.append(WDLBlock(kind, name, start, len(content), start_line, line, start_byte, byte))
+
+    return blocks
+
+
+def _skip_brace_section(content: str, pos: int) -> Optional[int]:
+    """Offset just past the brace closing a section opened just before pos, or None if it never closes"""
+    depth = 1
+    while True:
+        match = _COMMAND_SPECIAL.search(content, pos)
+        if match is None:
+            return None
+        char = match.group()
+        pos = match.end()
+        if char == '"' or char == "'":
+            string = _STRING.match(content, match.start())
+            if string:
+                pos = string.end()
+        elif char == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
@@ -0,0 +1,94 @@
+"""
+Accuracy and latency of /auto agent routing.
+
+Routes a labelled set of questions (none of them among the agents' example
+queries) and reports accuracy, a confusion summary, and the routing cost
+per message. The query embedding is computed first, as search would, so the
+latency shown is what routing adds on top of it.
+
+Usage:
+    python src/scripts/benchmark_agent_routing.py
+"""
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.agent.agent_config import AgentType
+from rag_chatbot.agent.agent_router import AgentRouter
+from rag_chatbot.services.vector_service import VectorService
+
+LABELLED_QUERIES = [
+    ("What is an olive in Shesmu?", AgentType.QA_AGENT),
+    ("What is the purpose of Dashi?", AgentType.QA_AGENT),
+    ("What are the Vidarr identifiers?", AgentType.QA_AGENT),
+    ("What is included in the plasma WG assay deliverables?", AgentType.QA_AGENT),
+    ("Who should I contact about data release?", AgentType.QA_AGENT),
+    ("Describe the GSI infrastructure", AgentType.QA_AGENT),
+    ("What does the REVOLVE cfDNA assay report?", AgentType.QA_AGENT),
+    ("What is a Vidarr workflow run in the glossary?", AgentType.QA_AGENT),
+    ("How does Shesmu's action system work conceptually?", AgentType.QA_AGENT),
+    ("Summarize the data review and reporting process", AgentType.QA_AGENT),
+    ("Why am I getting a ClassCastException in this Java service?", AgentType.CODE_ASSISTANT),
+    ("Which class handles authentication in miso-lims?", AgentType.CODE_ASSISTANT),
+    ("Refactor this Python function to use a generator", AgentType.CODE_ASSISTANT),
+    ("How is the djerba plugin base class implemented?", AgentType.CODE_ASSISTANT),
+    ("What does the parse_args method do in this script?", AgentType.CODE_ASSISTANT),
+    ("Debug the failing unit test in pinery-reports", AgentType.CODE_ASSISTANT),
+    ("Which Maven dependencies does cardea declare?", AgentType.CODE_ASSISTANT),
+    ("How can I speed up this SQL query?", AgentType.CODE_ASSISTANT),
+    ("Explain the constructor of the SampleService class", AgentType.CODE_ASSISTANT),
+    ("Where are HTTP routes registered in the server code?", AgentType.CODE_ASSISTANT),
+    ("What inputs does the bwamem2 workflow take?", AgentType.WORKFLOW_AGENT),
+    ("How many threads does the STAR alignment task use?", AgentType.WORKFLOW_AGENT),
+    ("Which docker image runs the arriba fusion caller?", AgentType.WORKFLOW_AGENT),
+    ("What does the crosscheckFingerprints WDL output?", AgentType.WORKFLOW_AGENT),
+    ("How does the ichorCNA pipeline estimate tumour fraction?", AgentType.WORKFLOW_AGENT),
+    ("What memory is allocated to the bcl2fastq task?", AgentType.WORKFLOW_AGENT),
+    ("Explain the scatter block in the mutect2 workflow", AgentType.WORKFLOW_AGENT),
+    ("Which GATK tools does calculateContamination call?", AgentType.WORKFLOW_AGENT),
+    ("How are UMIs extracted in the umiCollapse pipeline?", AgentType.WORKFLOW_AGENT),
+    ("What are the runtime parameters of the rnaSeqQC workflow?", AgentType.WORKFLOW_AGENT),
+]
+
+
+def main():
+    vector_service = VectorService()
+    router = AgentRouter(vector_service)
+
+    start = time.perf_counter()
+    router._build_centroids()
+    print(f"Built {len(router.agent_types)} centroids in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    correct = 0
+    confusion = Counter()
+    latencies = []
+    for query, expected in LABELLED_QUERIES:
+        query_embedding = vector_service.embed_query(query)
+
+        start = time.perf_counter()
+        scores = router.score(query, query_embedding)
+        predicted = max(scores, key=scores.get)
+        latencies.append(time.perf_counter() - start)
+
+        confusion[(expected.value, predicted.value)] += 1
+        if predicted == expected:
+            correct += 1
+        else:
+            print(f"  ✗ {query!r}: expected {expected.value}, got {predicted.value}")
+
+    print(f"\nAccuracy: {correct}/{len(LABELLED_QUERIES)} ({correct / len(LABELLED_QUERIES):.0%})")
+    print("Confusion (expected -> predicted):")
+    for (expected, predicted), count in sorted(confusion.items()):
+        print(f"  {expected:15s} -> {predicted:15s} {count}")
+    print(f"\nRouting latency (excluding the shared query embedding): "
+          f"p50 {np.percentile(latencies, 50) * 1000:.3f} ms, p99 {np.percentile(latencies, 99) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark syntax-aware code chunking against the previous separator-based splitter.
+
+Chunks every .py and .java file under the given directories (default: the
+cloned repositories in data/repositories) both ways and reports throughput,
+chunk counts and how many chunks cut a function or method in half. Java
+files are scarce outside the repositories, so --java-classes adds generated
+classes to the Java run. Ingestion only chunks by symbol when
+settings.symbol_chunking is on, which should stay off by default until the
+symbol chunker is at least as fast as the legacy splitter here.
+
+Usage:
+    python src/scripts/benchmark_code_chunking.py --path data/repositories
+    python src/scripts/benchmark_code_chunking.py --path /usr/lib/python3.12 --java-classes 500
+"""
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from rag_chatbot.utils.code_chunkers import (
+    _LineCounter, _indented_python_symbols, _number_lines, java_symbols, python_symbols
+)
+from scripts.ingest_repositories import SmartChunker
+
+JAVA_TEMPLATE = '''package org.example.generated;
+
+import java.util.List;
+import java.util.Map;
+
+/**
+ * Generated class {i}.
+ */
+public class Generated{i} {{
+    private static final String NAME = "generated-{i}";
+    private final Map<String, List<Integer>> cache;
+
+    public Generated{i}(Map<String, List<Integer>> cache) {{
+        this.cache = cache;
+    }}
+
+    /** Sum the cached values for a key. */
+    public int total(String key) {{
+        int sum = 0;
+        for (int value : cache.getOrDefault(key, List.of())) {{
+            if (value > 0) {{ sum += value; }}
+        }}
+        return sum;
+    }}
+
+    @Override
+    public String toString() {{
+        return "Generated{i}{{" + NAME + "}}";
+    }}
+{methods}
+}}
+'''
+
+METHOD_TEMPLATE = '''
+    public List<Integer> step{j}(List<Integer> values) throws IllegalStateException {{
+        if (values.isEmpty()) {{
+            throw new IllegalStateException("no values for step {j}");
+        }}
+        return values.stream().map(v -> v * {j} + cache.size()).filter(v -> v % 2 == 0).toList();
+    }}
+'''
+
+
+def generated_java(n_classes: int) -> List[str]:
+    return [
+        JAVA_TEMPLATE.format(i=i, methods="".join(METHOD_TEMPLATE.format(j=j) for j in range(i % 20)))
+        for i in range(n_classes)
+    ]
+
+
+def load_sources(paths: List[str], language: str, suffix: str) -> List[str]:
+    sources = []
+    for base in paths:
+        for file_path in Path(base).rglob(f'*{suffix}'):
+            try:
+                content = file_path.read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                continue
+            if len(content.strip()) >= 50:
+                sources.append(content)
+    return sources
+
+
+def legacy_chunk(chunker: SmartChunker, content: str, metadata: Dict) -> List[Document]:
+    """What SmartChunker.chunk did for code before symbol-aware chunking"""
+    language = metadata['language']
+    config = chunker.chunk_configs['code']
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=config['chunk_size'],
+        chunk_overlap=config['chunk_overlap'],
+        separators=chunker.language_separators[language],
+        length_function=len,
+    )
+    chunks = splitter.split_text(content)
+    return [
+        Document(
+            page_content=chunk,
+            metadata={**metadata, 'chunk_index': i, 'total_chunks': len(chunks), 'chunking_strategy': language}
+        )
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def run(language: str, sources: List[str]) -> Dict[str, float]:
+    chunker = SmartChunker(symbol_chunking=True)
+    metadata = {'file_category': 'code', 'file_type': '', 'language': language}
+    size_mb = sum(len(s) for s in sources) / 1e6
+
+    start = time.perf_counter()
+    legacy_chunks = [legacy_chunk(chunker, source, metadata) for source in sources]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_chunks = [chunker.chunk(source, {**metadata}) for source in sources]
+    new_seconds = time.perf_counter() - start
+
+    parse = python_symbols if language == 'python' else java_symbols
+    legacy_cuts = 0
+    fallbacks = 0
+    for source, chunks, documents in zip(sources, legacy_chunks, new_chunks):
+        if documents and documents[0].metadata['chunking_strategy'] != f'{language}_symbols':
+            fallbacks += 1
+            continue
+        legacy_cuts += count_cut_symbols(source, [d.page_content for d in chunks], parse)
+    # Oversized symbols are the only ones the symbol chunker splits; their later parts are labelled
+    new_cuts = sum(
+        1 for documents in new_chunks for d in documents
+        if '(part ' in '\n'.join(d.page_content.split('\n', 2)[:2])
+    )
+
+    print(f"{language:6s} {len(sources):6d} files ({size_mb:6.2f} MB, {fallbacks} fell back to text splitting)")
+    print(f"  legacy splitter: {legacy_seconds:7.2f}s ({size_mb / legacy_seconds:6.2f} MB/s), "
+          f"{sum(len(c) for c in legacy_chunks):7d} chunks, {legacy_cuts:6d} symbols cut across chunks")
+    print(f"  symbol chunker:  {new_seconds:7.2f}s ({size_mb / new_seconds:6.2f} MB/s), "
+          f"{sum(len(c) for c in new_chunks):7d} chunks, {new_cuts:6d} sub-split parts of oversized symbols")
+    print(f"  speedup {legacy_seconds / new_seconds:.2f}x")
+    return {"legacy_seconds": legacy_seconds, "new_seconds": new_seconds}
+
+
+def count_cut_symbols(source: str, chunks: List[str], parse) -> int:
+    """Symbols small enough to fit in one chunk that the legacy splitter nevertheless cut"""
+    try:
+        symbols = parse(source)
+    except ValueError:
+        return 0
+
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    spans = []
+    search_from = 0
+    for chunk in chunks:
+        at = source.find(chunk, search_from)
+        if at < 0:
+            continue
+        spans.append((at, at + len(chunk)))
+        search_from = at + 1
+
+    cut = 0
+    stack = list(symbols)
+    while stack:
+        symbol = stack.pop()
+        stack.extend(symbol.children)
+        begin = offsets[symbol.start_line - 1]
+        end = offsets[min(symbol.end_line, len(lines))]
+        text = source[begin:end].strip()
+        if len(text) > 1200:
+            continue
+        body_start = begin + (len(source[begin:end]) - len(source[begin:end].lstrip()))
+        body_end = body_start + len(text)
+        if not any(s <= body_start and body_end <= e for s, e in spans):
+            cut += 1
+    return cut
+
+
+def indented_symbols(source: str):
+    """The indentation scan alone, without the checks that send doubtful files to ast"""
+    symbols = _indented_python_symbols(source)
+    _number_lines(symbols, _LineCounter(source))
+    return symbols
+
+
+def ast_agreement(sources: List[str], parse=python_symbols) -> float:
+    """Share of functions/classes/methods found by ast whose end line parse() also reports"""
+    agreed = total = 0
+    for source in sources:
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            continue
+        expected = []
+        nodes = list(tree.body)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                expected.append((node.name, node.end_lineno))
+                if isinstance(node, ast.ClassDef):
+                    nodes.extend(node.body)
+
+        found = set()
+        symbols = parse(source)
+        while symbols:
+            symbol = symbols.pop()
+            found.add((symbol.name, symbol.end_line))
+            symbols.extend(symbol.children)
+
+        total += len(expected)
+        agreed += sum(1 for item in expected if item in found)
+    return agreed / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark syntax-aware code chunking")
+    parser.add_argument("--path", nargs="+", default=["data/repositories"])
+    parser.add_argument("--java-classes", type=int, default=0, help="generated Java classes to add")
+    args = parser.parse_args()
+
+    python_sources = load_sources(args.path, 'python', '.py')
+    java_sources = load_sources(args.path, 'java', '.java') + generated_java(args.java_classes)
+
+    for language, sources in (('python', python_sources), ('java', java_sources)):
+        if sources:
+            run(language, sources)
+        else:
+            print(f"{language}: no files found")
+
+    if python_sources:
+        # Differences from ast are comment lines indented under a block after its last statement
+        print(f"python symbol end lines matching ast: {ast_agreement(python_sources):.2%} "
+              f"(indentation scan alone: {ast_agreement(python_sources, indented_symbols):.2%})")
+
+
+if __name__ == "__main__":
+    main()
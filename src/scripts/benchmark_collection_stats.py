@@ -0,0 +1,94 @@
+"""
+Cost and accuracy of the collection stats shown on every chat start.
+
+Indexes synthetic repository chunks (several repos, languages and
+categories) into a scratch store, deletes one repository, then compares:
+the previous sampling approach (count() plus a 100-record sample), the
+incrementally maintained catalog read by get_collection_stats(), and a
+full recount of every record's metadata.
+
+Usage:
+    python src/scripts/benchmark_collection_stats.py --chunks 5000
+"""
+import argparse
+import copy
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from langchain_core.documents import Document
+
+from rag_chatbot.services.vector_service import VectorService
+
+LANGUAGES = ['java'] * 5 + ['python'] * 3 + ['wdl'] * 2 + ['javascript', 'sql']
+CATEGORIES = ['code'] * 6 + ['documentation'] * 2 + ['configuration']
+
+
+def synthetic_documents(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    documents = []
+    for i in range(n):
+        repo = f"repo{rng.randrange(12)}"
+        documents.append(Document(
+            page_content=f"chunk {i} of {repo}: " + " ".join(rng.choice(["sample", "run", "lims", "qc"]) for _ in range(40)),
+            metadata={'repo_name': repo, 'source_file': f"src/file{i % 300}.x", 'chunk_index': i,
+                      'language': rng.choice(LANGUAGES), 'file_category': rng.choice(CATEGORIES),
+                      'source_type': 'repository'}
+        ))
+    return documents
+
+
+def sampled_stats(vector_service: VectorService):
+    """What get_collection_stats() did before the catalog"""
+    collection = vector_service.get_or_create_collection()
+    count = collection.count()
+    sample = collection.get(limit=min(count, 100), include_documents=False)
+    languages = {}
+    for record in sample:
+        language = record['metadata'].get('language')
+        if language:
+            languages[language] = languages.get(language, 0) + 1
+    return {'total_chunks': count, 'languages': languages}
+
+
+def timed(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collection stats")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        vector_service = VectorService(persist_directory=scratch)
+        vector_service.add_document_objects(synthetic_documents(args.chunks), batch_size=500)
+        vector_service.delete_by_repo("repo3")
+
+        sampled, sampled_ms = timed(lambda: sampled_stats(vector_service), args.repeat)
+        catalog, catalog_ms = timed(vector_service.get_collection_stats, args.repeat)
+        catalog = copy.deepcopy(catalog)
+        start = time.perf_counter()
+        vector_service.rebuild_collection_stats()
+        recount_ms = (time.perf_counter() - start) * 1000
+        recount = vector_service.collection_stats.snapshot()
+
+    print(f"\n{catalog['total_chunks']} chunks after deleting one repository")
+    print(f"  sampled (count + 100 docs): {sampled_ms:8.2f} ms  languages {dict(sorted(sampled['languages'].items()))}")
+    print(f"  stats catalog:              {catalog_ms:8.3f} ms  languages {dict(sorted(catalog['languages'].items()))}")
+    print(f"  full recount:               {recount_ms:8.2f} ms  languages {dict(sorted(recount['languages'].items()))}")
+    exact = all(catalog[key] == recount[key] for key in recount)
+    print(f"  catalog matches full recount: {exact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Show prompt size over a long conversation.
+
+Simulates a 100-turn session against ConversationMemory and builds the
+real agent prompt each turn with a fixed retrieved context, printing the
+prompt token count as the conversation grows. Once the ring buffer fills,
+the count stops growing; tests/test_conversation_memory.py checks the bound.
+
+Usage:
+    python src/scripts/benchmark_conversation_memory.py --turns 100
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.agent.conversation_memory import ConversationMemory, count_tokens
+from rag_chatbot.agent.prompt_templates import PromptTemplates
+
+CONTEXT = "\n---\n".join(
+    f"[Source {i}: shesmu/docs/language.md (documentation) - relevance: 0.8{i}]\n"
+    + "Olives process input data and produce actions. " * 20
+    for i in range(1, 6)
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt token growth over a long conversation")
+    parser.add_argument("--turns", type=int, default=100)
+    args = parser.parse_args()
+
+    memory = ConversationMemory()
+    token_counts = []
+
+    for turn in range(1, args.turns + 1):
+        question = f"Question {turn}: how does the olive in workflow step {turn} handle " + "missing input " * (turn % 7)
+        prompt = PromptTemplates.get_prompt_by_template_name(
+            "qa_prompt", question, CONTEXT, history=memory.render()
+        )
+        token_counts.append(count_tokens(prompt))
+
+        answer = f"Step {turn} uses a Group clause. " + "It joins the records and emits an action. " * (5 + turn % 11)
+        memory.add_turn(question, answer, "qa_agent")
+
+        if turn in (1, 2, 5, 10, 20, 50) or turn % 25 == 0:
+            usage = memory.token_usage()
+            print(f"turn {turn:4d}: prompt {token_counts[-1]:5d} tokens "
+                  f"(history {usage['history_tokens']}, summary {usage['summary_tokens']}, "
+                  f"buffered turns {usage['turns_in_buffer']})")
+
+    steady = token_counts[memory.max_turns * 2:]
+    if steady:
+        print(f"\nAfter warm-up: min {min(steady)}, max {max(steady)} tokens "
+              f"(ceiling {count_tokens(PromptTemplates.QA_PREFIX + CONTEXT) + memory.max_history_tokens + memory.max_summary_tokens + 100})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Time the async documentation crawler against a local HTTP server.
+
+Serves a synthetic ReadTheDocs-like site from a thread on 127.0.0.1: pages
+under /en/latest/ are listed in /sitemap.xml and answer conditional
+requests (ETag and Last-Modified, 304 when unchanged); pages under /other/
+are only reachable through links and send no validators. Every response
+is delayed to look like a remote server, and the server records how many
+requests were in flight at once and when each one started.
+
+The script times a first crawl and a second, all-304 crawl, and compares
+them with fetching the same pages one at a time. tests/test_doc_crawler.py
+checks what the crawler fetches and writes against the same server.
+
+Usage:
+    python src/scripts/benchmark_doc_crawler.py
+    python src/scripts/benchmark_doc_crawler.py --pages 60 --latency 0.2 --concurrency 4 --rate 40
+"""
+import argparse
+import asyncio
+import hashlib
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.scrape_doc import ReadTheDocscraper
+
+
+def make_site(n_pages: int):
+    """path -> html; /en/latest/ pages link to each other and to one /other/ page each"""
+    site = {}
+    n_other = max(1, n_pages // 5)
+    for i in range(n_pages):
+        links = "".join(f'<li><a href="page{j}.html">Page {j}</a></li>' for j in (i - 1, i + 1) if 0 <= j < n_pages)
+        site[f"/en/latest/page{i}.html"] = f"""<html><head><title>Page {i} Guide</title></head><body>
+<nav class="wy-nav-side"><ul>{links}</ul></nav>
+<div class="rst-content"><h1>Page {i} Guide</h1>
+<p>Section text for page {i} describing workflow {i % 7} and its <a href="../../other/extra{i % n_other}.html#top">notes</a>.</p>
+<h2>Details</h2><p>{'More details. ' * 20}</p></div></body></html>"""
+    for k in range(n_other):
+        site[f"/other/extra{k}.html"] = f"""<html><head><title>Extra Notes {k}</title></head><body>
+<div class="rst-content"><h1>Extra Notes {k}</h1><p>Unversioned notes {k}.</p>
+<a href="extra{(k + 1) % n_other}.html">next</a> <a href="/static/logo.png">logo</a></div></body></html>"""
+    return site
+
+
+class SiteServer:
+    """The synthetic site in a background ThreadingHTTPServer, with request accounting"""
+
+    def __init__(self, site, latency: float):
+        self.site = site
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.starts = []
+        self.statuses = {}
+        self.last_modified = formatdate(time.time() - 3600, usegmt=True)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    server.starts.append(time.perf_counter())
+                try:
+                    time.sleep(server.latency)
+                    status, headers, body = server.respond(self.path, self.headers)
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    with server.lock:
+                        server.statuses[status] = server.statuses.get(status, 0) + 1
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def respond(self, path, request_headers):
+        if path == "/sitemap.xml":
+            locs = "".join(f"<url><loc>{self.base}{p}</loc></url>" for p in self.site if p.startswith("/en/latest/"))
+            body = f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+            return 200, {"Content-Type": "application/xml"}, body.encode()
+        if path not in self.site:
+            return 404, {"Content-Type": "text/plain"}, b"not found"
+        body = self.site[path].encode()
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if path.startswith("/en/latest/"):
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            headers.update({"ETag": etag, "Last-Modified": self.last_modified})
+            if request_headers.get("If-None-Match") == etag:
+                return 304, {"ETag": etag}, b""
+        return 200, headers, body
+
+    def reset_counters(self):
+        with self.lock:
+            self.max_in_flight = 0
+            self.starts = []
+            self.statuses = {}
+
+    def observed_rate(self):
+        """Requests started per second, first to last"""
+        starts = sorted(self.starts)
+        return (len(starts) - 1) / (starts[-1] - starts[0]) if len(starts) > 1 else 0.0
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the async documentation crawler")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the server takes per response")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=40.0)
+    args = parser.parse_args()
+
+    site = make_site(args.pages)
+    server = SiteServer(site, args.latency)
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            scraper = ReadTheDocscraper(output_dir=str(Path(scratch) / "docs"))
+            start_urls = [f"{server.base}/en/latest/page0.html"]
+            scope = [f"{server.base}/en/latest/", f"{server.base}/other/"]
+
+            def crawl():
+                server.reset_counters()
+                start = time.perf_counter()
+                asyncio.run(scraper.crawl(start_urls, scope=scope, concurrency=args.concurrency, rate=args.rate))
+                return time.perf_counter() - start
+
+            print(f"\nFirst crawl ({len(site)} pages, {args.latency * 1000:.0f} ms per response)")
+            crawl_seconds = crawl()
+            print(f"  max {server.max_in_flight} requests in flight (limit {args.concurrency}), "
+                  f"{server.observed_rate():.1f} started per second (limit {args.rate:g})")
+
+            print("\nSecond crawl (nothing changed)")
+            recrawl_seconds = crawl()
+            print(f"  {server.statuses.get(304, 0)} not modified (304)")
+
+            print("\nOne request at a time (previous scrape_multiple without delay)")
+            sequential = ReadTheDocscraper(output_dir=str(Path(scratch) / "sequential"))
+            start = time.perf_counter()
+            for path in site:
+                sequential.scrape_page(f"{server.base}{path}", delay=0)
+            sequential_seconds = time.perf_counter() - start
+            print(f"\nFirst crawl {crawl_seconds:.2f}s, second {recrawl_seconds:.2f}s vs sequential "
+                  f"{sequential_seconds:.2f}s ({sequential_seconds / crawl_seconds:.1f}x)")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
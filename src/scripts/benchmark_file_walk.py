@@ -0,0 +1,154 @@
+"""
+Benchmark RepositoryIngester.extract_files against the previous rglob-based walk.
+
+Walks the given repositories (or, with --generate, a synthetic tree shaped
+like miso-lims: a few thousand Java/JS/SQL/Markdown sources next to a .git
+directory full of objects, node_modules, Maven target/ output, a
+.gitignore'd build cache and some binaries) and reports files/sec for both
+implementations plus which files only one of them returned.
+
+Usage:
+    python src/scripts/benchmark_file_walk.py --path data/repositories/miso-lims
+    python src/scripts/benchmark_file_walk.py --generate /tmp/miso-like --source-files 6000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.ingest_repositories import RepositoryIngester
+
+SOURCE_SUFFIXES = ['.java'] * 6 + ['.js', '.sql', '.md', '.xml', '.properties', '.py']
+
+
+def generate_tree(root: Path, source_files: int, seed: int = 0):
+    """Write a synthetic repository roughly the size and shape of miso-lims"""
+    rng = random.Random(seed)
+    body = "public class Sample {\n    private String name;\n    // accessor\n}\n" * 20
+
+    for i in range(source_files):
+        module = f"module{i % 12}"
+        package = "/".join(f"pkg{rng.randrange(8)}" for _ in range(3))
+        path = root / module / "src/main/java" / package / f"File{i}{rng.choice(SOURCE_SUFFIXES)}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body)
+        if i % 4 == 0:
+            target = root / module / "target/classes" / package / f"File{i}.class"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(b"\xca\xfe\xba\xbe" + bytes(2000))
+
+    for i in range(source_files * 8):
+        obj = root / ".git/objects" / f"{i % 256:02x}" / f"{i:038x}"
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        obj.write_bytes(bytes(200))
+
+    for i in range(source_files * 3):
+        path = root / "miso-web/node_modules" / f"dep{i % 400}" / f"index{i}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("module.exports = {};\n" * 10)
+
+    (root / ".gitignore").write_text("cache/\n*.tmp\n!keep.tmp\n")
+    for i in range(source_files // 2):
+        path = root / "cache" / f"entry{i}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{"cached": true, "padding": "' + "x" * 100 + '"}')
+
+    for i in range(50):
+        (root / "docs").mkdir(exist_ok=True)
+        (root / "docs" / f"diagram{i}.txt").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(rng.randrange(256) for _ in range(4000)))
+    (root / "docs" / "dump.sql").write_text("INSERT INTO sample VALUES (1);\n" * 100_000)
+
+
+def legacy_extract_files(ingester: RepositoryIngester, repo_path: Path) -> List[Dict[str, Any]]:
+    """What extract_files did before the pruned walker"""
+    include_categories = ['documentation', 'code', 'configuration']
+    exclude_dirs = {
+        '.git', 'node_modules', '__pycache__', '.pytest_cache',
+        'target', 'build', 'dist', '.idea', '.vscode', 'venv',
+        '.gradle', '.mvn', 'bin', 'obj', 'vendor', '.next'
+    }
+    exclude_patterns = {
+        '.class', '.pyc', '.pyo', '.so', '.dll', '.dylib',
+        '.exe', '.bin', '.o', '.a', '.jar', '.war',
+        '.min.js', '.bundle.js', '.lock', '.log'
+    }
+    documents = []
+    for file_path in repo_path.rglob('*'):
+        if file_path.is_dir():
+            continue
+        if any(excluded in file_path.parts for excluded in exclude_dirs):
+            continue
+        if any(file_path.name.endswith(pattern) for pattern in exclude_patterns):
+            continue
+        path_str = str(file_path)
+        if file_path.name in ingester.exclude_files or any(e in path_str for e in ingester.exclude_files):
+            continue
+        metadata = ingester.get_file_metadata(file_path, repo_path)
+        if metadata['file_category'] not in include_categories:
+            continue
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        if len(content.strip()) < 50:
+            continue
+        metadata['file_size'] = len(content)
+        documents.append({'content': content, 'metadata': metadata})
+    return documents
+
+
+def count_files(repo_path: Path) -> int:
+    return sum(len(files) for _, _, files in os.walk(repo_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repository file walking")
+    parser.add_argument("--path", nargs="*", default=[])
+    parser.add_argument("--generate", help="directory to create a synthetic miso-lims-sized repository in")
+    parser.add_argument("--source-files", type=int, default=6000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.path]
+    if args.generate:
+        root = Path(args.generate)
+        if not root.exists():
+            print(f"Generating synthetic repository in {root}...")
+            generate_tree(root, args.source_files)
+        paths.append(root)
+    if not paths:
+        parser.error("pass --path and/or --generate")
+
+    ingester = RepositoryIngester(base_path=str(paths[0].parent), read_workers=args.workers)
+    for repo_path in paths:
+        on_disk = count_files(repo_path)
+
+        start = time.perf_counter()
+        legacy = legacy_extract_files(ingester, repo_path)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        current = ingester.extract_files(repo_path)
+        current_seconds = time.perf_counter() - start
+
+        legacy_files = {d['metadata']['source_file'] for d in legacy}
+        current_files = {d['metadata']['source_file'] for d in current}
+
+        print(f"\n{repo_path}: {on_disk} files on disk")
+        print(f"  rglob walk:   {legacy_seconds:6.2f}s, {len(legacy):6d} files returned "
+              f"({on_disk / legacy_seconds:8.0f} files/s walked)")
+        print(f"  pruned walk:  {current_seconds:6.2f}s, {len(current):6d} files returned "
+              f"({on_disk / current_seconds:8.0f} files/s walked)")
+        print(f"  speedup {legacy_seconds / current_seconds:.2f}x")
+        only_legacy = sorted(legacy_files - current_files)
+        only_current = sorted(current_files - legacy_files)
+        print(f"  only returned by rglob walk ({len(only_legacy)}): {only_legacy[:5]}")
+        print(f"  only returned by pruned walk ({len(only_current)}): {only_current[:5]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Glossary fast path vs embedding search for definitional questions.
+
+Indexes the markdown documents (data/documents) into a scratch in-memory
+store, which also builds the glossary dictionary. It then asks a
+definitional question for every glossary term in several phrasings ("What
+is an olive?", "What are olives?", "Define olive", "What does olive mean in
+Shesmu?"). For each question it reports:
+  - whether the glossary fast path returns the entry and how long it takes
+  - where the defining glossary chunk ranks in plain vector search, and
+    how long embedding and searching take
+Ordinary questions from the agent examples are checked as well, to count
+false hits.
+
+No model download is needed. Embeddings come from the hashed bag-of-words
+in benchmark_small_to_big.py, so vector ranks are lexical and only
+indicative. The fast path does not use embeddings.
+
+Usage:
+    python src/scripts/benchmark_glossary.py --docs data/documents
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.glossary import normalize_term
+from rag_chatbot.services.vector_service import VectorService
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+
+PHRASINGS = ["What is {article} {term}?", "what are {plural}", "Define {term}", "What does {term} mean in {scope}?",
+             "explain the glossary term {term}"]
+ORDINARY = [
+    "How do I run a WDL workflow on the cluster?",
+    "Show me the bwa alignment task",
+    "Why does my olive not produce any actions?",
+    "What is the difference between Shesmu and Vidarr?",
+    "How are workflow runs matched to previous ones?",
+    "Where are analysis outputs provisioned?",
+    "Explain how the throttler plugin decides to pause actions",
+    "What does the refiller do with the data it receives and how often does it run?",
+]
+
+
+def questions(glossary):
+    """(question, expected term, glossary file) for every term and phrasing"""
+    asked = []
+    for source_key, entries in sorted(glossary.files.items()):
+        source_file = Path(source_key).name
+        scope = "Vidarr" if "vidarr" in source_file.lower() else "Shesmu"
+        for term, _, _ in entries:
+            name = term.lower()
+            plural = name if name.endswith("s") else name + "s"
+            for phrasing in PHRASINGS:
+                question = phrasing.format(term=name, plural=plural, scope=scope,
+                                           article="an" if name[0] in "aeiou" else "a")
+                asked.append((question, term, source_file))
+    return asked
+
+
+def percentiles(timings):
+    return statistics.median(timings) * 1e6, float(np.percentile(timings, 99) * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the glossary fast path")
+    parser.add_argument("--docs", default="data/documents")
+    parser.add_argument("--k", type=int, default=10, help="vector results inspected for the definition")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        service = VectorService(persist_directory=scratch, backend="memory", embeddings=WindowedHashingEmbeddings())
+        service.add_documents(args.docs)
+        glossary = service.glossary
+        asked = questions(glossary)
+        if not asked:
+            print(f"No glossary files under {args.docs}")
+            return
+        print(f"\nGlossary: {sum(len(e) for e in glossary.files.values())} terms, {len(glossary)} keys "
+              f"(with aliases); {len(asked)} definitional questions\n")
+
+        fast_timings, vector_timings, ranks, hits, misses = [], [], [], 0, []
+        for question, term, source_file in asked:
+            start = time.perf_counter()
+            results = service.lookup_glossary(question)
+            fast_timings.append(time.perf_counter() - start)
+            if results and results[0]['term'] == term and results[0]['metadata']['source_file'] == source_file:
+                hits += 1
+            else:
+                misses.append(question)
+
+            service._query_embedding_cache.clear()
+            start = time.perf_counter()
+            found = service.search(question, n_results=args.k)
+            vector_timings.append(time.perf_counter() - start)
+            defining = [i for i, r in enumerate(found)
+                        if r['metadata'].get('chunk_type') == 'glossary_entry'
+                        and normalize_term(term) in normalize_term(r['content'])[:200]]
+            ranks.append(defining[0] + 1 if defining else None)
+
+        p50, p99 = percentiles(fast_timings)
+        print(f"Glossary fast path: entry pinned for {hits}/{len(asked)} ({hits / len(asked):.0%}), "
+              f"p50 {p50:.1f} µs, p99 {p99:.1f} µs")
+        p50, p99 = percentiles(vector_timings)
+        top1 = sum(rank == 1 for rank in ranks)
+        absent = sum(rank is None for rank in ranks)
+        print(f"Vector search:      definition ranked first for {top1}/{len(asked)} ({top1 / len(asked):.0%}), "
+              f"not in top {args.k} for {absent}, p50 {p50:.0f} µs, p99 {p99:.0f} µs")
+        for question in misses[:10]:
+            print(f"  fast path miss: {question}")
+
+        false_hits = [(q, service.lookup_glossary(q)) for q in ORDINARY]
+        false_hits = [(q, r[0]['term']) for q, r in false_hits if r]
+        print(f"\nOrdinary questions answered from the glossary: {len(false_hits)}/{len(ORDINARY)}")
+        for question, term in false_hits:
+            print(f"  {question!r} -> {term}")
+        print(f"\nstats(): {glossary.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Per-page HTML-to-markdown conversion time and structure: the previous
+BeautifulSoup path in scrape_doc.py vs the single-parse lxml extractor.
+
+The previous path parsed the page with BeautifulSoup, picked the content
+container, removed navigation, flattened it with get_text(), ran the
+boilerplate regexes on the flat text, parsed that text again and passed it
+to markdownify. It is reproduced here as the baseline; beautifulsoup4 and
+markdownify are dev dependencies (poetry install --with dev).
+
+Pages are synthetic Sphinx / ReadTheDocs pages (sidebar navigation,
+breadcrumbs, sections with headings, paragraphs, lists, code blocks,
+tables, footer), or the .html files of a directory with --html-dir. For
+each converter the script reports per-page time and how many sections
+MarkdownHeaderTextSplitter finds in the output (what the vector store
+will chunk on).
+
+Usage:
+    python src/scripts/benchmark_html_markdown.py --pages 200 --sections 12
+    python src/scripts/benchmark_html_markdown.py --html-dir saved_pages/
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bs4 import BeautifulSoup
+from langchain.text_splitter import MarkdownHeaderTextSplitter
+from markdownify import markdownify as md
+
+from rag_chatbot.utils.html_markdown import html_to_markdown
+
+PREVIOUS_CONTENT_SELECTORS = ['div.rst-content', 'div.document', 'div.body', 'main', 'article',
+                              'div.content', 'div#main-content']
+PREVIOUS_REMOVE_SELECTORS = [
+    'nav', 'footer', 'header', 'aside',
+    '.navigation', '.nav', '.sidebar', '.toctree-wrapper',
+    '.breadcrumb', '.breadcrumbs', '.edit-on-github',
+    '.version-selector', '.search-box', '.social-links',
+    '.prev-next-buttons', '.page-nav', '.site-footer',
+    'script', 'style', 'noscript',
+    '.admonition-title',
+]
+PREVIOUS_NAVIGATION_PATTERNS = [r'Edit on GitHub', r'Previous\s*Next', r'© Copyright.*',
+                                r'Built with.*Sphinx', r'Hosted on.*Read the Docs']
+
+
+def previous_convert(html):
+    """scrape_doc.py before the lxml extractor: parse, flatten, regex, re-parse, markdownify"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.find('h1').get_text(strip=True)
+    content = None
+    for selector in PREVIOUS_CONTENT_SELECTORS:
+        content = soup.select_one(selector)
+        if content:
+            break
+    for selector in PREVIOUS_REMOVE_SELECTORS:
+        for element in content.select(selector):
+            element.decompose()
+    text = content.get_text()
+    for pattern in PREVIOUS_NAVIGATION_PATTERNS:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    markdown = md(str(BeautifulSoup(text, 'html.parser')), heading_style="ATX")
+    lines = []
+    for line in markdown.split('\n'):
+        line = line.strip()
+        if line or lines:
+            lines.append(line)
+    return title, re.sub(r'\n\s*\n\s*\n', '\n\n', '\n'.join(lines)).strip()
+
+
+def lxml_convert(html):
+    page = html_to_markdown(html, "https://docs.example.org/en/latest/page.html")
+    return page.title, page.markdown
+
+
+def synthetic_page(i: int, n_sections: int) -> str:
+    nav = "".join(f'<li class="toctree-l1"><a href="page{j}.html">Page {j} topic</a></li>' for j in range(40))
+    sections = []
+    for s in range(n_sections):
+        sections.append(f"""
+<div class="section" id="section-{s}">
+<h2>Section {s} of page {i}<a class="headerlink" href="#section-{s}" title="Permalink">¶</a></h2>
+<p>The <strong>workflow {s}</strong> aligns reads with <code class="docutils literal">bwa mem</code> and
+marks duplicates; see <a class="reference internal" href="page{s}.html">page {s}</a> for details.
+{'It runs on the cluster with the default modules and writes its outputs next to the inputs. ' * 4}</p>
+<ul class="simple"><li><p>Input: <em>FASTQ</em> pairs</p></li><li><p>Output: sorted BAM</p>
+<ul><li><p>plus index</p></li></ul></li></ul>
+<div class="highlight-bash notranslate"><div class="highlight"><pre><span></span>module load bwa/0.7.17
+bwa mem -t 8 ref.fa r1.fq r2.fq <span class="p">|</span> samtools sort -o out.bam
+</pre></div></div>
+<h3>Parameters<a class="headerlink" href="#p{s}">¶</a></h3>
+<table class="docutils align-default"><thead><tr><th>Name</th><th>Default</th></tr></thead>
+<tbody><tr><td><code>threads</code></td><td>8</td></tr><tr><td><code>memory</code></td><td>16 GB</td></tr></tbody></table>
+</div>""")
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>Page {i} Guide — OICR GSI documentation</title>
+<script>var x = 1;</script><style>body {{ margin: 0 }}</style></head><body class="wy-body-for-nav">
+<div class="wy-grid-for-nav"><nav class="wy-nav-side"><div class="wy-side-scroll"><div class="wy-menu">
+<ul>{nav}</ul></div></div></nav>
+<section class="wy-nav-content-wrap"><div class="wy-nav-content"><div class="rst-content">
+<div role="navigation" aria-label="breadcrumbs navigation"><ul class="wy-breadcrumbs"><li><a href="index.html">Docs</a> »</li>
+<li>Page {i}</li><li class="wy-breadcrumbs-aside"><a href="https://github.com/x" class="fa fa-github"> Edit on GitHub</a></li></ul><hr/></div>
+<div role="main" class="document"><div itemprop="articleBody">
+<div class="section" id="page-{i}"><h1>Page {i} Guide<a class="headerlink" href="#page-{i}">¶</a></h1>
+<p>Introduction to page {i}.</p>
+{''.join(sections)}
+</div></div></div>
+<footer><div class="rst-footer-buttons"><a href="p.html" class="btn">Previous</a><a href="n.html" class="btn">Next</a></div>
+<hr/><p>© Copyright 2024, OICR.</p>Built with <a href="http://sphinx-doc.org/">Sphinx</a> using a theme provided by
+<a href="https://readthedocs.org">Read the Docs</a>.</footer>
+</div></div></section></div></body></html>"""
+
+
+def sections(markdown: str) -> int:
+    splitter = MarkdownHeaderTextSplitter(headers_to_split_on=[("#", "Header 1"), ("##", "Header 2"),
+                                                               ("###", "Header 3")])
+    return sum(1 for doc in splitter.split_text(markdown) if doc.metadata)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML-to-markdown conversion")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=10, help="sections per synthetic page")
+    parser.add_argument("--html-dir", help="convert these .html files instead of synthetic pages")
+    parser.add_argument("--show", action="store_true", help="print the lxml markdown of the first page")
+    args = parser.parse_args()
+
+    if args.html_dir:
+        pages = [p.read_bytes() for p in sorted(Path(args.html_dir).glob("*.html"))]
+    else:
+        pages = [synthetic_page(i, args.sections).encode() for i in range(args.pages)]
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / len(pages) / 1024:.1f} KiB on average\n")
+
+    results = {}
+    for label, convert in [("previous (bs4 x2 + markdownify)", previous_convert), ("lxml single pass", lxml_convert)]:
+        timings, outputs = [], []
+        for html in pages:
+            start = time.perf_counter()
+            outputs.append(convert(html))
+            timings.append(time.perf_counter() - start)
+        results[label] = (timings, outputs)
+        headings = sum(len(re.findall(r'^#{1,6} ', markdown, re.M)) for _, markdown in outputs)
+        print(f"{label:32s} p50 {statistics.median(timings) * 1000:7.2f} ms/page  "
+              f"mean {statistics.mean(timings) * 1000:7.2f}  "
+              f"headings {headings / len(pages):5.1f}/page  "
+              f"splitter sections {sum(sections(m) for _, m in outputs) / len(pages):5.1f}/page")
+
+    previous, current = (statistics.median(t) for t, _ in results.values())
+    print(f"\nspeedup: {previous / current:.1f}x")
+    leaked = [m for _, m in results["lxml single pass"][1] if re.search(r'Edit on GitHub|Built with|toctree|¶', m)]
+    print(f"pages with navigation/footer text left (lxml): {len(leaked)}")
+    if args.show:
+        print("\n" + results["lxml single pass"][1][0][1][:3000])
+
+
+if __name__ == "__main__":
+    main()
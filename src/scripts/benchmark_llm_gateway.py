@@ -0,0 +1,78 @@
+"""
+Offline latency/throughput check for the LLM gateway and client registry.
+
+Uses the deterministic fake provider, so no API key or network is needed.
+Fires bursts of concurrent requests, a share of them duplicates, and reports
+throughput, latency percentiles, coalescing and queueing.
+
+Usage:
+    python src/scripts/benchmark_llm_gateway.py --requests 500 --latency 0.2 --duplicate-ratio 0.3
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.llm_service import LLMGateway, LLMBackpressureError, LLMClientRegistry
+
+
+async def run(args):
+    registry = LLMClientRegistry()
+    gateway = LLMGateway(max_concurrency=args.concurrency, max_queue=args.max_queue, queue_timeout=args.timeout)
+    client = registry.get_client("fake", "fake-model", 0.7)
+    client.latency = args.latency
+    assert registry.get_client("fake", "fake-model", 0.7) is client, "registry must reuse clients"
+
+    rng = random.Random(0)
+    prompts = [
+        "What is Shesmu?" if rng.random() < args.duplicate_ratio else f"Question {i}"
+        for i in range(args.requests)
+    ]
+
+    latencies = []
+    rejected = 0
+
+    async def one(prompt):
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            await gateway.ainvoke(client, prompt, "fake:fake-model")
+            latencies.append(time.perf_counter() - start)
+        except LLMBackpressureError:
+            rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in prompts))
+    elapsed = time.perf_counter() - start
+
+    stats = gateway.stats()["fake:fake-model"]
+    print(f"Requests: {args.requests}, completed: {len(latencies)}, rejected: {rejected}")
+    print(f"Provider calls: {client.calls}, coalesced: {stats['coalesced']}")
+    print(f"Throughput: {len(latencies) / elapsed:,.1f} req/s")
+    if latencies:
+        print(f"Latency p50: {np.percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p99: {np.percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"Max queue depth: {stats['max_queue_depth']}, avg wait: {stats['avg_wait_ms']:.0f} ms, "
+          f"max wait: {stats['max_wait_ms']:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline LLM gateway benchmark")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
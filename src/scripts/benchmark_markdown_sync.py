@@ -0,0 +1,97 @@
+"""
+Re-indexing cost of the markdown corpus with content-addressed chunk ids.
+
+Copies data/documents into a scratch directory and indexes it into a
+scratch vector store four times: from scratch, unchanged, after editing
+one file (one section reworded, one removed) and after deleting a file.
+For each run it reports wall time, how many chunks were embedded and
+deleted, and whether the stored chunks of every file match exactly what
+the file produces now (no stale sections left searchable).
+
+Usage:
+    python src/scripts/benchmark_markdown_sync.py
+    python src/scripts/benchmark_markdown_sync.py --docs data/documents --edit shesmu_language.md
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_service import VectorService
+
+
+def sync(vector_service: VectorService, docs: Path, label: str, counters: dict):
+    counters['embedded'] = 0
+    before = vector_service.backend.count()
+    start = time.perf_counter()
+    vector_service.add_documents(str(docs))
+    seconds = time.perf_counter() - start
+    after = vector_service.backend.count()
+    deleted = before + counters['embedded'] - after
+    print(f"{label:28s} {seconds * 1000:9.1f} ms  embedded {counters['embedded']:5d}  "
+          f"deleted {deleted:5d}  stored {after:5d}  consistent: {consistent(vector_service, docs)}")
+
+
+def consistent(vector_service: VectorService, docs: Path) -> bool:
+    """Stored markdown chunks are exactly the chunks the current files produce"""
+    expected = set()
+    for file_path in docs.glob("*.md"):
+        expected |= {c['metadata']['chunk_id'] for c in vector_service.process_markdown_file(file_path)}
+    stored = {
+        r['id'] for r in vector_service.backend.get(where={"source_type": "markdown_document"},
+                                                     include_documents=False)
+    }
+    return stored == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental markdown indexing")
+    parser.add_argument("--docs", default="data/documents")
+    parser.add_argument("--edit", help="markdown file to edit (default: the largest)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        docs = Path(scratch) / "documents"
+        docs.mkdir()
+        for file_path in Path(args.docs).glob("*.md"):
+            shutil.copy2(file_path, docs / file_path.name)
+        files = sorted(docs.glob("*.md"), key=lambda p: p.stat().st_size, reverse=True)
+        if len(files) < 2:
+            print(f"Need at least two markdown files in {args.docs}")
+            return
+
+        vector_service = VectorService(persist_directory=str(Path(scratch) / "store"))
+        counters = {'embedded': 0}
+        embed_documents = vector_service.embeddings.embed_documents
+
+        def counting(texts):
+            counters['embedded'] += len(texts)
+            return embed_documents(texts)
+
+        vector_service.embeddings.embed_documents = counting
+
+        print(f"{len(files)} markdown files\n")
+        sync(vector_service, docs, "initial index", counters)
+        sync(vector_service, docs, "unchanged corpus", counters)
+
+        edited = docs / args.edit if args.edit else files[0]
+        sections = edited.read_text(encoding='utf-8').split('\n## ')
+        if len(sections) >= 3:
+            sections[1] = sections[1].replace(' ', '  ', 3) + "\n\nThis section was revised."
+            del sections[2]
+        else:
+            sections[-1] += "\n\nThis section was revised."
+        edited.write_text('\n## '.join(sections), encoding='utf-8')
+        sync(vector_service, docs, f"edited {edited.name[:18]}", counters)
+
+        files[-1].unlink()
+        sync(vector_service, docs, f"deleted {files[-1].name[:17]}", counters)
+
+
+if __name__ == "__main__":
+    main()
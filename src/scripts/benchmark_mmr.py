@@ -0,0 +1,135 @@
+"""
+Cost and effect of the MMR diversification stage.
+
+Builds candidate sets shaped like our search results: 50 chunks where
+groups of near-identical vectors stand in for overlapping chunks and the
+boilerplate many repositories share. It then times mmr_select() against a
+per-step Python/NumPy MMR loop (langchain's maximal_marginal_relevance when
+installed). It also counts near-duplicate pairs and mean relevance in the
+top 10 with and without MMR, and measures what include_embeddings adds to
+a Chroma query.
+
+Usage:
+    python src/scripts/benchmark_mmr.py --candidates 50 --k 10 --lambda 0.7
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_backends import create_backend
+from rag_chatbot.utils.mmr import mmr_select
+
+DIMENSION = 384
+DUPLICATE_SIMILARITY = 0.95
+
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def candidate_set(rng, n, groups=8):
+    """(query, embeddings as a list of arrays like Chroma returns, similarities to the query)"""
+    query = unit(rng.standard_normal(DIMENSION))
+    centres = unit(query + 0.9 * unit(rng.standard_normal((groups, DIMENSION))))
+    members = rng.integers(groups, size=n)
+    embeddings = unit(centres[members] + 0.15 * unit(rng.standard_normal((n, DIMENSION))))
+    similarities = embeddings @ query
+    order = np.argsort(-similarities)
+    return query, [embeddings[i].astype(np.float32) for i in order], similarities[order].tolist()
+
+
+def loop_mmr(query, embeddings, k, lambda_mult):
+    """MMR recomputing similarities to the selected set at every step"""
+    try:
+        from langchain_community.vectorstores.utils import maximal_marginal_relevance
+        return maximal_marginal_relevance(np.asarray(query), embeddings, lambda_mult=lambda_mult, k=k)
+    except ImportError:
+        pass
+    vectors = np.asarray(embeddings)
+    relevance = vectors @ query
+    selected = [int(np.argmax(relevance))]
+    while len(selected) < k:
+        best, best_score = None, -np.inf
+        for i in range(len(vectors)):
+            if i in selected:
+                continue
+            score = lambda_mult * relevance[i] - (1 - lambda_mult) * max(vectors[i] @ vectors[j] for j in selected)
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+def duplicate_pairs(embeddings, picks):
+    vectors = np.asarray([embeddings[i] for i in picks])
+    similarity = vectors @ vectors.T
+    return int((np.triu(similarity, 1) > DUPLICATE_SIMILARITY).sum())
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, float(np.percentile(timings, 99) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MMR diversification")
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lambda", dest="lambda_mult", type=float, default=0.7)
+    parser.add_argument("--sets", type=int, default=200)
+    parser.add_argument("--collection", type=int, default=20000, help="records for the include_embeddings test")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sets = [candidate_set(rng, args.candidates) for _ in range(args.sets)]
+
+    print(f"{args.candidates} candidates, k={args.k}, lambda={args.lambda_mult}")
+    query, embeddings, similarities = sets[0]
+    p50, p99 = timed(lambda: mmr_select(similarities, embeddings, args.k, args.lambda_mult), 500)
+    print(f"  mmr_select (one matrix product):  p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+    p50, p99 = timed(lambda: loop_mmr(query, embeddings, args.k, args.lambda_mult), 50)
+    print(f"  per-step MMR loop:                p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+    plain_dupes, mmr_dupes, plain_relevance, mmr_relevance = 0, 0, 0.0, 0.0
+    for query, embeddings, similarities in sets:
+        plain = list(range(args.k))
+        picks = mmr_select(similarities, embeddings, args.k, args.lambda_mult)
+        plain_dupes += duplicate_pairs(embeddings, plain)
+        mmr_dupes += duplicate_pairs(embeddings, picks)
+        plain_relevance += sum(similarities[i] for i in plain) / args.k
+        mmr_relevance += sum(similarities[i] for i in picks) / args.k
+    print(f"\nTop {args.k} over {args.sets} candidate sets (pairs with cosine > {DUPLICATE_SIMILARITY}):")
+    print(f"  similarity order: {plain_dupes / args.sets:5.1f} near-duplicate pairs, "
+          f"mean relevance {plain_relevance / args.sets:.3f}")
+    print(f"  MMR:              {mmr_dupes / args.sets:5.1f} near-duplicate pairs, "
+          f"mean relevance {mmr_relevance / args.sets:.3f}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        backend = create_backend("chroma", "mmr", scratch)
+        vectors = unit(rng.standard_normal((args.collection, DIMENSION))).astype(np.float32)
+        for offset in range(0, args.collection, 2000):
+            end = min(offset + 2000, args.collection)
+            backend.add([f"doc_{i}" for i in range(offset, end)], vectors[offset:end].tolist(),
+                        [f"chunk {i}" for i in range(offset, end)], [{"chunk_index": i} for i in range(offset, end)])
+        queries = unit(rng.standard_normal((100, DIMENSION))).tolist()
+        without, _ = timed(lambda: [backend.query(q, n_results=args.candidates) for q in queries], 3)
+        with_embeddings, _ = timed(
+            lambda: [backend.query(q, n_results=args.candidates, include_embeddings=True) for q in queries], 3)
+        print(f"\nChroma query for {args.candidates} of {args.collection} records: "
+              f"{without / len(queries):.2f} ms, with embeddings {with_embeddings / len(queries):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
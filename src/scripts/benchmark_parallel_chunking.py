@@ -0,0 +1,73 @@
+"""
+Benchmark the process-pool chunking stage of repository ingestion.
+
+Extracts files from the given directories the way ingestion does, chunks
+them with 1, 2, 4, ... worker processes (up to --max-workers) and reports
+chunks/sec for each. Every parallel run is checked against the serial run:
+same chunks, same metadata, same order, hence the same document ids.
+
+Usage:
+    python src/scripts/benchmark_parallel_chunking.py --path data/repositories/miso-lims
+    python src/scripts/benchmark_parallel_chunking.py --path /usr/lib/python3.12 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_service import VectorService
+from scripts.ingest_repositories import RepositoryIngester, SmartChunker, chunk_files
+
+
+def run(files, workers):
+    chunker = SmartChunker()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is not None:
+            # Start the workers before timing, as ingestion does once per run
+            list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        documents = [doc for _, chunks, _ in chunk_files(files, chunker, pool) for doc in chunks]
+        seconds = time.perf_counter() - start
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return documents, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel chunking")
+    parser.add_argument("--path", nargs="+", default=["data/repositories"])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    ingester = RepositoryIngester(base_path=str(Path(args.path[0]).parent))
+    files = []
+    for path in args.path:
+        files.extend(ingester.extract_files(Path(path)))
+    size_mb = sum(len(f['content']) for f in files) / 1e6
+    print(f"\n{len(files)} files, {size_mb:.1f} MB, {os.cpu_count()} CPUs available")
+
+    baseline, baseline_seconds = run(files, 1)
+    baseline_ids = [VectorService.document_id(doc) for doc in baseline]
+    print(f"  1 worker : {baseline_seconds:6.2f}s, {len(baseline) / baseline_seconds:8.0f} chunks/s")
+
+    workers = 2
+    while workers <= args.max_workers:
+        documents, seconds = run(files, workers)
+        identical = (
+            [VectorService.document_id(doc) for doc in documents] == baseline_ids
+            and all(a.metadata == b.metadata for a, b in zip(documents, baseline))
+        )
+        print(f"  {workers} workers: {seconds:6.2f}s, {len(documents) / seconds:8.0f} chunks/s, "
+              f"speedup {baseline_seconds / seconds:.2f}x, output identical to serial: {identical}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Overhead and output of the on-demand profiling hooks.
+
+Runs AgentManager.process_message against a scratch index of the markdown
+documents, with the offline LLM stub and a hashed bag-of-words embedder
+(see benchmark_small_to_big.py), so no model download is needed. It
+reports:
+  - mean time per request with the profiler disarmed (the normal path)
+    vs calling the agent directly
+  - the same with the profiler armed, which samples the loop thread
+  - the profiles written and their hottest stacks
+  - a tracemalloc checkpoint around the ingestion step
+
+Usage:
+    python src/scripts/benchmark_profiling.py --requests 200 --llm-latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.agent.agent_factory import AgentManager
+from rag_chatbot.services.vector_service import VectorService
+from rag_chatbot.utils.profiling import MemoryTracer, RequestProfiler, request_profiler
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+from scripts.load_test_chat import QUESTIONS
+
+
+async def timed_requests(call, n):
+    timings = []
+    for i in range(n):
+        message = SimpleNamespace(content=QUESTIONS[i % len(QUESTIONS)])
+        start = time.perf_counter()
+        await call(message)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def top_frames(path, n=5):
+    """Leaf frames with the most samples in a collapsed-stack file"""
+    leaves = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            stack, count = line.rsplit(" ", 1)
+            frames = stack.split(";")
+            leaf = frames[-1] if frames[0] != "[awaiting]" else "[awaiting] " + frames[-1]
+            leaves[leaf] += int(count)
+    return leaves.most_common(n)
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as scratch:
+        tracer = MemoryTracer(output_dir=os.path.join(scratch, "profiles"))
+        tracer.start()
+        service = VectorService(persist_directory=scratch, backend="memory", embeddings=WindowedHashingEmbeddings())
+        service.add_documents(args.docs)
+        report = tracer.checkpoint("ingest_markdown_documents")
+        tracer.stop()
+        with open(report, encoding="utf-8") as f:
+            print("\n" + "".join(f.readlines()[:8]))
+
+        manager = AgentManager(service)
+        manager.current_agent.llm.latency = args.llm_latency
+        agent = manager.current_agent
+
+        await timed_requests(manager.process_message, 10)  # warm up caches
+        direct = await timed_requests(agent.process_message, args.requests)
+        disarmed = await timed_requests(manager.process_message, args.requests)
+
+        request_profiler.output_dir = os.path.join(scratch, "profiles")
+        request_profiler.arm(args.profiled)
+        armed = await timed_requests(manager.process_message, args.profiled)
+
+        print(f"{'path':34s} {'mean ms':>9s} {'p50 ms':>8s}")
+        for label, timings in [("agent.process_message (no hook)", direct),
+                               ("AgentManager, profiler disarmed", disarmed),
+                               (f"AgentManager, profiled ({args.profiled})", armed)]:
+            print(f"{label:34s} {statistics.mean(timings) * 1000:9.3f} {statistics.median(timings) * 1000:8.3f}")
+
+        overhead = statistics.mean(disarmed) - statistics.mean(direct)
+        print(f"\nDisarmed hook overhead: {overhead * 1e6:+.1f} µs per request (noise level)")
+        check = RequestProfiler()
+        start = time.perf_counter()
+        for _ in range(1_000_000):
+            if check.remaining:
+                pass
+        print(f"The disarmed check alone: {(time.perf_counter() - start) * 1000:.0f} ns per request")
+
+        print(f"\n{len(request_profiler.written)} profiles written:")
+        for path in request_profiler.written:
+            with open(path, encoding="utf-8") as f:
+                header = f.readline().strip()
+            print(f"  {os.path.basename(path)}  {header}")
+        if request_profiler.written:
+            print("\nHottest leaf frames in the first profile:")
+            for frame, count in top_frames(request_profiler.written[0]):
+                print(f"  {count:5d}  {frame}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the profiling hooks")
+    parser.add_argument("--docs", default="data/documents")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--profiled", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Cost of deleting and replacing one repository's chunks.
+
+Fills a scratch Chroma store with random unit vectors spread over several
+repositories (no embedding model needed) and times removing one of them:
+
+  * the previous delete_by_repo(): get() every matching record with its
+    document and metadata, then delete by id
+  * delete_where(): the filter pushed down to the backend, ids fetched in
+    bounded batches and deleted
+  * the per-repository layout: dropping the repository's collection
+
+It also times rebuilding a repository in a staging collection and swapping
+it in, and checks that the namespaced backend answers query/get/count like
+a single collection holding the same records.
+
+Usage:
+    python src/scripts/benchmark_repo_deletes.py --docs 20000 --repos 10
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_backends import NamespacedBackend, create_backend, create_namespaced_backend
+
+DIMENSION = 384
+
+
+def random_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def route(metadata):
+    return NamespacedBackend.namespace_key('repo', metadata['repo_name'])
+
+
+def fill(backend, vectors, n_repos, batch_size=1000):
+    for offset in range(0, len(vectors), batch_size):
+        end = min(offset + batch_size, len(vectors))
+        backend.add(
+            [f"doc_{i}" for i in range(offset, end)],
+            vectors[offset:end].tolist(),
+            [f"document {i} " + "padding " * 100 for i in range(offset, end)],
+            [{"repo_name": f"repo_{i % n_repos}", "chunk_index": i, "language": "java"}
+             for i in range(offset, end)]
+        )
+
+
+def previous_delete(backend, repo_name):
+    """What delete_by_repo() did before: full records back, then delete by id"""
+    results = backend.get(where={"repo_name": repo_name})
+    transferred = sum(len(r['content']) + len(str(r['metadata'])) for r in results)
+    backend.delete(ids=[r['id'] for r in results])
+    return len(results), transferred
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def recall(backend, vectors, queries, k=10):
+    """Fraction of the exact top-k (brute force) that the backend returns"""
+    found = 0
+    for query in queries:
+        exact = {f"doc_{i}" for i in np.argsort(-(vectors @ query))[:k]}
+        found += len(exact & {r['id'] for r in backend.query(query.tolist(), n_results=k)})
+    return found / (k * len(queries))
+
+
+def check_namespaced(single, namespaced, vectors, queries):
+    assert single.count() == namespaced.count(), "count"
+    hits = namespaced.query(queries[0].tolist(), n_results=10)
+    assert [h['distance'] for h in hits] == sorted(h['distance'] for h in hits), "merged by distance"
+    assert recall(namespaced, vectors, queries) >= recall(single, vectors, queries) - 0.05, "merged recall"
+    filtered = namespaced.get(where={"repo_name": "repo_1"}, include_documents=False)
+    assert all(r['metadata']['repo_name'] == "repo_1" for r in filtered), "filtered get"
+    pages = [namespaced.get(limit=700, offset=offset, include_documents=False)
+             for offset in range(0, namespaced.count(), 700)]
+    paged_ids = [r['id'] for page in pages for r in page]
+    assert len(paged_ids) == len(set(paged_ids)) == namespaced.count(), "paging visits every record once"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-repository deletes")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = random_vectors(rng, args.docs)
+    queries = random_vectors(rng, 20)
+    per_repo = args.docs // args.repos
+
+    with tempfile.TemporaryDirectory() as scratch:
+        single = create_backend("chroma", "single", scratch)
+        fill(single, vectors, args.repos)
+        namespaced = create_namespaced_backend("chroma", "namespaced", route, scratch)
+        fill(namespaced, vectors, args.repos)
+        check_namespaced(single, namespaced, vectors, queries)
+        print("✓ namespaced backend answers like a single collection (query, filtered get, paging, count)")
+        print(f"  top-10 recall vs brute force: single {recall(single, vectors, queries):.2f}, "
+              f"namespaced {recall(namespaced, vectors, queries):.2f}")
+
+        reopened = create_namespaced_backend("chroma", "namespaced", route, scratch)
+        assert reopened.count() == namespaced.count(), "namespaces are rediscovered on reopen"
+
+        print(f"\n{args.docs} chunks in {args.repos} repositories (~{per_repo} per repository)")
+        (deleted, transferred), ms = timed(lambda: previous_delete(single, "repo_0"))
+        print(f"  get + delete by id (previous): {ms:9.1f} ms  {deleted} chunks, "
+              f"{transferred / 1e6:.1f} MB of documents/metadata fetched")
+
+        deleted, ms = timed(lambda: single.delete_where({"repo_name": "repo_1"}, args.batch_size))
+        print(f"  delete_where pushdown:         {ms:9.1f} ms  {deleted} chunks, ids only")
+
+        deleted, ms = timed(lambda: namespaced.drop_namespace(route({"repo_name": "repo_0"})))
+        print(f"  drop repository namespace:     {ms:9.1f} ms  {deleted} chunks")
+        assert namespaced.count() == args.docs - deleted
+
+        key = route({"repo_name": "repo_2"})
+        rows = [i for i in range(args.docs) if i % args.repos == 2]
+        replacement = random_vectors(rng, len(rows))
+
+        def rebuild():
+            namespaced.begin_replace(key)
+            namespaced.upsert(
+                [f"doc_{i}" for i in rows], replacement.tolist(),
+                [f"rebuilt {i}" for i in rows],
+                [{"repo_name": "repo_2", "chunk_index": i, "language": "java"} for i in rows]
+            )
+            # Reads are still served from the live collection until the swap
+            assert namespaced.get(ids=[f"doc_{rows[0]}"])[0]['content'].startswith("document")
+            _, swap_ms = timed(lambda: namespaced.commit_replace(key))
+            return swap_ms
+
+        swap_ms, total_ms = timed(rebuild)
+        assert namespaced.get(ids=[f"doc_{rows[0]}"])[0]['content'].startswith("rebuilt")
+        assert namespaced.count() == args.docs - per_repo
+        print(f"  rebuild repository in staging: {total_ms:9.1f} ms  (swap itself {swap_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Per-query latency and recall of the sharded ("source_type") layout against
+a single collection.
+
+Builds a synthetic corpus shaped like ours: a few thousand markdown doc
+chunks and many more repository chunks (code, docs, configuration), as
+random 384-dim unit vectors drawn around per-shard topic centres, with
+code chunks packed more tightly so they sit closer to every query. No
+embedding model is needed. The same records go into a single collection
+and into one collection per search shard, and two query mixes are run:
+
+  * doc-oriented queries restricted to the QA agent's shards
+    (docs, repo_docs): a where filter on the single collection vs querying
+    only those shard collections
+  * unrestricted queries: the single collection vs fanning out to every
+    shard, merged on raw and on calibrated distances
+
+Recall is measured against the exact (brute-force) top-k over the records
+each search is allowed to see. For calibrated merging, which deliberately
+reorders across shards, the share of doc results in the top-k is shown too.
+
+Usage:
+    python src/scripts/benchmark_sharded_search.py --code 20000 --docs 2000
+    python src/scripts/benchmark_sharded_search.py --backend memory
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_backends import create_backend, create_namespaced_backend
+from rag_chatbot.services.vector_service import VectorService, SEARCH_SHARDS
+
+DIMENSION = 384
+QA_SHARDS = ["docs", "repo_docs"]
+DOC_SHARDS = {"docs", "repo_docs"}
+
+
+def clustered_vectors(rng, n, centres, spread):
+    picks = rng.integers(len(centres), size=n)
+    vectors = centres[picks] + spread * rng.standard_normal((n, DIMENSION)) / np.sqrt(DIMENSION)
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def unit(rng, n):
+    vectors = rng.standard_normal((n, DIMENSION))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def synthetic_corpus(rng, n_code, n_docs):
+    """(vectors, metadatas, doc topic centres)"""
+    doc_centres = unit(rng, 20)
+    code_centres = unit(rng, 40)
+    parts = [
+        (clustered_vectors(rng, n_docs, doc_centres, 1.2), {"source_type": "markdown_document"}),
+        (clustered_vectors(rng, n_code, code_centres, 0.8),
+         {"source_type": "repository", "file_category": "code"}),
+        (clustered_vectors(rng, n_code // 10, doc_centres, 1.2),
+         {"source_type": "repository", "file_category": "documentation"}),
+        (clustered_vectors(rng, n_code // 10, code_centres, 1.0),
+         {"source_type": "repository", "file_category": "configuration"}),
+    ]
+    vectors = np.concatenate([part[0] for part in parts])
+    metadatas = [dict(metadata, chunk_index=i) for part_vectors, metadata in parts for i in range(len(part_vectors))]
+    return vectors, metadatas, doc_centres, code_centres
+
+
+def fill(backend, vectors, metadatas, batch_size=1000):
+    for offset in range(0, len(vectors), batch_size):
+        end = min(offset + batch_size, len(vectors))
+        backend.add([f"doc_{i}" for i in range(offset, end)], vectors[offset:end].tolist(),
+                    [f"chunk {i}" for i in range(offset, end)], metadatas[offset:end])
+
+
+def run(search, queries, vectors, allowed, shards, k):
+    """p50/p99 latency (ms), recall@k against brute force over the allowed rows, share of doc results"""
+    latencies, found, docs = [], 0, 0
+    allowed_rows = np.flatnonzero(allowed)
+    for query in queries:
+        start = time.perf_counter()
+        results = search(query.tolist())
+        latencies.append(time.perf_counter() - start)
+        exact = allowed_rows[np.argsort(-(vectors[allowed_rows] @ query))[:k]]
+        found += len({f"doc_{i}" for i in exact} & {r["id"] for r in results})
+        docs += sum(1 for r in results if shards[int(r["id"][4:])] in DOC_SHARDS)
+    return (float(np.percentile(latencies, 50) * 1000), float(np.percentile(latencies, 99) * 1000),
+            found / (k * len(queries)), docs / (k * len(queries)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded vs single-collection search")
+    parser.add_argument("--code", type=int, default=20000, help="repository code chunks")
+    parser.add_argument("--docs", type=int, default=2000, help="markdown doc chunks")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", default="chroma", choices=["chroma", "memory"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, metadatas, doc_centres, code_centres = synthetic_corpus(rng, args.code, args.docs)
+    shards = [VectorService.shard_of(metadata) for metadata in metadatas]
+    doc_queries = clustered_vectors(rng, args.queries, doc_centres, 1.5)
+    mixed_queries = np.concatenate([doc_queries[:args.queries // 2],
+                                    clustered_vectors(rng, args.queries - args.queries // 2, code_centres, 1.5)])
+    everything = np.ones(len(vectors), dtype=bool)
+    qa_rows = np.array([shard in QA_SHARDS for shard in shards])
+
+    with tempfile.TemporaryDirectory() as scratch:
+        single = create_backend(args.backend, "single", scratch)
+        fill(single, vectors, metadatas)
+        sharded = create_namespaced_backend(args.backend, "sharded", VectorService.shard_of, scratch,
+                                            max_workers=args.workers)
+        fill(sharded, vectors, metadatas)
+        calibrated = create_namespaced_backend(args.backend, "sharded", VectorService.shard_of, scratch,
+                                               max_workers=args.workers, calibrate=True)
+        # Calibration needs a history of distances per shard; warm it on queries outside the measured set
+        for query in clustered_vectors(rng, 50, np.concatenate([doc_centres, code_centres]), 1.5):
+            calibrated.query(query.tolist(), n_results=args.k)
+
+        counts = {key: backend.count() for key, backend in sorted(sharded.namespaces.items())}
+        print(f"\n{len(vectors)} chunks ({args.backend}); shards: {counts}")
+        qa_filter = VectorService.shard_filter(QA_SHARDS)
+        rows = [
+            ("QA shards", "single + where filter", doc_queries, qa_rows,
+             lambda q: single.query(q, n_results=args.k, where=qa_filter)),
+            ("QA shards", "sharded", doc_queries, qa_rows,
+             lambda q: sharded.query(q, n_results=args.k, namespaces=QA_SHARDS)),
+            ("all shards", "single collection", mixed_queries, everything,
+             lambda q: single.query(q, n_results=args.k)),
+            ("all shards", "sharded, raw merge", mixed_queries, everything,
+             lambda q: sharded.query(q, n_results=args.k)),
+            ("all shards", "sharded, calibrated", mixed_queries, everything,
+             lambda q: calibrated.query(q, n_results=args.k)),
+        ]
+        print(f"{'queries':12s} {'layout':24s} {'p50 ms':>8s} {'p99 ms':>8s} {'recall@' + str(args.k):>10s} {'doc share':>10s}")
+        for label, layout, queries, allowed, search in rows:
+            p50, p99, recall, doc_share = run(search, queries, vectors, allowed, shards, args.k)
+            print(f"{label:12s} {layout:24s} {p50:8.2f} {p99:8.2f} {recall:10.2f} {doc_share:10.2f}")
+
+        print("\nshard distance calibration:")
+        for key, stats in calibrated.calibration_stats().items():
+            print(f"  {key:12s} mean {stats['mean']:.3f}  std {stats['std']:.3f}  ({stats['samples']} samples)")
+        assert set(counts) <= set(SEARCH_SHARDS), "every record routed to a known shard"
+
+
+if __name__ == "__main__":
+    main()
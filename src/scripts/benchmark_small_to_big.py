@@ -0,0 +1,173 @@
+"""
+Embedding cost and answer-context quality of small-to-big indexing.
+
+Chunks the files under --path the way ingestion does (SmartChunker) and
+indexes them twice into scratch in-memory stores: as today (every chunk
+embedded and returned as-is) and small-to-big (small child chunks embedded,
+the chunk stored once in the parent store and returned for any of its
+children). For each it reports records embedded, characters embedded,
+characters past the embedding model's window, embedding time per indexed
+character, and index size.
+
+Context quality is measured with needle queries: a random 12-token span is
+taken from a random chunk, anywhere in it, and searched for. A hit means the
+span is in the context the agent would receive (the top --k results). The
+script also reports how many characters of context that costs.
+
+No model download is needed. The embedder is a hashed bag-of-words that,
+like all-MiniLM-L6-v2, only sees the first 256 tokens of each text (word
+and punctuation tokens here, which undercounts word pieces, so the real
+model truncates somewhat earlier). Its similarities are lexical, so
+compare the two layouts with each other, not with the real model's
+absolute numbers.
+
+Usage:
+    python src/scripts/benchmark_small_to_big.py --path src data/documents
+    python src/scripts/benchmark_small_to_big.py --path data/repositories --queries 500 --child-size 300
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from langchain_core.documents import Document
+
+from rag_chatbot.config import settings
+from rag_chatbot.services.vector_service import VectorService
+from scripts.ingest_repositories import RepositoryIngester, SmartChunker
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+class WindowedHashingEmbeddings:
+    """Hashed bag-of-words vectors of the first max_tokens tokens; counts what it embeds and drops"""
+
+    def __init__(self, dimension: int = 384, max_tokens: int = 256):
+        self.dimension = dimension
+        self.max_tokens = max_tokens
+        self.embedded_chars = 0
+        self.truncated_chars = 0
+        self.seconds = 0.0
+
+    def _vector(self, text):
+        tokens = list(TOKEN.finditer(text))
+        if len(tokens) > self.max_tokens:
+            cut = tokens[self.max_tokens].start()
+            self.truncated_chars += len(text) - cut
+            tokens = tokens[:self.max_tokens]
+        self.embedded_chars += len(text)
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in tokens:
+            digest = hashlib.blake2b(token.group().lower().encode(), digest_size=4).digest()
+            vector[int.from_bytes(digest, 'little') % self.dimension] += 1.0
+        vector = np.log1p(vector)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        start = time.perf_counter()
+        vectors = [self._vector(text) for text in texts]
+        self.seconds += time.perf_counter() - start
+        return vectors
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def chunk_corpus(paths):
+    ingester = RepositoryIngester(base_path=tempfile.gettempdir())
+    chunker = SmartChunker()
+    documents = []
+    for base in paths:
+        for file_path in sorted(Path(base).rglob('*')):
+            if not file_path.is_file() or '__pycache__' in file_path.parts:
+                continue
+            category = ingester.categorize_file(file_path)
+            if category == 'other':
+                continue
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            metadata = {'repo_name': Path(base).name, 'source_file': str(file_path), 'file_category': category,
+                        'language': ingester.detect_language(file_path), 'source_type': 'repository'}
+            for i, doc in enumerate(chunker.chunk(content, metadata)):
+                doc.metadata['chunk_index'] = i
+                documents.append(doc)
+    return documents
+
+
+def needles(documents, n, rng, span=12):
+    """(chunk index, needle text) pairs: a span of `span` tokens from anywhere in a chunk"""
+    picked = []
+    while len(picked) < n:
+        i = rng.randrange(len(documents))
+        text = documents[i].page_content
+        tokens = list(TOKEN.finditer(text))
+        if len(tokens) < span * 2:
+            continue
+        start = rng.randrange(len(tokens) - span)
+        picked.append((i, text[tokens[start].start():tokens[start + span - 1].end()]))
+    return picked
+
+
+def directory_bytes(path):
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark small-to-big indexing")
+    parser.add_argument("--path", nargs="+", default=["src", "data/documents"])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--child-size", type=int, default=settings.child_chunk_size)
+    args = parser.parse_args()
+
+    settings.child_chunk_size = args.child_size
+    documents = chunk_corpus(args.path)
+    if not documents:
+        print(f"No files to chunk under {args.path}")
+        return
+    sizes = [len(doc.page_content) for doc in documents]
+    print(f"{len(documents)} chunks from {args.path}: mean {np.mean(sizes):.0f} chars, max {max(sizes)}")
+    rng = random.Random(0)
+    queries = needles(documents, args.queries, rng)
+
+    print(f"\n{'layout':14s} {'records':>8s} {'chars embedded':>15s} {'past window':>12s} "
+          f"{'embed s/M chars':>16s} {'index MB':>9s} {'hit@' + str(args.k):>7s} {'context chars':>14s}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for label, small_to_big in [("chunks", False), ("small-to-big", True)]:
+            store = os.path.join(scratch, label)
+            embeddings = WindowedHashingEmbeddings()
+            service = VectorService(persist_directory=store, backend="memory", embeddings=embeddings,
+                                    small_to_big=small_to_big)
+            copies = [Document(page_content=d.page_content, metadata=dict(d.metadata)) for d in documents]
+            service.add_document_objects(copies, batch_size=500)
+            records = service.backend.count()
+            index_mb = (records * 384 * 4 + directory_bytes(store)) / 1e6
+
+            hits, context_chars = 0, 0
+            for _, needle in queries:
+                results = service.search(needle, n_results=args.k)
+                context = "\n".join(r['content'] for r in results)
+                hits += needle in context
+                context_chars += len(context)
+            per_million = embeddings.seconds / embeddings.embedded_chars * 1e6
+            print(f"{label:14s} {records:8d} {embeddings.embedded_chars:15,d} "
+                  f"{embeddings.truncated_chars / embeddings.embedded_chars:11.1%} {per_million:16.2f} "
+                  f"{index_mb:9.2f} {hits / len(queries):7.2f} {context_chars / len(queries):14.0f}")
+            service.parent_store.close()
+
+
+if __name__ == "__main__":
+    main()
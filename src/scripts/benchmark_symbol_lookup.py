@@ -0,0 +1,104 @@
+"""
+Benchmark the exact symbol-name fast path used before vector search.
+
+Chunks every .py, .java, .wdl and .shesmu file under the given directories
+the way ingestion does with symbol_chunking on, indexes the chunk metadata,
+and reports index build and load times plus per-question lookup latency.
+--synthetic adds generated names so the index can be sized like a large
+deployment.
+
+Usage:
+    python src/scripts/benchmark_symbol_lookup.py --path data/repositories
+    python src/scripts/benchmark_symbol_lookup.py --path /usr/lib/python3.12 --synthetic 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.symbol_index import SymbolIndex
+from scripts.ingest_repositories import SmartChunker
+
+SUFFIXES = {'.py': 'python', '.java': 'java', '.wdl': 'wdl', '.shesmu': 'shesmu'}
+
+
+def chunk_sources(paths, chunker):
+    records = []
+    for base in paths:
+        for file_path in Path(base).rglob('*'):
+            language = SUFFIXES.get(file_path.suffix)
+            if language is None or not file_path.is_file():
+                continue
+            try:
+                content = file_path.read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                continue
+            metadata = {'file_category': 'code', 'file_type': file_path.suffix, 'language': language,
+                        'source_file': str(file_path)}
+            for i, doc in enumerate(chunker.chunk(content, metadata)):
+                records.append((f"{file_path}#{i}", doc.page_content, doc.metadata))
+    return records
+
+
+def synthetic_records(n):
+    for i in range(n):
+        yield (f"synthetic_{i}", "", {'symbol_name': f"generatedHelper{i}", 'symbol_kind': 'function'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact symbol lookup")
+    parser.add_argument("--path", nargs="+", default=["data/repositories"])
+    parser.add_argument("--synthetic", type=int, default=0, help="generated names to add to the index")
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    records = chunk_sources(args.path, SmartChunker(symbol_chunking=True))
+    with tempfile.TemporaryDirectory() as directory:
+        index = SymbolIndex(directory)
+        start = time.perf_counter()
+        index.add_many(records)
+        index.add_many(synthetic_records(args.synthetic))
+        build_seconds = time.perf_counter() - start
+        index.save()
+
+        start = time.perf_counter()
+        index = SymbolIndex(directory)
+        load_seconds = time.perf_counter() - start
+        size_mb = Path(index.path).stat().st_size / 1e6
+
+    names = [postings[0][1] for postings in list(index.entries.values())[:500]]
+    if not names:
+        print("No symbols found; pass --path with some source files")
+        return
+    questions = [
+        f"what does `{names[i % len(names)]}` do and how is it called?" for i in range(args.queries // 2)
+    ] + [
+        f"show me the {names[i % len(names)]} task and explain the inputs" for i in range(args.queries // 2)
+    ] + ["how do I request a new assay in the pipeline for my project?"] * 1000
+
+    hits = 0
+    start = time.perf_counter()
+    for question in questions:
+        hits += bool(index.match_query(question))
+    lookup_seconds = time.perf_counter() - start
+
+    misses = questions[-1000:]
+    start = time.perf_counter()
+    for question in misses:
+        index.match_query(question)
+    miss_seconds = time.perf_counter() - start
+
+    print(f"Chunks indexed:   {len(records)} (+{args.synthetic} synthetic names)")
+    print(f"Distinct names:   {len(index)} ({size_mb:.2f} MB on disk)")
+    print(f"Build:            {build_seconds:.3f}s, load from disk: {load_seconds:.3f}s")
+    print(f"Lookup per question: {lookup_seconds / len(questions) * 1e6:.1f} us "
+          f"({hits}/{len(questions)} questions with exact hits)")
+    print(f"Lookup per question without identifiers: {miss_seconds / len(misses) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Performance comparison for vector-store backends.
+
+Each backend is timed on a synthetic corpus; tests/test_vector_backends.py
+checks that they behave identically. Random unit vectors stand in for real
+embeddings, so no embedding model is loaded.
+
+Usage:
+    python src/scripts/benchmark_vector_backends.py --docs 20000 --queries 200
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.vector_backends import create_backend
+
+DIMENSION = 384
+
+
+def random_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def benchmark(make_backend, n_docs, n_queries, batch_size=1000):
+    rng = np.random.default_rng(1)
+    backend = make_backend("benchmark")
+    vectors = random_vectors(rng, n_docs)
+    queries = random_vectors(rng, n_queries)
+    repos = [f"repo_{i % 50}" for i in range(n_docs)]
+
+    start = time.perf_counter()
+    for offset in range(0, n_docs, batch_size):
+        end = min(offset + batch_size, n_docs)
+        backend.add(
+            [f"doc_{i}" for i in range(offset, end)],
+            vectors[offset:end].tolist(),
+            [f"document {i}" for i in range(offset, end)],
+            [{"repo_name": repos[i], "chunk_index": i} for i in range(offset, end)]
+        )
+    add_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.query(query.tolist(), n_results=15)
+        latencies.append(time.perf_counter() - start)
+
+    filtered_latencies = []
+    for query in queries[:max(1, n_queries // 4)]:
+        start = time.perf_counter()
+        backend.query(query.tolist(), n_results=15, where={"repo_name": "repo_7"})
+        filtered_latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    backend.delete(where={"repo_name": "repo_3"})
+    delete_seconds = time.perf_counter() - start
+
+    backend.drop()
+    return {
+        "add_docs_per_sec": n_docs / add_seconds,
+        "query_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "query_p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "filtered_query_p50_ms": float(np.percentile(filtered_latencies, 50) * 1000),
+        "delete_by_filter_ms": delete_seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vector-store backends")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["memory", "chroma"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for kind in args.backends:
+            def make_backend(name, kind=kind):
+                return create_backend(kind, name, persist_directory=tmp_dir)
+
+            print(f"\n=== {kind} ===")
+            results = benchmark(make_backend, args.docs, args.queries)
+            for key, value in results.items():
+                print(f"  {key}: {value:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark WDL block extraction on large generated files.
+
+Compares the single-pass extractor with the previous approach (a regex scan
+plus a character-by-character brace walk from every match). On well-formed
+files both must find the same blocks. The "unbalanced" files put a lone
+brace inside each heredoc, as real shell code does. The old walk then
+misreads nesting and rescans to the end of the file from every match.
+
+Usage:
+    python src/scripts/benchmark_wdl_parser.py --tasks 200 500 1000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.utils.wdl_parser import extract_wdl_blocks
+
+LEGACY_PATTERN = re.compile(r'(task|workflow|struct)\s+(\w+)\s*\{', re.MULTILINE)
+
+TASK_TEMPLATE = '''
+task step{i} {{
+  input {{
+    File inputBam
+    String prefix = "sample{i}"
+    Int threads = 8
+    String modules = "samtools/1.9 gatk/4.2"
+  }}
+
+  command <<<
+    set -euo pipefail
+    samtools view -@ ~{{threads}} ~{{inputBam}} | awk '{{print $1}}' > ~{{prefix}}.names
+    if [ -s ~{{prefix}}.names ]; then {{ echo ok; }}; fi{extra}
+  >>>
+
+  runtime {{
+    memory: "~{{threads * 2}} GB"
+    modules: "~{{modules}}"
+  }}
+
+  output {{
+    File names = "~{{prefix}}.names"
+  }}
+
+  meta {{
+    output_meta: {{ names: "read names for step {i}" }}
+  }}
+}}
+'''
+
+
+def generate_wdl(n_tasks: int, unbalanced: bool = False) -> str:
+    calls = "\n".join(
+        f"    call step{i} {{ input: inputBam = bam }}" for i in range(n_tasks)
+    )
+    workflow = f"""version 1.0
+
+struct Sample {{
+  String name
+  File bam
+}}
+
+workflow generated {{
+  input {{
+    File bam
+  }}
+  scatter (s in [1, 2]) {{
+{calls}
+  }}
+}}
+"""
+    extra = '\n    echo "{" >> brace.log' if unbalanced else ''
+    return workflow + "".join(TASK_TEMPLATE.format(i=i, extra=extra) for i in range(n_tasks))
+
+
+def legacy_extract(content: str):
+    """The previous SmartChunker logic: brace walk from each regex match"""
+    blocks = []
+    for match in LEGACY_PATTERN.finditer(content):
+        brace_count = 0
+        in_block = False
+        for i in range(match.start(), len(content)):
+            char = content[i]
+            if char == '{':
+                brace_count += 1
+                in_block = True
+            elif char == '}':
+                brace_count -= 1
+                if in_block and brace_count == 0:
+                    blocks.append((match.group(1), match.group(2), content[match.start():i + 1]))
+                    break
+    return blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WDL block extraction")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[200, 500, 1000])
+    args = parser.parse_args()
+
+    for unbalanced in (False, True):
+        print("Unbalanced braces in heredocs:" if unbalanced else "Well-formed:")
+        for n_tasks in args.tasks:
+            run_case(n_tasks, unbalanced)
+
+
+def run_case(n_tasks: int, unbalanced: bool):
+    content = generate_wdl(n_tasks, unbalanced)
+
+    start = time.perf_counter()
+    blocks = extract_wdl_blocks(content)
+    new_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = legacy_extract(content)
+    legacy_seconds = time.perf_counter() - start
+
+    assert len(blocks) == n_tasks + 2, f"expected {n_tasks + 2} blocks, got {len(blocks)}"
+    if not unbalanced:
+        assert [(b.kind, b.name, b.text(content)) for b in blocks] == legacy, "block mismatch"
+
+    size_mb = len(content) / 1e6
+    print(f"{n_tasks:5d} tasks ({size_mb:.2f} MB): single-pass {new_seconds * 1000:8.1f} ms "
+          f"({size_mb / new_seconds:6.1f} MB/s), legacy {legacy_seconds * 1000:8.1f} ms, "
+          f"speedup {legacy_seconds / new_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare two ingestion reports written by ingest_repositories.py.
+
+Prints each stage's seconds and throughput in both runs, plus peak RSS,
+and flags stages whose throughput dropped by more than --threshold.
+Exits with status 1 when any stage regressed, so it can gate CI.
+
+Usage:
+    python src/scripts/compare_ingestion_reports.py ingestion_reports/ingest_A.json ingestion_reports/ingest_B.json
+"""
+import argparse
+import json
+import sys
+
+RATES = ['embeddings_per_s', 'chunks_per_s', 'files_per_s', 'repos_per_s']
+
+
+def main_rate(entry):
+    """The stage's headline throughput: embeddings/s for embed, chunks/s for chunk and write, ..."""
+    for rate in RATES:
+        if rate in entry:
+            return rate, entry[rate]
+    return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two ingestion reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="throughput drop counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"{'stage':8s} {'base s':>9s} {'new s':>9s}  {'throughput':28s} {'change':>8s}")
+    regressions = []
+    for stage in dict.fromkeys(list(baseline['stages']) + list(candidate['stages'])):
+        old, new = baseline['stages'].get(stage, {}), candidate['stages'].get(stage, {})
+        rate, old_rate = main_rate(old)
+        new_rate = new.get(rate) if rate else None
+        change = ""
+        if old_rate and new_rate:
+            ratio = new_rate / old_rate - 1
+            change = f"{ratio:+.0%}"
+            if ratio < -args.threshold:
+                regressions.append(stage)
+                change += " !"
+        throughput = f"{old_rate or 0:,.1f} -> {new_rate or 0:,.1f} {rate or ''}"
+        print(f"{stage:8s} {old.get('seconds', 0):9.2f} {new.get('seconds', 0):9.2f}  {throughput:28s} {change:>8s}")
+
+    print(f"\nwall: {baseline['wall_seconds']:.1f}s -> {candidate['wall_seconds']:.1f}s, "
+          f"peak RSS: {baseline.get('peak_rss_mb') or 0:.0f} -> {candidate.get('peak_rss_mb') or 0:.0f} MB")
+    if regressions:
+        print(f"Throughput regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,39 @@
 import os
+import time
 import git
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 import re
 import mimetypes
 
+from rag_chatbot.config import settings
+from rag_chatbot.services.ingestion_journal import IngestionJournal
+from rag_chatbot.services.ingestion_report import IngestionReport
+from rag_chatbot.utils.profiling import ingestion_memory
+from rag_chatbot.utils.code_chunkers import SYMBOL_LANGUAGES, chunk_code
+from rag_chatbot.utils.file_walker import read_text_files, walk_files
+from rag_chatbot.utils.wdl_parser import extract_wdl_blocks
+
 
 class RepositoryIngester:
-    def __init__(self, base_path: str = "./data/repositories"):
+    def __init__(self, base_path: str = "./data/repositories",
+                 max_file_bytes: int = 1_000_000, read_workers: int = 8):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         
+        # Larger files (data dumps, generated code) are skipped; reads run on a thread pool
+        self.max_file_bytes = max_file_bytes
+        self.read_workers = read_workers
+        
         # Enhanced file type mappings
         self.doc_extensions = {'.md', '.rst', '.txt', '.adoc', '.asciidoc', '.org'}
         self.code_extensions = {
             '.wdl', '.java', '.py', '.sh', '.js', '.ts', '.jsx', '.tsx',
             '.go', '.rs', '.c', '.cpp', '.h', '.hpp', '.cs', '.rb', '.php',
-            '.scala', '.kt', '.swift', '.r', '.sql'
+            '.scala', '.kt', '.swift', '.r', '.sql', '.shesmu'
         }
         self.config_extensions = {
             '.json', '.yaml', '.yml', '.toml', '.ini', '.xml', 
@@ -55,6 +70,7 @@ class RepositoryIngester:
             '.github/workflows',     # GitHub Actions - often identical
             'compare.sh'
         }
+        self._exclude_path_parts = [tuple(path.split('/')) for path in self.exclude_files if '/' in path]
         
         # Language detection mapping
         self.lang_map = {
@@ -65,6 +81,7 @@ class RepositoryIngester:
             '.jsx': 'react',
             '.tsx': 'react-typescript',
             '.wdl': 'wdl',
+            '.shesmu': 'shesmu',
             '.sh': 'bash',
             '.bash': 'bash',
             '.go': 'go',
@@ -91,16 +108,16 @@ class RepositoryIngester:
 
     def should_exclude_file(self, file_path: Path) -> bool:
         """Check if file should be excluded"""
+        # Exact filename matches, also covering LICENSE.md, Jenkinsfile.old and the like
         file_name = file_path.name
-        
-        # Check exact filename matches
-        if file_name in self.exclude_files:
+        if file_name in self.exclude_files or file_name.split('.', 1)[0] in self.exclude_files:
             return True
         
-        # Check if file is in excluded directory path
-        path_str = str(file_path)
-        for excluded_path in self.exclude_files:
-            if excluded_path in path_str:
+        # Excluded directory paths such as .github/workflows (pruned by extract_files already)
+        parts = file_path.parts
+        for excluded_parts in self._exclude_path_parts:
+            width = len(excluded_parts)
+            if any(parts[i:i + width] == excluded_parts for i in range(len(parts) - width)):
                 return True
         
         return False
@@ -125,9 +142,10 @@ class RepositoryIngester:
         
         return local_path
     
-    def get_file_metadata(self, file_path: Path, repo_path: Path) -> Dict:
+    def get_file_metadata(self, file_path: Path, repo_path: Path, relative_path: Path = None) -> Dict:
         """Get comprehensive file metadata"""
-        relative_path = file_path.relative_to(repo_path)
+        if relative_path is None:
+            relative_path = file_path.relative_to(repo_path)
         suffix = file_path.suffix.lower()
         file_name = file_path.name
         
@@ -187,9 +205,10 @@ class RepositoryIngester:
     def extract_files(
         self, 
         repo_path: Path,
-        include_categories: List[str] = None
+        include_categories: List[str] = None,
+        report: IngestionReport = None
     ) -> List[Dict[str, Any]]:
-        """Extract files with enhanced metadata"""
+        """Extract files with enhanced metadata (walk and read times go to `report` when given)"""
         if include_categories is None:
             include_categories = ['documentation', 'code', 'configuration']
         
@@ -208,52 +227,74 @@ class RepositoryIngester:
             '.lock', '.log'
         }
         
-        excluded_count = 0
+        exclude_suffixes = tuple(exclude_patterns)
+        exclude_paths = {path for path in self.exclude_files if '/' in path}
         
-        for file_path in repo_path.rglob('*'):
-            # Skip directories and excluded paths
-            if file_path.is_dir():
-                continue
-            if any(excluded in file_path.parts for excluded in exclude_dirs):
-                continue
-            if any(file_path.name.endswith(pattern) for pattern in exclude_patterns):
+        excluded_count = 0
+        skipped_count = 0
+        candidates = []
+        walked_count = 0
+        
+        # Excluded and .gitignore'd directories are pruned before descending into them
+        walk_start = time.perf_counter()
+        for walked in walk_files(str(repo_path), exclude_dirs, exclude_paths):
+            walked_count += 1
+            if walked.name.endswith(exclude_suffixes):
                 continue
             
+            relative_path = Path(walked.relative_path)
+            file_path = repo_path / relative_path
+            
             # Skip excluded common files
             if self.should_exclude_file(file_path):
                 excluded_count += 1
                 continue
             
             # Get metadata
-            metadata = self.get_file_metadata(file_path, repo_path)
+            metadata = self.get_file_metadata(file_path, repo_path, relative_path)
             category = metadata['file_category']
             
             # Skip if not in included categories
             if category not in include_categories:
                 continue
             
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                # Skip empty or very small files
-                if len(content.strip()) < 50:
-                    continue
-                
-                # Add file size to metadata
-                metadata['file_size'] = len(content)
-                
-                documents.append({
-                    'content': content,
-                    'metadata': metadata
-                })
-                
-            except Exception as e:
-                print(f"  Error reading {file_path}: {e}")
+            if walked.size > self.max_file_bytes:
+                skipped_count += 1
                 continue
+            
+            candidates.append((walked.path, metadata))
+        
+        if report is not None:
+            report.add('walk', time.perf_counter() - walk_start, files=walked_count)
+        
+        # Read in parallel; binary files come back as None
+        read_start = time.perf_counter()
+        contents = read_text_files([path for path, _ in candidates], self.max_file_bytes, self.read_workers)
+        if report is not None:
+            report.add('read', time.perf_counter() - read_start, files=len(candidates),
+                       bytes=sum(len(content) for content in contents if content is not None))
+        
+        for (path, metadata), content in zip(candidates, contents):
+            if content is None:
+                skipped_count += 1
+                continue
+            
+            # Skip empty or very small files
+            if len(content.strip()) < 50:
+                continue
+            
+            # Add file size to metadata
+            metadata['file_size'] = len(content)
+            
+            documents.append({
+                'content': content,
+                'metadata': metadata
+            })
         
         if excluded_count > 0:
             print(f"  Excluded {excluded_count} common infrastructure files")
+        if skipped_count > 0:
+            print(f"  Skipped {skipped_count} binary or oversized files")
         print(f"  Extracted {len(documents)} files from {repo_path.name}")
         return documents
 
@@ -261,8 +302,18 @@ class RepositoryIngester:
 class SmartChunker:
     """Unified chunker that handles different content types intelligently"""
     
-    def __init__(self):
-        self.wdl_pattern = re.compile(r'(task|workflow|struct)\s+(\w+)\s*\{', re.MULTILINE)
+    def __init__(self, symbol_chunking: Optional[bool] = None):
+        # Python/Java along function and class boundaries (defaults to settings.symbol_chunking)
+        self.symbol_chunking = settings.symbol_chunking if symbol_chunking is None else symbol_chunking
+        
+        # WDL blocks larger than this are sub-split, keeping the block's metadata on each part
+        self.max_wdl_block_size = 3000
+        self.wdl_block_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.max_wdl_block_size,
+            chunk_overlap=150,
+            separators=["\n\n", "\n", " "],
+            length_function=len,
+        )
         
         # Different chunking strategies by category
         self.chunk_configs = {
@@ -290,6 +341,7 @@ class SmartChunker:
             'javascript': ["\n\nfunction ", "\n\nconst ", "\n\nlet ", "\n\nclass ", "\n\nexport ", "\n\n", "\n"],
             'typescript': ["\n\nfunction ", "\n\nconst ", "\n\nlet ", "\n\nclass ", "\n\nexport ", "\n\ninterface ", "\n\n", "\n"],
             'bash': ["\n\nfunction ", "\n\n# ", "\n\n", "\n"],
+            'shesmu': ["\nOlive", "\nDefine ", "\nFunction ", "\n\n", "\n"],
             'sql': ["\n\nCREATE ", "\n\nALTER ", "\n\nSELECT ", "\n\n", ";\n"],
         }
     
@@ -303,6 +355,12 @@ class SmartChunker:
         if file_type == '.wdl' or language == 'wdl':
             return self._chunk_wdl(content, metadata)
         
+        # Syntax-aware chunking along function/class boundaries where a parser exists
+        if self.symbol_chunking and language in SYMBOL_LANGUAGES:
+            symbol_chunks = self._chunk_symbols(content, metadata, language)
+            if symbol_chunks:
+                return symbol_chunks
+        
         # Get appropriate separators
         if language and language in self.language_separators:
             separators = self.language_separators[language]
@@ -333,6 +391,34 @@ class SmartChunker:
             for i, chunk in enumerate(chunks)
         ]
     
+    def _chunk_symbols(self, content: str, metadata: Dict[str, Any], language: str) -> List[Document]:
+        """Chunk Python/Java source by symbol; returns [] when the file cannot be parsed"""
+        try:
+            chunks = chunk_code(content, language, self.chunk_configs['code']['chunk_size'])
+        except ValueError:
+            # e.g. unbalanced braces in Java: fall back to the text splitter
+            return []
+        
+        documents = []
+        for i, chunk in enumerate(chunks):
+            chunk_metadata = {
+                **metadata,
+                'chunk_index': i,
+                'total_chunks': len(chunks),
+                'chunking_strategy': f'{language}_symbols',
+                'symbol_name': chunk.symbol_name,
+                'symbol_kind': chunk.symbol_kind,
+                'parent_symbol': chunk.parent_symbol,
+                'start_line': chunk.start_line,
+                'end_line': chunk.end_line
+            }
+            # Chroma rejects empty list values, so chunks without symbols leave these out
+            if chunk.symbol_names:
+                chunk_metadata['symbol_names'] = chunk.symbol_names
+                chunk_metadata['symbol_kinds'] = chunk.symbol_kinds
+            documents.append(Document(page_content=chunk.text, metadata=chunk_metadata))
+        return documents
+    
     def _chunk_wdl(self, content: str, metadata: Dict[str, Any]) -> List[Document]:
         """Special chunking for WDL workflow files"""
         chunks = []
@@ -349,20 +435,35 @@ class SmartChunker:
                 }
             ))
         
-        # Extract structured elements (tasks, workflows, structs)
-        for match in self.wdl_pattern.finditer(content):
-            element_type = match.group(1)  # task, workflow, or struct
-            element_name = match.group(2)
-            element_content = self._extract_wdl_block(content, match.start())
+        # Extract structured elements (tasks, workflows, structs) in a single pass
+        for block in extract_wdl_blocks(content):
+            element_content = block.text(content)
+            block_metadata = {
+                **metadata,
+                'chunk_type': f'wdl_{block.kind}',
+                'wdl_element_type': block.kind,
+                'wdl_element_name': block.name,
+                'start_line': block.start_line,
+                'end_line': block.end_line,
+                'start_byte': block.start_byte,
+                'end_byte': block.end_byte
+            }
             
-            if element_content:
+            if len(element_content) <= self.max_wdl_block_size:
+                chunks.append(Document(page_content=element_content, metadata=block_metadata))
+                continue
+            
+            # Oversized block: split it, label each part with its parent block
+            parts = self.wdl_block_splitter.split_text(element_content)
+            for part_index, part in enumerate(parts):
+                if part_index > 0:
+                    part = f"# {block.kind} {block.name} (part {part_index + 1}/{len(parts)})\n{part}"
                 chunks.append(Document(
-                    page_content=element_content,
+                    page_content=part,
                     metadata={
-                        **metadata,
-                        'chunk_type': f'wdl_{element_type}',
-                        'wdl_element_type': element_type,
-                        'wdl_element_name': element_name
+                        **block_metadata,
+                        'wdl_part_index': part_index,
+                        'wdl_total_parts': len(parts)
                     }
                 ))
         
@@ -378,30 +479,64 @@ class SmartChunker:
         
         return chunks
     
-    def _extract_wdl_block(self, content: str, start_pos: int) -> str:
-        """Extract a balanced brace block starting from position"""
-        brace_count = 0
-        in_block = False
-        
-        for i in range(start_pos, len(content)):
-            char = content[i]
-            
-            if char == '{':
-                brace_count += 1
-                in_block = True
-            elif char == '}':
-                brace_count -= 1
-                
-                if in_block and brace_count == 0:
-                    return content[start_pos:i+1]
-        
-        return ""
+
+# One SmartChunker per pool worker process, built on its first batch
+_worker_chunker = None
+
+
+def _chunk_file_batch(batch: List[Dict[str, Any]]) -> List[Tuple[List[Document], Optional[str]]]:
+    """Pool worker: chunk a batch of files, returning (chunks, error) per file in order"""
+    global _worker_chunker
+    if _worker_chunker is None:
+        _worker_chunker = SmartChunker()
+    
+    results = []
+    for file_doc in batch:
+        try:
+            results.append((_worker_chunker.chunk(file_doc['content'], file_doc['metadata']), None))
+        except Exception as e:
+            results.append(([], str(e)))
+    return results
+
+
+def chunk_files(
+    files: List[Dict[str, Any]],
+    chunker: 'SmartChunker',
+    pool: Optional[Executor] = None,
+    batch_size: int = 32
+) -> Iterator[Tuple[Dict[str, Any], List[Document], Optional[str]]]:
+    """
+    Chunk extracted files, yielding (file, chunks, error) in input order
+    
+    With a pool, batches of files are chunked in worker processes and the
+    results are consumed as they complete, in submission order, so chunk
+    order (and therefore chunk_index and document ids) is identical to the
+    serial path. Small inputs are chunked in-process.
+    """
+    if pool is None or len(files) <= batch_size:
+        for file_doc in files:
+            try:
+                yield file_doc, chunker.chunk(file_doc['content'], file_doc['metadata']), None
+            except Exception as e:
+                yield file_doc, [], str(e)
+        return
+    
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    for batch, results in zip(batches, pool.map(_chunk_file_batch, batches)):
+        for file_doc, (chunks, error) in zip(batch, results):
+            yield file_doc, chunks, error
 
 
 def ingest_repositories(
     repo_urls: List[str],
     vector_service,
-    include_categories: List[str] = None
+    include_categories: List[str] = None,
+    chunk_workers: int = None,
+    journal: IngestionJournal = None,
+    resume: bool = False,
+    repo_base_path: str = "./data/repositories",
+    replace: bool = False,
+    report: IngestionReport = None
 ) -> Dict[str, int]:
     """
     Main ingestion function
@@ -410,15 +545,25 @@ def ingest_repositories(
         repo_urls: List of GitHub repository URLs
         vector_service: VectorService instance
         include_categories: List of categories to include (default: all)
+        chunk_workers: Processes used for chunking (default: CPU count, 1 = in-process)
+        journal: Optional IngestionJournal recording per-repo and per-batch progress
+        resume: Skip repositories the journal records as done (requires journal)
+        repo_base_path: Where repositories are cloned
+        replace: Replace each repository's stored chunks instead of adding to them
+                 (a collection swap in the per-repository namespace layout)
+        report: Optional IngestionReport recording per-stage time and throughput
+                (git, walk, read, chunk, embed, write) and per-repository durations
     
     Returns:
         Dictionary with ingestion statistics
     """
-    ingester = RepositoryIngester()
+    ingester = RepositoryIngester(repo_base_path)
     chunker = SmartChunker()
     
     if include_categories is None:
         include_categories = ['documentation', 'code', 'configuration']
+    if chunk_workers is None:
+        chunk_workers = os.cpu_count() or 1
     
     stats = {
         'total_repos': len(repo_urls),
@@ -426,62 +571,99 @@ def ingest_repositories(
         'total_chunks': 0,
         'by_category': {},
         'by_language': {},
-        'failed_repos': []
+        'failed_repos': [],
+        'resumed_repos': 0,
+        'chunks_embedded': 0,
+        'chunks_skipped': 0,
+        'chunk_workers': chunk_workers,
+        'chunking_seconds': 0.0
     }
     
-    all_documents = []
-    
-    for repo_url in repo_urls:
-        try:
-            # Clone/update repository
-            repo_path = ingester.clone_or_update_repo(repo_url)
-            
-            # Extract files
-            files = ingester.extract_files(repo_path, include_categories)
-            stats['total_files'] += len(files)
+    # Chunking is CPU-bound pure Python, so it runs in worker processes rather than threads
+    pool = ProcessPoolExecutor(max_workers=chunk_workers) if chunk_workers > 1 else None
+    try:
+        for repo_url in repo_urls:
+            if resume and journal is not None and journal.repo_done(repo_url):
+                print(f"Skipping {repo_url} - completed in a previous run")
+                stats['resumed_repos'] += 1
+                continue
             
-            # Process each file
-            for file_doc in files:
-                content = file_doc['content']
-                metadata = file_doc['metadata']
+            try:
+                if journal is not None:
+                    journal.mark_repo(repo_url, 'started')
+                if report is not None:
+                    report.start_repo(repo_url)
                 
-                # Track stats by category
-                category = metadata['file_category']
-                stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
+                # Clone/update repository
+                git_start = time.perf_counter()
+                repo_path = ingester.clone_or_update_repo(repo_url)
+                if report is not None:
+                    report.add('git', time.perf_counter() - git_start, repos=1)
                 
-                # Track stats by language
-                language = metadata.get('language', 'unknown')
-                if language:
-                    stats['by_language'][language] = stats['by_language'].get(language, 0) + 1
+                # Extract files
+                files = ingester.extract_files(repo_path, include_categories, report)
+                stats['total_files'] += len(files)
                 
-                # Chunk the content
-                try:
-                    chunks = chunker.chunk(content, metadata)
-                    all_documents.extend(chunks)
-                    stats['total_chunks'] += len(chunks)
-                except Exception as e:
-                    print(f"  Warning: Could not chunk {metadata['source_file']}: {e}")
-                    continue
-        
-        except Exception as e:
-            print(f"Error processing repository {repo_url}: {e}")
-            stats['failed_repos'].append({'url': repo_url, 'error': str(e)})
-            import traceback
-            traceback.print_exc()
-            continue
-    
-    # Add to vector store
-    if all_documents:
-        print(f"\nAdding {len(all_documents)} chunks to vector store...")
-        try:
-            vector_service.add_documents(all_documents)
-            print("✓ Successfully added all chunks")
-        except Exception as e:
-            print(f"✗ Error adding documents to vector store: {e}")
-            import traceback
-            traceback.print_exc()
-    else:
-        print("No documents to add")
+                # Chunk every file, in order
+                repo_documents = []
+                chunk_start = time.perf_counter()
+                for file_doc, chunks, error in chunk_files(files, chunker, pool):
+                    metadata = file_doc['metadata']
+                    
+                    # Track stats by category
+                    category = metadata['file_category']
+                    stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
+                    
+                    # Track stats by language
+                    language = metadata.get('language', 'unknown')
+                    if language:
+                        stats['by_language'][language] = stats['by_language'].get(language, 0) + 1
+                    
+                    if error is not None:
+                        print(f"  Warning: Could not chunk {metadata['source_file']}: {error}")
+                        continue
+                    repo_documents.extend(chunks)
+                stats['total_chunks'] += len(repo_documents)
+                stats['chunking_seconds'] += time.perf_counter() - chunk_start
+                if report is not None:
+                    report.add('chunk', time.perf_counter() - chunk_start, files=len(files),
+                               chunks=len(repo_documents))
+                
+                # Embed and store this repository before moving on, so a crash loses at most one batch
+                print(f"\nAdding {len(repo_documents)} chunks to vector store...")
+                if replace:
+                    added = vector_service.replace_repo(repo_path.name, repo_documents, report=report)
+                else:
+                    added = vector_service.add_document_objects(
+                        repo_documents, journal=journal, journal_repo=repo_url, report=report
+                    )
+                stats['chunks_embedded'] += added['added']
+                stats['chunks_skipped'] += added['skipped_existing'] + added['skipped_journal']
+                
+                if added['failed_batches']:
+                    raise RuntimeError(f"{added['failed_batches']} embedding batches failed after retrying")
+                if journal is not None:
+                    journal.mark_repo(repo_url, 'done', len(files), len(repo_documents))
+                if report is not None:
+                    report.finish_repo()
+                ingestion_memory.checkpoint(f"ingest_{repo_path.name}")
+            
+            except Exception as e:
+                print(f"Error processing repository {repo_url}: {e}")
+                stats['failed_repos'].append({'url': repo_url, 'error': str(e)})
+                if journal is not None:
+                    journal.mark_repo(repo_url, 'failed', error=str(e))
+                if report is not None:
+                    report.finish_repo('failed', str(e))
+                import traceback
+                traceback.print_exc()
+                continue
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    if stats['chunking_seconds'] > 0:
+        stats['chunks_per_second'] = stats['total_chunks'] / stats['chunking_seconds']
     
     return stats
 
@@ -494,6 +676,12 @@ def print_stats(stats: Dict[str, Any]):
     print(f"  Repositories processed: {stats['total_repos']}")
     print(f"  Files extracted: {stats['total_files']}")
     print(f"  Chunks created: {stats['total_chunks']}")
+    print(f"  Chunks embedded: {stats['chunks_embedded']} ({stats['chunks_skipped']} already stored)")
+    if stats['resumed_repos']:
+        print(f"  Repositories skipped as already complete: {stats['resumed_repos']}")
+    if 'chunks_per_second' in stats:
+        print(f"  Chunking: {stats['chunking_seconds']:.2f}s on {stats['chunk_workers']} worker(s), "
+              f"{stats['chunks_per_second']:.0f} chunks/s")
     
     if stats['by_category']:
         print(f"\n  By category:")
@@ -514,10 +702,28 @@ def print_stats(stats: Dict[str, Any]):
 
 
 if __name__ == "__main__":
+    import argparse
+    from rag_chatbot.config import settings
     from rag_chatbot.services.vector_service import VectorService
     
+    parser = argparse.ArgumentParser(description="Ingest repositories into the vector store")
+    parser.add_argument("--repos-file", default="data/repos.txt", help="file with one repository URL per line")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run: skip repositories and batches already completed")
+    parser.add_argument("--replace", action="store_true",
+                        help="replace each repository's chunks (drops chunks for deleted files)")
+    parser.add_argument("--chunk-workers", type=int, default=None, help="chunking processes (default: CPU count)")
+    parser.add_argument("--report", default=None,
+                        help="JSON ingestion report path (default: timestamped under settings.ingestion_report_dir)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="write a tracemalloc snapshot after each repository (see settings.profile_dir)")
+    args = parser.parse_args()
+    
+    if args.trace_memory or settings.profile_ingestion_memory:
+        ingestion_memory.start()
+    
     # List of repositories to ingest
-    with open("data/repos.txt") as f:
+    with open(args.repos_file) as f:
         REPO_URLS = [line.strip() for line in f if line.strip()]
     
     print("Starting repository ingestion...")
@@ -526,13 +732,32 @@ if __name__ == "__main__":
     # Initialize vector service
     vector_service = VectorService()
     
+    # Progress journal next to the vector store; a fresh run starts it over
+    journal = IngestionJournal()
+    if args.resume:
+        print(f"Resuming from journal {journal.path}: {journal.summary()}")
+    else:
+        journal.reset()
+    
+    # Per-stage timing and memory for this run, saved as JSON at the end
+    report = IngestionReport()
+    
     # Ingest repositories
     # You can filter what to include:
     stats = ingest_repositories(
         REPO_URLS, 
         vector_service,
-        include_categories=['documentation', 'code', 'configuration']
+        include_categories=['documentation', 'code', 'configuration'],
+        chunk_workers=args.chunk_workers,
+        journal=journal,
+        resume=args.resume,
+        replace=args.replace,
+        report=report
     )
+    journal.close()
     
     # Print results
-    print_stats(stats)
\ No newline at end of file
+    print_stats(stats)
+    report.summary = stats
+    report.print_stages()
+    print(f"\n  Report: {report.save(args.report)}")
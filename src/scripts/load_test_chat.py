@@ -0,0 +1,244 @@
+"""
+Concurrent-session load test for the Chainlit app.
+
+Imports rag_chatbot.main, as `chainlit run` does, and drives the
+on_chat_start / on_message hooks it registers. Each simulated session gets
+its own Chainlit context (session, user_session and an emitter that
+records messages instead of sending them), so per-session state behaves as
+it does in the app. Everything below the handlers is real:
+  - the VectorService over --persist-directory, with the real embedding
+    model and search
+  - the agent router, agents and memory
+  - the LLM gateway
+The only stand-in is the chat model: the "fake" provider answers after
+--llm-latency seconds.
+
+For each concurrency level in --sessions, the script starts that many
+sessions at once. Every session sends --messages questions, optionally
+with exponential think time between them. A background task measures
+event-loop lag: how late a 10 ms sleep wakes up, which is how long
+synchronous work such as embedding and search blocks every other user on
+the worker. Per level it reports:
+  - messages per second
+  - p50/p90/p99 end-to-end latency of on_message
+  - on_chat_start latency
+  - loop lag
+  - error and busy (backpressure) replies
+  - LLM gateway stats
+All of it is written to --output as JSON for capacity planning.
+
+--ingest indexes a markdown directory first. It writes to
+--persist-directory, or to a temporary store removed afterwards, never to
+the app's own store.
+
+Usage:
+    python src/scripts/load_test_chat.py --sessions 1 8 32 --messages 5 --llm-latency 1.0
+    python src/scripts/load_test_chat.py --persist-directory /tmp/loadtest_db --ingest data/documents \\
+        --sessions 4 16 64 --think-time 2 --auto --output load_test.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+QUESTIONS = [
+    "What is Shesmu?",
+    "What is an olive?",
+    "How does Vidarr decide whether a workflow run needs to be re-run?",
+    "Show me the bwa mem alignment task",
+    "How do I configure the number of threads for bwa?",
+    "What are the outputs of the WGTS analysis?",
+    "Explain how actions are throttled in Shesmu",
+    "How do I write a Shesmu olive that groups by donor?",
+    "Which WDL workflows use samtools sort?",
+    "What does a provisioner do?",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the Chainlit chat handlers")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16],
+                        help="concurrent sessions per level")
+    parser.add_argument("--messages", type=int, default=5, help="questions per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a session's questions")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds the stub LLM takes per call")
+    parser.add_argument("--provider", default="fake", help="LLM provider (default: the offline stub)")
+    parser.add_argument("--persist-directory", help="vector store to search (default: settings.chromadb_path)")
+    parser.add_argument("--ingest", help="index this markdown directory into the store first "
+                                         "(a temporary one unless --persist-directory is given)")
+    parser.add_argument("--auto", action="store_true", help="turn on automatic agent routing in every session")
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_results.json")
+    return parser.parse_args()
+
+
+def summary_ms(values):
+    if not values:
+        return None
+    values = np.asarray(values) * 1000
+    return {"p50": float(np.percentile(values, 50)), "p90": float(np.percentile(values, 90)),
+            "p99": float(np.percentile(values, 99)), "max": float(values.max()), "mean": float(values.mean())}
+
+
+async def watch_loop_lag(interval, samples, stop):
+    """How late the loop wakes a task that asked to sleep `interval` seconds"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_level(n_sessions, args, hooks, level_seed):
+    import chainlit as cl
+    from chainlit.context import ChainlitContext, context_var
+    from chainlit.emitter import BaseChainlitEmitter
+    from chainlit.session import HTTPSession
+
+    class RecordingEmitter(BaseChainlitEmitter):
+        """Keeps what the handlers send instead of pushing it to a browser"""
+
+        def __init__(self, session):
+            super().__init__(session)
+            self.messages = []
+
+        async def send_step(self, step_dict):
+            if step_dict.get("type") == "assistant_message":
+                self.messages.append(step_dict.get("output", ""))
+
+    on_chat_start, on_message = hooks
+    latencies, start_latencies = [], []
+    errors, busy, answered = 0, 0, 0
+
+    async def session(index):
+        nonlocal errors, busy, answered
+        rng = random.Random(level_seed * 100003 + index)
+        chat_session = HTTPSession(id=str(uuid.uuid4()), client_type="webapp", thread_id=str(uuid.uuid4()))
+        emitter = RecordingEmitter(chat_session)
+        context_var.set(ChainlitContext(chat_session, emitter=emitter))
+
+        start = time.perf_counter()
+        await on_chat_start()
+        start_latencies.append(time.perf_counter() - start)
+        if args.auto:
+            await on_message(cl.Message(content="/auto", author="User", type="user_message"))
+
+        for _ in range(args.messages):
+            if args.think_time:
+                await asyncio.sleep(rng.expovariate(1 / args.think_time))
+            sent = len(emitter.messages)
+            message = cl.Message(content=rng.choice(QUESTIONS), author="User", type="user_message")
+            start = time.perf_counter()
+            await on_message(message)
+            latencies.append(time.perf_counter() - start)
+            reply = emitter.messages[-1] if len(emitter.messages) > sent else ""
+            if reply.startswith("⏳"):
+                busy += 1
+            elif reply.startswith("❌") or not reply:
+                errors += 1
+            else:
+                answered += 1
+
+    lag, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop_lag(args.lag_interval, lag, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(n_sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+
+    from rag_chatbot.services.llm_service import llm_gateway
+    return {
+        "sessions": n_sessions,
+        "messages": len(latencies),
+        "answered": answered,
+        "busy": busy,
+        "errors": errors,
+        "duration_s": elapsed,
+        "throughput_msgs_per_s": len(latencies) / elapsed,
+        "latency_ms": summary_ms(latencies),
+        "chat_start_ms": summary_ms(start_latencies),
+        "loop_lag_ms": summary_ms(lag),
+        "llm_gateway": llm_gateway.stats(),
+    }
+
+
+async def run(args):
+    # Settings are read when rag_chatbot is first imported
+    os.environ["LLM_PROVIDER"] = args.provider
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    if args.persist_directory:
+        os.environ["CHROMADB_PATH"] = args.persist_directory
+
+    from chainlit.config import config
+    import rag_chatbot.main as app
+    from rag_chatbot.config import settings
+
+    if args.ingest:
+        app.vector_service.add_documents(args.ingest)
+    hooks = (config.code.on_chat_start, config.code.on_message)
+    if not all(hooks):
+        raise SystemExit("rag_chatbot.main did not register on_chat_start/on_message")
+
+    results = {
+        "config": {
+            "llm_provider": settings.llm_provider,
+            "llm_latency_s": args.llm_latency,
+            "llm_max_concurrency": settings.llm_max_concurrency,
+            "llm_max_queue": settings.llm_max_queue,
+            "vector_backend": settings.vector_backend,
+            "persist_directory": settings.chromadb_path,
+            "indexed_chunks": app.vector_service.get_collection_stats().get("total_chunks"),
+            "messages_per_session": args.messages,
+            "think_time_s": args.think_time,
+            "auto_routing": args.auto,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "levels": [],
+    }
+
+    print(f"\n{'sessions':>8s} {'msgs':>6s} {'msg/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s} "
+          f"{'lag p99':>8s} {'lag max':>8s} {'busy':>5s} {'errors':>6s}")
+    for level, n_sessions in enumerate(args.sessions):
+        result = await run_level(n_sessions, args, hooks, args.seed + level)
+        results["levels"].append(result)
+        latency, lag = result["latency_ms"], result["loop_lag_ms"] or {"p99": 0.0, "max": 0.0}
+        print(f"{n_sessions:8d} {result['messages']:6d} {result['throughput_msgs_per_s']:8.2f} "
+              f"{latency['p50']:8.0f} {latency['p99']:8.0f} {lag['p99']:8.1f} {lag['max']:8.1f} "
+              f"{result['busy']:5d} {result['errors']:6d}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+def main():
+    args = parse_args()
+    scratch = None
+    if args.ingest and not args.persist_directory:
+        scratch = args.persist_directory = tempfile.mkdtemp(prefix="load_test_db_")
+        print(f"Indexing {args.ingest} into temporary store {scratch}")
+    try:
+        asyncio.run(run(args))
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Move the knowledge base to another embedding model without taking search down.
+
+Re-embeds the stored chunks into a shadow collection in the background
+while the current collection keeps serving, then swaps the collection alias
+over. Running chat apps load the new model in the background (from the
+moment the shadow is ready) and follow once it has loaded. The previous
+collection is kept so the swap can be rolled back.
+
+Usage:
+    python src/scripts/reembed_collection.py --status
+    python src/scripts/reembed_collection.py --model BAAI/bge-small-en-v1.5
+    python src/scripts/reembed_collection.py --model BAAI/bge-small-en-v1.5 --no-swap
+    python src/scripts/reembed_collection.py --swap documents_v2
+    python src/scripts/reembed_collection.py --rollback
+    python src/scripts/reembed_collection.py --drop documents
+"""
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.config import settings
+from rag_chatbot.services.reembed_job import ReembedJob
+from rag_chatbot.services.vector_service import VectorService
+
+
+def print_status(vector_service: VectorService):
+    registry = vector_service.embedding_registry
+    print(f"Collection {vector_service.collection_name} ({settings.vector_backend}, "
+          f"{settings.vector_namespace_layout} layout) in {vector_service.persist_directory}:")
+    for collection in sorted(registry.collections(vector_service.collection_name),
+                             key=lambda collection: collection['generation']):
+        progress = ""
+        if collection['status'] in ("building", "failed") and collection.get('total'):
+            progress = f" {collection['embedded']}/{collection['total']} embedded"
+        print(f"  {collection['name']:16s} {collection['status']:9s} {collection['model']} "
+              f"({collection.get('dimension') or '?'} dims){progress}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blue/green re-embedding of the vector store")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--model", help="embedding model to re-embed the collection with")
+    action.add_argument("--swap", metavar="COLLECTION", help="serve from a ready (or retired) collection")
+    action.add_argument("--rollback", action="store_true", help="serve from the last retired collection again")
+    action.add_argument("--drop", metavar="COLLECTION", help="delete a retired or failed collection")
+    action.add_argument("--status", action="store_true", help="list collections and their models")
+    parser.add_argument("--batch-size", type=int, default=settings.reembed_batch_size)
+    parser.add_argument("--no-swap", action="store_true", help="build the shadow collection but keep serving the old one")
+    parser.add_argument("--drop-previous", action="store_true", help="delete the old collection after the swap")
+    args = parser.parse_args()
+
+    vector_service = VectorService(persist_directory=settings.chromadb_path)
+
+    if args.model:
+        job = ReembedJob(vector_service, args.model, batch_size=args.batch_size,
+                         swap=not args.no_swap, drop_previous=args.drop_previous).start()
+        while not job.join(timeout=10):
+            progress = job.progress()
+            if progress['total']:
+                print(f"  {progress['status']}: {progress['embedded']}/{progress['total']} chunks "
+                      f"({progress['chunks_per_s']:.0f}/s)")
+        progress = job.progress()
+        print(f"Re-embedding {progress['status']} after {progress['seconds']:.0f}s")
+        if progress['status'] == "failed":
+            sys.exit(1)
+    elif args.swap:
+        vector_service.swap_to(args.swap)
+    elif args.rollback:
+        vector_service.rollback_embeddings()
+    elif args.drop:
+        vector_service.drop_collection(args.drop)
+    print_status(vector_service)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,79 @@
 # scrape_readthedocs.py
+import argparse
+import asyncio
+import json
 import requests
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+import httpx
+import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
 import os
 import re
-from urllib.parse import urljoin, urlparse
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse, urldefrag
 from pathlib import Path
+import sys
 import time
 
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.utils.html_markdown import html_to_markdown
+
+# Link targets that are never documentation pages
+SKIP_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.pdf', '.zip', '.gz', '.tar',
+    '.css', '.js', '.json', '.xml', '.txt', '.woff', '.woff2', '.ttf', '.eot',
+}
+
+
+class HostRateLimiter:
+    """Per-host cap on concurrent requests and on how often a request may start"""
+
+    def __init__(self, concurrency: int = 4, rate: float = 2.0):
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            if self.interval:
+                async with self._locks.setdefault(host, asyncio.Lock()):
+                    loop = asyncio.get_running_loop()
+                    start = max(loop.time(), self._next_start.get(host, 0.0))
+                    self._next_start[host] = start + self.interval
+                    await asyncio.sleep(start - loop.time())
+            yield
+
+
+class CrawlCache:
+    """Validators (ETag / Last-Modified), output file and links of every crawled page, kept as JSON"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.pages: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self.pages = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load crawl cache {self.path}: {e}")
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.pages.get(url)
+
+    def set(self, url: str, entry: Dict):
+        self.pages[url] = entry
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.pages, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
 class ReadTheDocscraper:
     def __init__(self, output_dir="data/documents"):
         self.output_dir = Path(output_dir)
@@ -25,30 +91,20 @@ class ReadTheDocscraper:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Title, markdown and links from a single parse of the page
+            page = self._render_page(response.content, url)
             
-            # Extract page title
-            title = self._extract_title(soup, url)
-            
-            # Extract main content
-            content = self._extract_content(soup)
-            
-            if not content:
+            if page is None:
                 print(f"✗ No content found for {url}")
                 return None
-            
-            # Clean and convert to markdown
-            clean_content = self._clean_content(content)
-            markdown_content = self._to_markdown(clean_content)
+            title, markdown_content, _ = page
             
             # Save to file
             filename = self._generate_filename(url, title)
             filepath = self.output_dir / filename
             
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"# {title}\n\n")
-                f.write(f"Source: {url}\n\n")
-                f.write(markdown_content)
+                f.write(self._page_text(url, title, markdown_content))
             
             print(f"✓ Saved: {filepath}")
             
@@ -60,106 +116,25 @@ class ReadTheDocscraper:
             print(f"✗ Error scraping {url}: {e}")
             return None
 
-    def _extract_title(self, soup, url):
-        """Extract page title"""
-        # Try multiple title sources
-        title_candidates = [
-            soup.find('h1'),
-            soup.find('title'),
-            soup.find('meta', {'property': 'og:title'}),
-        ]
-        
-        for candidate in title_candidates:
-            if candidate:
-                if candidate.name == 'meta':
-                    title = candidate.get('content', '')
-                else:
-                    title = candidate.get_text(strip=True)
-                
-                if title and len(title) > 3:
-                    return self._clean_title(title)
-        
-        # Fallback: use URL path
-        return urlparse(url).path.strip('/').replace('/', '_') or 'index'
-
-    def _extract_content(self, soup):
-        """Extract main content from ReadTheDocs page"""
-        # Try ReadTheDocs-specific selectors (in order of preference)
-        content_selectors = [
-            'div.rst-content',           # Most ReadTheDocs sites
-            'div.document',              # Sphinx default
-            'div.body',                  # Alternative Sphinx
-            'main',                      # HTML5 semantic
-            'article',                   # Alternative semantic
-            'div.content',               # Generic content class
-            'div#main-content',          # Alternative main content
-        ]
-        
-        for selector in content_selectors:
-            content = soup.select_one(selector)
-            if content:
-                return content
-        
-        # Last resort: try to find the largest text container
-        all_divs = soup.find_all('div')
-        if all_divs:
-            # Find div with most text content
-            return max(all_divs, key=lambda div: len(div.get_text(strip=True)))
-        
-        return soup
-
-    def _clean_content(self, content):
-        """Remove navigation and irrelevant elements"""
-        # Elements to remove completely
-        remove_selectors = [
-            'nav', 'footer', 'header', 'aside',
-            '.navigation', '.nav', '.sidebar', '.toctree-wrapper',
-            '.breadcrumb', '.breadcrumbs', '.edit-on-github',
-            '.version-selector', '.search-box', '.social-links',
-            '.prev-next-buttons', '.page-nav', '.site-footer',
-            'script', 'style', 'noscript',
-            '.admonition-title',  # Keep admonition content but remove title
-        ]
-        
-        for selector in remove_selectors:
-            for element in content.select(selector):
-                element.decompose()
-        
-        # Remove common ReadTheDocs navigation text patterns
-        navigation_patterns = [
-            r'Edit on GitHub',
-            r'Previous\s*Next',
-            r'© Copyright.*',
-            r'Built with.*Sphinx',
-            r'Hosted on.*Read the Docs',
-        ]
-        
-        text = content.get_text()
-        for pattern in navigation_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        return BeautifulSoup(text, 'html.parser')
+    def _render_page(self, html, url):
+        """(title, markdown, links) for a page, or None if it has no content"""
+        page = html_to_markdown(html, url)
+        if page is None or not page.markdown:
+            return None
+        if page.title:
+            title = self._clean_title(page.title)
+        else:
+            # Fallback: use URL path
+            title = urlparse(url).path.strip('/').replace('/', '_') or 'index'
+        return title, page.markdown, page.links
 
-    def _to_markdown(self, content):
-        """Convert cleaned content to markdown"""
-        # Convert HTML to markdown
-        markdown = md(str(content), heading_style="ATX")
-        
-        # Clean up markdown
-        lines = markdown.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            # Skip empty lines at start, but preserve structure later
-            if line or cleaned_lines:
-                cleaned_lines.append(line)
-        
-        # Remove excessive newlines
-        result = '\n'.join(cleaned_lines)
-        result = re.sub(r'\n\s*\n\s*\n', '\n\n', result)  # Max 2 consecutive newlines
-        
-        return result.strip()
+    @staticmethod
+    def _page_text(url, title, markdown):
+        """The saved markdown file: title, source line, then the page (minus a repeated title heading)"""
+        first_line, _, rest = markdown.partition("\n")
+        if first_line.startswith("# ") and first_line[2:].strip() == title:
+            markdown = rest.lstrip("\n")
+        return f"# {title}\n\nSource: {url}\n\n{markdown}"
 
     def _clean_title(self, title):
         """Clean title for use as filename"""
@@ -181,28 +156,203 @@ class ReadTheDocscraper:
         return f"{filename}.md"
 
     def scrape_multiple(self, urls, delay=1):
-        """Scrape multiple URLs"""
-        results = []
-        for url in urls:
-            result = self.scrape_page(url, delay)
-            results.append(result)
+        """Scrape multiple URLs (no link discovery; at most one request per host every `delay` seconds)"""
+        rate = 1.0 / delay if delay else 0
+        report = asyncio.run(self.crawl(urls, discover=False, concurrency=1, rate=rate))
+        return [report['pages'].get(url) for url in urls]
+
+    async def crawl(self, start_urls: List[str], scope: List[str] = None, max_pages: int = 500,
+                    concurrency: int = 4, rate: float = 2.0, discover: bool = True) -> Dict:
+        """
+        Crawl documentation pages concurrently and save each one as markdown
+        
+        Pages come from the start URLs plus, with discover=True, the sitemap
+        of each site and the links of every page crawled, as long as they
+        fall under one of the scope prefixes (by default the directory of
+        each start URL). Each host gets at most `concurrency` requests in
+        flight and `rate` request starts per second. Pages fetched before
+        are requested conditionally with the ETag / Last-Modified the
+        server sent last time; a 304 leaves the markdown file untouched, and
+        so does a 200 whose markdown comes out the same.
         
-        successful = [r for r in results if r is not None]
-        print(f"\n📚 Scraping complete: {len(successful)}/{len(urls)} pages saved")
-        return results
+        Returns counts per outcome and 'pages': url -> saved file (None if it failed).
+        """
+        scope = scope or [self._default_scope(url) for url in start_urls]
+        cache = CrawlCache(self.output_dir / ".crawl_cache.json")
+        limiter = HostRateLimiter(concurrency, rate)
+        report = {'written': 0, 'unchanged': 0, 'not_modified': 0, 'failed': 0, 'pages': {}}
+        queue: asyncio.Queue = asyncio.Queue()
+        seen = set()
+        # Markdown file name -> the page that owns it, so two pages with the same title do not overwrite each other
+        claimed = {entry['file']: url for url, entry in cache.pages.items() if entry.get('file')}
+
+        def enqueue(url):
+            url = self._normalize_url(url)
+            if url not in seen and len(seen) < max_pages:
+                seen.add(url)
+                queue.put_nowait(url)
+
+        async def worker(client):
+            while True:
+                url = await queue.get()
+                try:
+                    outcome, links = await self._crawl_page(client, limiter, cache, claimed, url)
+                    report[outcome] += 1
+                    entry = cache.get(url)
+                    report['pages'][url] = str(self.output_dir / entry['file']) if entry and entry.get('file') else None
+                    if discover:
+                        for link in links:
+                            if self._in_scope(link, scope):
+                                enqueue(link)
+                except Exception as e:
+                    print(f"✗ Error scraping {url}: {e}")
+                    report['failed'] += 1
+                    report['pages'][url] = None
+                finally:
+                    queue.task_done()
+
+        started = time.perf_counter()
+        async with httpx.AsyncClient(headers=dict(self.session.headers), timeout=10.0,
+                                     follow_redirects=True) as client:
+            for url in start_urls:
+                enqueue(url)
+            if discover:
+                for url in await self._sitemap_urls(client, limiter, scope):
+                    enqueue(url)
+            
+            hosts = {urlparse(url).netloc for url in scope + list(start_urls)}
+            workers = [asyncio.create_task(worker(client)) for _ in range(concurrency * max(1, len(hosts)))]
+            try:
+                await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                cache.save()
+
+        elapsed = time.perf_counter() - started
+        print(f"\n📚 Crawl complete in {elapsed:.1f}s: {len(seen)} pages, {report['written']} written, "
+              f"{report['unchanged']} unchanged, {report['not_modified']} not modified (304), "
+              f"{report['failed']} failed")
+        return report
+
+    async def _crawl_page(self, client, limiter, cache, claimed, url):
+        """Fetch one page conditionally; returns (outcome, links on the page)"""
+        entry = cache.get(url)
+        headers = {}
+        if entry and entry.get('file') and (self.output_dir / entry['file']).exists():
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        async with limiter.slot(urlparse(url).netloc):
+            response = await client.get(url, headers=headers)
+        
+        if response.status_code == 304 and entry:
+            return 'not_modified', entry.get('links', [])
+        response.raise_for_status()
+        if 'html' not in response.headers.get('content-type', 'text/html'):
+            return 'unchanged', []
+        
+        # Parsing is CPU-bound; keep the event loop free for other downloads meanwhile
+        page = await asyncio.to_thread(self._render_page, response.content, str(response.url))
+        if page is None:
+            print(f"✗ No content found for {url}")
+            cache.set(url, {'file': None, 'links': []})
+            return 'failed', []
+        title, markdown, links = page
+        
+        filename = entry['file'] if entry and entry.get('file') else self._generate_filename(url, title)
+        if claimed.get(filename, url) != url:
+            filename = self._generate_filename(url, '')
+        claimed[filename] = url
+        filepath = self.output_dir / filename
+        text = self._page_text(url, title, markdown)
+        
+        outcome = 'unchanged'
+        if not filepath.exists() or filepath.read_text(encoding='utf-8') != text:
+            filepath.write_text(text, encoding='utf-8')
+            outcome = 'written'
+            print(f"✓ Saved: {filepath}")
+        
+        cache.set(url, {
+            'file': filename,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'links': links,
+        })
+        return outcome, links
+
+    async def _sitemap_urls(self, client, limiter, scope: List[str]) -> List[str]:
+        """In-scope page URLs listed in the sitemap(s) of the scoped sites"""
+        candidates = []
+        for prefix in scope:
+            parsed = urlparse(prefix)
+            for sitemap in (urljoin(prefix, 'sitemap.xml'), f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"):
+                if sitemap not in candidates:
+                    candidates.append(sitemap)
+        
+        pages, visited = [], set()
+        while candidates:
+            sitemap = candidates.pop(0)
+            if sitemap in visited:
+                continue
+            visited.add(sitemap)
+            try:
+                async with limiter.slot(urlparse(sitemap).netloc):
+                    response = await client.get(sitemap)
+                if response.status_code != 200:
+                    continue
+                root = ET.fromstring(response.content)
+            except (httpx.HTTPError, ET.ParseError) as e:
+                print(f"Warning: Could not read sitemap {sitemap}: {e}")
+                continue
+            locations = [el.text.strip() for el in root.iter() if el.tag.endswith('loc') and el.text]
+            if root.tag.endswith('sitemapindex'):
+                candidates.extend(locations)
+            else:
+                pages.extend(loc for loc in locations if self._in_scope(loc, scope))
+        if pages:
+            print(f"Sitemap: {len(pages)} pages in scope")
+        return pages
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        return urldefrag(url)[0]
+
+    @staticmethod
+    def _default_scope(url: str) -> str:
+        """The directory of a URL: pages below it are crawled"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rsplit('/', 1)[0]}/"
+
+    @staticmethod
+    def _in_scope(url: str, scope: List[str]) -> bool:
+        path = urlparse(url).path
+        if os.path.splitext(path)[1].lower() in SKIP_EXTENSIONS or '/_sources/' in path:
+            return False
+        return any(url.startswith(prefix) for prefix in scope)
+
+DEFAULT_URLS = [
+    "https://oicr-gsi.readthedocs.io/en/latest/informatics-pipelines/informatics-pipelines.html",
+    "https://oicr-gsi.readthedocs.io/en/latest/informatics-pipelines/assays.html",
+    "https://oicr-gsi.readthedocs.io/en/latest/data-review-reporting/data-review-and-reporting.html",
+    "https://oicr-gsi.readthedocs.io/en/latest/infrastructure.html"
+]
 
 # Usage example
 if __name__ == "__main__":
-    # Initialize scraper
-    scraper = ReadTheDocscraper(output_dir="/home/gpeng/projects/rag-chatbot/data/documents")
-    
-    # URLs to scrape
-    urls = [
-        "https://oicr-gsi.readthedocs.io/en/latest/informatics-pipelines/informatics-pipelines.html",
-        "https://oicr-gsi.readthedocs.io/en/latest/informatics-pipelines/assays.html",
-        "https://oicr-gsi.readthedocs.io/en/latest/data-review-reporting/data-review-and-reporting.html",
-        "https://oicr-gsi.readthedocs.io/en/latest/infrastructure.html"
-    ]
+    parser = argparse.ArgumentParser(description="Crawl ReadTheDocs pages into markdown")
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS, help="start URLs")
+    parser.add_argument("--output-dir", default="data/documents")
+    parser.add_argument("--scope", nargs="+", help="URL prefixes to crawl (default: directory of each start URL)")
+    parser.add_argument("--max-pages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight per host")
+    parser.add_argument("--rate", type=float, default=2.0, help="requests started per second per host")
+    parser.add_argument("--no-discover", action="store_true", help="only fetch the given URLs")
+    args = parser.parse_args()
     
-    # Scrape all pages
-    scraper.scrape_multiple(urls, delay=1)
\ No newline at end of file
+    scraper = ReadTheDocscraper(output_dir=args.output_dir)
+    asyncio.run(scraper.crawl(args.urls, scope=args.scope, max_pages=args.max_pages,
+                              concurrency=args.concurrency, rate=args.rate, discover=not args.no_discover))
@@ -7,15 +7,19 @@ sys.path.append(str(project_root / "src"))
 
 from rag_chatbot.services.vector_service import VectorService
 from rag_chatbot.config import settings
+from rag_chatbot.utils.profiling import ingestion_memory
 
 def main():
     print("Setting up ChromaDB for RAG...")
+    if settings.profile_ingestion_memory:
+        ingestion_memory.start()
     
     # Initialize vector service
     vector_service = VectorService(persist_directory=settings.chromadb_path)
     
     # Add documents to vector database
     collection = vector_service.add_documents("data/documents")
+    ingestion_memory.checkpoint("ingest_markdown_documents")
     
     # Show stats
     stats = vector_service.get_collection_stats()
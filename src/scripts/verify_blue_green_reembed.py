@@ -0,0 +1,233 @@
+"""
+Check that moving the vector store to another embedding model keeps search up.
+
+Indexes the markdown documents into a scratch Chroma store with one
+embedder, then runs a ReembedJob to a second embedder of another dimension
+while a thread keeps searching, and a document is added halfway through
+the build. The two embedders are hashed bag-of-words vectors (384 and 256
+dimensions, see benchmark_small_to_big.py), so no model download is needed.
+load_embedding_model is pointed at them by name. It takes --load-seconds
+per load and fails the first load of the new model, as a slow or
+interrupted download would. A second VectorService on the same store keeps
+searching throughout and has to follow the swap. The script checks that:
+  - the registry records model and dimension of every collection
+  - no search fails during the build or the swap, and each one is answered
+    by exactly one collection (old before the swap, new after)
+  - the chunk added during the build is in the new collection
+  - the second service loads the new model on a background thread, not in
+    a search; it keeps serving the old collection until the load succeeds,
+    retries the failed load, and then follows the swap
+  - rollback serves the old collection again, and a retired collection
+    can be dropped
+It also prints search latency before, during and after the build.
+
+Usage:
+    python src/scripts/verify_blue_green_reembed.py --layout single
+    python src/scripts/verify_blue_green_reembed.py --layout source_type
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.config import settings
+from rag_chatbot.services import vector_service as vector_service_module
+from rag_chatbot.services.reembed_job import ReembedJob
+from rag_chatbot.services.vector_service import VectorService
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+from scripts.load_test_chat import QUESTIONS
+
+NEW_MODEL = "hashing-256"
+EMBEDDERS = {
+    settings.embedding_model: WindowedHashingEmbeddings(dimension=384),
+    NEW_MODEL: WindowedHashingEmbeddings(dimension=256),
+}
+
+
+
+class SlowLoader:
+    """Stand-in for load_embedding_model: slow, and the first load of each model in `fail_once` fails"""
+
+    def __init__(self, seconds: float, fail_once=()):
+        self.seconds = seconds
+        self.fail_once = set(fail_once)
+        self.loads = []  # (model, thread name, finished at, succeeded)
+
+    def __call__(self, model_name: str):
+        time.sleep(self.seconds)
+        failed = model_name in self.fail_once
+        self.fail_once.discard(model_name)
+        self.loads.append((model_name, threading.current_thread().name, time.perf_counter(), not failed))
+        if failed:
+            raise OSError(f"simulated failure downloading {model_name}")
+        return EMBEDDERS[model_name]
+
+
+LATE_DOCUMENT = """# Late addition
+
+## Blue/green marker
+
+The zebrafish-tiramisu pipeline was added while the collection was being re-embedded.
+"""
+
+
+class SearchLoop:
+    """Searches continuously on a thread, recording which collection answered and how fast"""
+
+    def __init__(self, vector_service: VectorService):
+        self.vector_service = vector_service
+        self.samples = []  # (start time, seconds, serving collection, query dimension)
+        self.errors = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        i = 0
+        while not self._stop.is_set():
+            query = QUESTIONS[i % len(QUESTIONS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                serving = self.vector_service.serving
+                self.vector_service.search(query, n_results=5)
+                dimension = len(self.vector_service.embed_query(query, serving))
+                self.samples.append((start, time.perf_counter() - start, serving.name, dimension))
+            except Exception as e:
+                self.errors.append(f"{type(e).__name__}: {e}")
+            time.sleep(0.002)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def latency(samples, start, end):
+    timings = [seconds * 1000 for t, seconds, _, _ in samples if start <= t < end]
+    if not timings:
+        return "no searches"
+    p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+    return f"{len(timings):5d} searches, p50 {statistics.median(timings):6.2f} ms, p95 {p95:6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify blue/green re-embedding")
+    parser.add_argument("--docs", default="data/documents")
+    parser.add_argument("--layout", default="single", choices=["single", "repo", "source_type"])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--load-seconds", type=float, default=1.0, help="time each model load takes")
+    args = parser.parse_args()
+
+    # The stand-in embedders are what "loading" a model by name returns
+    loader = SlowLoader(args.load_seconds, fail_once=[NEW_MODEL])
+    vector_service_module.load_embedding_model = loader
+    settings.embedding_load_retry_interval = 0.5
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store, docs = Path(scratch) / "store", Path(scratch) / "documents"
+        shutil.copytree(args.docs, docs)
+        service = VectorService(persist_directory=str(store), backend="chroma", namespace_layout=args.layout)
+        service.add_documents(str(docs))
+        old_count = service.backend.count()
+        follower = VectorService(persist_directory=str(store), backend="chroma", namespace_layout=args.layout)
+        old_entry = service.embedding_registry.active(service.collection_name)
+
+        loop = SearchLoop(service).start()
+        follower_loop = SearchLoop(follower).start()
+        time.sleep(1.0)
+        build_start = time.perf_counter()
+        # The job is handed its embedder; the follower has to load it
+        job = ReembedJob(service, NEW_MODEL, embeddings=EMBEDDERS[NEW_MODEL], batch_size=args.batch_size).start()
+        while job.embedded < old_count // 2 and not job.join(timeout=0.01):
+            pass
+        (docs / "late_addition.md").write_text(LATE_DOCUMENT, encoding="utf-8")
+        service.add_documents(str(docs))
+        job.join()
+        swapped_at = job.finished_at
+        time.sleep(1.0)
+        loop.stop()
+        progress = job.progress()
+        # The follower checks the registry every 2 seconds, then loads (fails, waits, loads again)
+        deadline = time.perf_counter() + 2.5 + 3 * args.load_seconds + 5.0
+        while follower.serving.name != service.serving.name and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)
+        follower_loop.stop()
+
+        new_entry = service.embedding_registry.active(service.collection_name)
+        retired = service.embedding_registry.collection(service.collection_name, old_entry['name'])
+        late_hits = service.search("zebrafish-tiramisu pipeline", n_results=3)
+        before = [sample for sample in loop.samples if sample[0] < build_start]
+        after = [sample for sample in loop.samples if sample[0] >= swapped_at]
+        mixed = [sample for sample in loop.samples
+                 if (sample[2], sample[3]) not in ((old_entry['name'], 384), (new_entry['name'], 256))]
+
+        followed = follower.serving.name == new_entry['name'] and follower.embedding_model == NEW_MODEL
+        new_loads = [load for load in loader.loads if load[0] == NEW_MODEL]
+        loaded_at = min((finished for _, _, finished, ok in new_loads if ok), default=float('inf'))
+        follower_mixed = [sample for sample in follower_loop.samples
+                          if (sample[2], sample[3]) not in ((old_entry['name'], 384), (new_entry['name'], 256))]
+        follower_waiting = [sample for sample in follower_loop.samples if swapped_at <= sample[0] < loaded_at]
+        follower_early = [sample for sample in follower_loop.samples
+                          if sample[0] < loaded_at and sample[2] != old_entry['name']]
+
+        service.rollback_embeddings()
+        rolled_back = (service.serving.name == old_entry['name']
+                       and len(service.search(QUESTIONS[1])) > 0
+                       and len(service.embed_query(QUESTIONS[1])) == 384)
+        service.swap_to(new_entry['name'])
+        service.drop_collection(old_entry['name'])
+
+        checks = {
+            "registry records old model and dimension": (old_entry['model'] == settings.embedding_model
+                                                         and retired['dimension'] == 384),
+            "registry records new model and dimension": (new_entry['model'] == NEW_MODEL
+                                                         and new_entry['dimension'] == 256),
+            "job finished with a swap": progress['status'] == "swapped",
+            "no failed searches": not loop.errors,
+            "every search used one collection's model": not mixed,
+            "old collection served before the swap": all(s[2] == old_entry['name'] for s in before) and before,
+            "new collection served after the swap": all(s[2] == new_entry['name'] for s in after) and after,
+            "all chunks re-embedded, plus the late one": service.backend.count() == old_count + 1,
+            "late chunk found in the new collection": any("zebrafish" in hit['content'] for hit in late_hits),
+            "second service loaded the model off the search path": new_loads and all(
+                thread == "embedding-model-load" for _, thread, _, _ in new_loads),
+            "second service retried the failed load": len(new_loads) >= 2 and not new_loads[0][3] and new_loads[-1][3],
+            "second service served the old collection until the load": not follower_early and follower_waiting,
+            "no search waited on the model load": all(seconds < args.load_seconds for _, seconds, _, _ in follower_waiting),
+            "no failed searches on the second service": not follower_loop.errors,
+            "every second-service search used one collection's model": not follower_mixed,
+            "second service followed the swap": followed,
+            "rollback served the old collection": rolled_back,
+            "dropped collection forgotten": service.embedding_registry.collection(
+                service.collection_name, old_entry['name']) is None,
+        }
+
+        print(f"\nLayout {args.layout}: re-embedded {progress['total']} chunks into {new_entry['name']} "
+              f"in {progress['seconds']:.1f}s ({progress['chunks_per_s']:.0f} chunks/s)")
+        print(f"  before build: {latency(loop.samples, 0, build_start)}")
+        print(f"  during build: {latency(loop.samples, build_start, swapped_at)}")
+        print(f"  after swap:   {latency(loop.samples, swapped_at, float('inf'))}")
+        print(f"  second service while loading {NEW_MODEL}: {latency(follower_loop.samples, swapped_at, loaded_at)}")
+        for error in loop.errors[:5] + follower_loop.errors[:5]:
+            print(f"  search error: {error}")
+        print()
+        for name, ok in checks.items():
+            print(f"  {'OK  ' if ok else 'FAIL'} {name}")
+        shutil.rmtree(store, ignore_errors=True)
+        if not all(checks.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
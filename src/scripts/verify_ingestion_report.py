@@ -0,0 +1,86 @@
+"""
+Check the JSON ingestion report against what ingestion actually did.
+
+Creates local git repositories in a scratch directory and ingests them
+twice with ingest_repositories() into an in-memory store: once with an
+IngestionReport and once without, to measure what the instrumentation
+costs. The embedder is the hashed bag-of-words from
+benchmark_small_to_big.py, so no model download is needed. The script
+checks that:
+  - all six stages are present
+  - stage counts agree with the run's stats (files walked >= read >=
+    chunked, chunks embedded = chunks written)
+  - the per-repository durations add up to no more than the run
+  - peak RSS is recorded
+It then prints the stage table and the report path.
+
+Usage:
+    python src/scripts/verify_ingestion_report.py --repos 3 --files 40
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from rag_chatbot.services.ingestion_report import IngestionReport, STAGES
+from rag_chatbot.services.vector_service import VectorService
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+from scripts.ingest_repositories import ingest_repositories
+from scripts.verify_resumable_ingestion import make_repositories
+
+
+def ingest(urls, scratch, name, report=None):
+    service = VectorService(persist_directory=str(Path(scratch) / name), backend="memory",
+                            embeddings=WindowedHashingEmbeddings())
+    start = time.perf_counter()
+    stats = ingest_repositories(urls, service, chunk_workers=1, repo_base_path=str(Path(scratch) / f"clones_{name}"),
+                                report=report)
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the ingestion report")
+    parser.add_argument("--repos", type=int, default=3)
+    parser.add_argument("--files", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        urls = make_repositories(Path(scratch), args.repos, args.files)
+        _, plain_seconds = ingest(urls, scratch, "plain")
+        report = IngestionReport()
+        stats, reported_seconds = ingest(urls, scratch, "reported", report)
+        report.summary = stats
+        path = report.save(str(Path(scratch) / "report.json"))
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+
+        stages = saved['stages']
+        checks = {
+            "all stages recorded": all(stage in stages for stage in STAGES),
+            "git ran once per repository": stages['git']['repos'] == args.repos,
+            "walked >= read >= chunked files": (stages['walk']['files'] >= stages['read']['files']
+                                                >= stages['chunk']['files'] == stats['total_files']),
+            "chunk count matches stats": stages['chunk']['chunks'] == stats['total_chunks'],
+            "embedded = written = stats": (stages['embed']['embeddings'] == stages['write']['chunks']
+                                           == stats['chunks_embedded']),
+            "per-repo durations <= run": sum(r['seconds'] for r in saved['repos'].values()) <= saved['wall_seconds'],
+            "every repository done": all(r['status'] == 'done' for r in saved['repos'].values()),
+            "peak RSS recorded": (saved['peak_rss_mb'] or 0) > 0,
+        }
+
+        report.print_stages()
+        print(f"\nIngest without report: {plain_seconds:.2f}s, with report: {reported_seconds:.2f}s")
+        print()
+        for name, ok in checks.items():
+            print(f"  {'OK  ' if ok else 'FAIL'} {name}")
+        if not all(checks.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Kill repository ingestion partway through and check that --resume finishes
+the job without re-embedding batches that were already committed.
+
+Creates a few local git repositories in a scratch directory and starts
+ingesting them in a child process (Chroma store and journal in the scratch
+directory too). Every embed_documents call is logged and slowed down, and
+some fail once to exercise retry with backoff. Once the journal shows a
+few completed batches the child is killed with SIGKILL. The run is then
+resumed and the script reports how many chunks were embedded in each run:
+at most the one batch that was in flight when the process died should be
+embedded twice. tests/test_ingestion_journal.py checks the same resume
+logic in-process; this script exercises it against a real SIGKILL.
+
+Usage:
+    python src/scripts/verify_resumable_ingestion.py
+    python src/scripts/verify_resumable_ingestion.py --repos 4 --files 60 --kill-after 5
+"""
+import argparse
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+BATCH_SIZE = 100
+
+
+def make_repositories(root: Path, n_repos: int, n_files: int):
+    import git
+
+    urls = []
+    for r in range(n_repos):
+        repo_path = root / "origin" / f"repo{r}"
+        repo_path.mkdir(parents=True)
+        repo = git.Repo.init(repo_path)
+        for f in range(n_files):
+            functions = "\n\n".join(
+                f"def repo{r}_file{f}_function{i}(value):\n"
+                f"    \"\"\"Function {i} of file {f} in repository {r}.\"\"\"\n"
+                f"    total = value * {i}\n"
+                f"    for step in range({i + 2}):\n"
+                f"        total += step\n"
+                f"    return total + len('{'padding ' * 60}')\n"
+                for i in range(8)
+            )
+            (repo_path / f"module_{f}.py").write_text(functions)
+        repo.index.add([str(p) for p in repo_path.glob("*.py")])
+        repo.index.commit("initial")
+        urls.append(str(repo_path))
+    return urls
+
+
+def child(args):
+    """Run ingestion with instrumented embeddings; this is the process that gets killed"""
+    from rag_chatbot.services.ingestion_journal import IngestionJournal
+    from rag_chatbot.services.vector_service import VectorService
+    from scripts.ingest_repositories import ingest_repositories
+
+    vector_service = VectorService(persist_directory=args.store)
+    embed_documents = vector_service.embeddings.embed_documents
+    calls = {'n': 0}
+
+    def instrumented(texts):
+        calls['n'] += 1
+        time.sleep(args.delay)
+        if args.flaky and calls['n'] % 4 == 0:
+            raise RuntimeError("simulated embedding service timeout")
+        embeddings = embed_documents(texts)
+        with open(args.embed_log, 'a') as log:
+            log.write(f"{len(texts)}\n")
+        return embeddings
+
+    vector_service.embeddings.embed_documents = instrumented
+
+    journal = IngestionJournal(os.path.join(args.store, "ingestion_journal.db"))
+    if not args.resume:
+        journal.reset()
+    with open(args.repos_file) as f:
+        urls = [line.strip() for line in f if line.strip()]
+    stats = ingest_repositories(urls, vector_service, chunk_workers=1, journal=journal,
+                                resume=args.resume, repo_base_path=args.clones)
+    print(f"child finished: {stats['chunks_embedded']} embedded, {stats['chunks_skipped']} skipped, "
+          f"{stats['resumed_repos']} repos resumed, failed: {stats['failed_repos']}")
+    print(f"journal: {journal.summary()}")
+    journal.close()
+
+
+def embedded_count(log_path: Path) -> int:
+    if not log_path.exists():
+        return 0
+    return sum(int(line) for line in log_path.read_text().split())
+
+
+def done_batches(journal_path: Path) -> int:
+    if not journal_path.exists():
+        return 0
+    try:
+        conn = sqlite3.connect(str(journal_path))
+        try:
+            return conn.execute("SELECT COUNT(*) FROM batches WHERE status = 'done'").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify that interrupted ingestion resumes")
+    parser.add_argument("--repos", type=int, default=3)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--kill-after", type=int, default=3, help="completed batches before SIGKILL")
+    parser.add_argument("--delay", type=float, default=0.2, help="extra seconds per embedding call")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--resume", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--flaky", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--store", help=argparse.SUPPRESS)
+    parser.add_argument("--clones", help=argparse.SUPPRESS)
+    parser.add_argument("--repos-file", help=argparse.SUPPRESS)
+    parser.add_argument("--embed-log", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        root = Path(scratch)
+        urls = make_repositories(root, args.repos, args.files)
+        repos_file = root / "repos.txt"
+        repos_file.write_text("\n".join(urls))
+        store = root / "store"
+        store.mkdir()
+        journal_path = store / "ingestion_journal.db"
+        env = {**os.environ, "INGEST_RETRY_BACKOFF": "0.05"}
+
+        def command(log_name, *extra):
+            return [sys.executable, __file__, "--child", "--flaky", "--store", str(store),
+                    "--clones", str(root / "clones"), "--repos-file", str(repos_file),
+                    "--embed-log", str(root / log_name), "--delay", str(args.delay), *extra]
+
+        print(f"Ingesting {args.repos} repositories x {args.files} files; killing after "
+              f"{args.kill_after} committed batches...")
+        first = subprocess.Popen(command("first.log"), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        while first.poll() is None and done_batches(journal_path) < args.kill_after:
+            time.sleep(0.05)
+        if first.poll() is None:
+            first.send_signal(signal.SIGKILL)
+            first.wait()
+            print(f"  killed with {done_batches(journal_path)} batches journaled as done")
+        else:
+            print("  ingestion finished before it could be killed; use more --files or a larger --delay")
+
+        print("Resuming...")
+        second = subprocess.run(command("second.log", "--resume"), env=env, capture_output=True, text=True)
+        print("".join(line + "\n" for line in second.stdout.splitlines() if line.startswith(("child", "journal"))))
+        if second.returncode != 0:
+            print(second.stdout[-2000:], second.stderr[-2000:])
+            sys.exit(1)
+
+        from rag_chatbot.services.vector_backends import create_backend
+        stored = create_backend("chroma", "documents", str(store)).count()
+        first_run = embedded_count(root / "first.log")
+        second_run = embedded_count(root / "second.log")
+        duplicated = first_run + second_run - stored
+        print(f"Chunks stored: {stored}")
+        print(f"Embedded before the kill: {first_run}, after resuming: {second_run}")
+        print(f"Embedded twice: {duplicated} (at most one in-flight batch of {BATCH_SIZE} expected)")
+        if duplicated > BATCH_SIZE:
+            print("FAIL: committed batches were re-embedded")
+            sys.exit(1)
+        print("OK")
+
+
+if __name__ == "__main__":
+    main()
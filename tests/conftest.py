@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# rag_chatbot.config requires an API key; the tests never call a provider
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# Importing the agents imports chainlit, which writes config and translations under its app root
+os.environ.setdefault("CHAINLIT_APP_ROOT", tempfile.mkdtemp(prefix="chainlit-tests-"))
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from rag_chatbot.agent.agent_factory import AgentManager
+from rag_chatbot.config import settings
+from rag_chatbot.services.vector_service import VectorService
+from rag_chatbot.utils.profiling import request_profiler
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "profile_command_users", "admin@example.com, ops")
+    yield VectorService(persist_directory=str(tmp_path), backend="memory", embeddings=WindowedHashingEmbeddings())
+    request_profiler.disarm()
+
+
+@pytest.mark.parametrize("user_id", [None, "someone@example.com"])
+def test_profile_is_refused_to_users_not_listed(service, user_id):
+    manager = AgentManager(service, user_id=user_id)
+    response = asyncio.run(manager.handle_agent_commands("/profile 5"))
+    assert "not enabled" in response
+    assert request_profiler.remaining == 0
+
+
+def test_profile_arms_for_listed_users(service):
+    manager = AgentManager(service, user_id="ops")
+    asyncio.run(manager.handle_agent_commands("/profile 5"))
+    assert request_profiler.remaining == 5
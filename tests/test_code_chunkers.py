@@ -0,0 +1,126 @@
+import ast
+
+from rag_chatbot.utils.code_chunkers import _ast_symbols, _PY_NEWLINE, chunk_code, python_symbols
+
+
+def ast_spans(content):
+    """(name, start, end) of every symbol as the ast path finds them"""
+    line_starts = [0]
+    line_starts.extend(match.end() for match in _PY_NEWLINE.finditer(content))
+    symbols = []
+    _ast_symbols(content, ast.parse(content).body, None, line_starts, symbols)
+    return flatten(symbols)
+
+
+def flatten(symbols):
+    spans = []
+    for symbol in symbols:
+        spans.append((symbol.name, symbol.start, symbol.end))
+        spans.extend(flatten(symbol.children))
+    return spans
+
+
+DECORATED = '''import functools
+
+
+@functools.lru_cache(
+    maxsize=None,
+)
+def cached(x):
+    return x
+
+
+@register(
+    doc="""
+spans lines
+
+""",
+)
+class Widget:
+    # set up
+    def __init__(self):
+        self.x = 1
+'''
+
+CONTINUATION = '''def first():
+    return call(1,
+2)
+
+
+def second():
+    total = 1 + \\
+2
+    return total
+
+
+def third():
+    pass
+'''
+
+CLASS_STRING = '''class Menu:
+    def show(self):
+        pass
+
+    """ Menu definitions """
+
+    items = []
+'''
+
+TRY_ELSE = '''try:
+    import fast
+except ImportError:
+    def speed():
+        return 1
+else:
+    def speed():
+        return fast.speed()
+'''
+
+DOCSTRING_EXAMPLE = '''def route():
+    """Register a route:
+
+@app.get("/")
+"""
+
+
+def handler():
+    pass
+'''
+
+
+def test_multiline_decorators_belong_to_their_symbol():
+    symbols = python_symbols(DECORATED)
+    assert [symbol.name for symbol in symbols] == ['cached', 'Widget']
+    assert DECORATED[symbols[0].start:].startswith('@functools.lru_cache(')
+    assert DECORATED[symbols[1].start:].startswith('@register(')
+    assert flatten(symbols) == ast_spans(DECORATED)
+
+
+def test_dedented_continuation_lines_do_not_end_a_block():
+    symbols = python_symbols(CONTINUATION)
+    assert flatten(symbols) == ast_spans(CONTINUATION)
+    assert CONTINUATION[symbols[0].start:symbols[0].end].endswith('2)\n')
+
+
+def test_string_statement_ends_the_previous_method():
+    method = python_symbols(CLASS_STRING)[0].children[0]
+    assert CLASS_STRING[method.start:method.end].rstrip().endswith('pass')
+    assert flatten(python_symbols(CLASS_STRING)) == ast_spans(CLASS_STRING)
+
+
+def test_symbols_are_in_file_order():
+    spans = ast_spans(TRY_ELSE)
+    assert [start for _, start, _ in spans] == sorted(start for _, start, _ in spans)
+    assert flatten(python_symbols(TRY_ELSE)) == spans
+
+
+def test_small_pieces_are_packed_into_whole_chunks():
+    chunks = chunk_code(DECORATED, 'python', 1200)
+    assert [chunk.symbol_names for chunk in chunks] == [['cached', 'Widget']]
+    assert chunks[0].text == DECORATED
+
+
+def test_decorators_inside_a_docstring_are_not_taken():
+    symbols = python_symbols(DOCSTRING_EXAMPLE)
+    assert DOCSTRING_EXAMPLE[symbols[1].start:].startswith('def handler')
+    assert flatten(symbols) == ast_spans(DOCSTRING_EXAMPLE)
@@ -0,0 +1,32 @@
+from rag_chatbot.agent.conversation_memory import ConversationMemory, count_tokens
+from rag_chatbot.agent.prompt_templates import PromptTemplates
+
+CONTEXT = "\n---\n".join(
+    f"[Source {i}: shesmu/docs/language.md (documentation) - relevance: 0.8{i}]\n"
+    + "Olives process input data and produce actions. " * 20
+    for i in range(1, 6)
+)
+
+
+def test_prompt_size_is_bounded_over_a_long_conversation():
+    memory = ConversationMemory()
+    ceiling = (count_tokens(PromptTemplates.QA_PREFIX + CONTEXT)
+               + memory.max_history_tokens + memory.max_summary_tokens + 100)
+
+    for turn in range(1, 101):
+        question = f"Question {turn}: how does the olive in workflow step {turn} handle " + "missing input " * (turn % 7)
+        prompt = PromptTemplates.get_prompt_by_template_name(
+            "qa_prompt", question, CONTEXT, history=memory.render()
+        )
+        assert count_tokens(prompt) <= ceiling
+
+        answer = f"Step {turn} uses a Group clause. " + "It joins the records and emits an action. " * (5 + turn % 11)
+        memory.add_turn(question, answer, "qa_agent")
+
+        usage = memory.token_usage()
+        assert usage["history_tokens"] <= memory.max_history_tokens
+        assert usage["summary_tokens"] <= memory.max_summary_tokens
+        assert usage["turns_in_buffer"] <= memory.max_turns
+
+    assert memory.total_turns == 100
+    assert memory.summary_lines
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from scripts.benchmark_doc_crawler import SiteServer, make_site
+from scripts.scrape_doc import ReadTheDocscraper
+
+CONCURRENCY = 3
+RATE = 100.0
+
+
+def snapshot(directory):
+    return {p.name: p.stat().st_mtime_ns for p in directory.glob("*.md")}
+
+
+@pytest.fixture
+def server():
+    server = SiteServer(make_site(15), latency=0.01)
+    yield server
+    server.close()
+
+
+def test_recrawl_fetches_conditionally_and_rewrites_only_changes(server, tmp_path):
+    site = server.site
+    out = tmp_path / "docs"
+    scraper = ReadTheDocscraper(output_dir=str(out))
+
+    def crawl():
+        server.reset_counters()
+        return asyncio.run(scraper.crawl([f"{server.base}/en/latest/page0.html"],
+                                         scope=[f"{server.base}/en/latest/", f"{server.base}/other/"],
+                                         concurrency=CONCURRENCY, rate=RATE))
+
+    # Every page is found through the sitemap or links, within the per-host limits
+    report = crawl()
+    assert report['written'] == len(site)
+    assert len(list(out.glob("*.md"))) == len(site)
+    assert not list(out.glob("*logo*"))
+    assert server.max_in_flight <= CONCURRENCY
+    assert server.observed_rate() <= RATE * 1.05
+
+    # Nothing changed: 304 for every page that sends validators, no file rewritten
+    before = snapshot(out)
+    report = crawl()
+    assert report['not_modified'] == sum(1 for path in site if path.startswith("/en/latest/"))
+    assert report['written'] == 0
+    assert snapshot(out) == before
+
+    site["/en/latest/page3.html"] = site["/en/latest/page3.html"].replace("Section text", "Revised text")
+    report = crawl()
+    after = snapshot(out)
+    assert report['written'] == 1
+    assert [name for name in after if after[name] != before.get(name)] == ["Page_3_Guide.md"]
@@ -0,0 +1,24 @@
+from rag_chatbot.utils.html_markdown import html_to_markdown
+
+
+def test_code_blocks_keep_blank_lines_and_footer_like_lines():
+    html = """<html><body><main>
+<h1>Usage</h1>
+<p>Run it:</p>
+<pre class="highlight-python">first()
+
+
+
+Built with Sphinx
+second()</pre>
+<ul><li><pre>a
+
+
+b</pre></li></ul>
+<p>Built with Sphinx using a theme</p>
+</main></body></html>"""
+    markdown = html_to_markdown(html).markdown
+    assert "```python\nfirst()\n\n\n\nBuilt with Sphinx\nsecond()\n```" in markdown
+    assert "- ```\n  a\n\n\n  b\n  ```" in markdown
+    assert not markdown.rstrip().endswith("theme")
+    assert "\n\n\n" not in markdown.split("```")[0]
@@ -0,0 +1,71 @@
+import pytest
+from langchain_core.documents import Document
+
+from rag_chatbot.services.ingestion_journal import IngestionJournal
+from rag_chatbot.services.vector_service import VectorService
+from scripts.benchmark_small_to_big import WindowedHashingEmbeddings
+
+
+class Killed(BaseException):
+    """Stands in for SIGKILL: not an Exception, so the batch retry does not catch it"""
+
+
+def documents(n):
+    return [Document(page_content=f"def function_{i}(value):\n    return value * {i}\n",
+                     metadata={"repo_name": "demo", "source_file": f"module_{i // 10}.py", "chunk_index": i % 10})
+            for i in range(n)]
+
+
+def instrumented_service(store, embedded, fail_on_call=None, kill_on_call=None):
+    service = VectorService(persist_directory=store, backend="memory", embeddings=WindowedHashingEmbeddings())
+    embed_documents = service.embeddings.embed_documents
+    calls = {"n": 0}
+
+    def instrumented(texts):
+        calls["n"] += 1
+        if calls["n"] == kill_on_call:
+            raise Killed()
+        if calls["n"] == fail_on_call:
+            raise RuntimeError("simulated embedding service timeout")
+        embedded.append(len(texts))
+        return embed_documents(texts)
+
+    service.embeddings.embed_documents = instrumented
+    return service
+
+
+def test_resume_skips_batches_committed_before_the_crash(tmp_path):
+    journal_path = str(tmp_path / "ingestion_journal.db")
+    docs = documents(550)
+
+    first_run = []
+    service = instrumented_service(str(tmp_path / "first"), first_run, kill_on_call=4)
+    journal = IngestionJournal(journal_path)
+    with pytest.raises(Killed):
+        service.add_document_objects(docs, batch_size=100, journal=journal, journal_repo="demo",
+                                     retry_backoff=0)
+    journal.close()
+    assert first_run == [100, 100, 100]
+
+    # A fresh store, so only the journal can tell which batches were committed
+    second_run = []
+    service = instrumented_service(str(tmp_path / "second"), second_run)
+    journal = IngestionJournal(journal_path)
+    added = service.add_document_objects(docs, batch_size=100, journal=journal, journal_repo="demo",
+                                         retry_backoff=0)
+    journal.close()
+    assert added["skipped_journal"] == 300
+    assert added["added"] == 250
+    assert sum(second_run) == 250
+
+
+def test_failed_batch_is_retried_and_journaled(tmp_path):
+    embedded = []
+    service = instrumented_service(str(tmp_path), embedded, fail_on_call=2)
+    journal = IngestionJournal(str(tmp_path / "ingestion_journal.db"))
+    added = service.add_document_objects(documents(250), batch_size=100, journal=journal, journal_repo="demo",
+                                         max_retries=2, retry_backoff=0)
+    assert added == {"added": 250, "skipped_existing": 0, "skipped_journal": 0, "failed_batches": 0}
+    assert embedded == [100, 100, 50]
+    assert journal.summary()["batches"]["done"] == 3
+    journal.close()
@@ -0,0 +1,21 @@
+import asyncio
+
+from rag_chatbot.services.llm_service import FakeChatModel, LLMGateway
+
+
+def test_identical_prompts_share_a_call_only_on_the_same_client():
+    gateway = LLMGateway(max_concurrency=4, max_queue=8, queue_timeout=5)
+    precise = FakeChatModel("model", temperature=0.2, latency=0.05)
+    creative = FakeChatModel("model", temperature=0.7, latency=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            gateway.ainvoke(precise, "same prompt", "model"),
+            gateway.ainvoke(precise, "same prompt", "model"),
+            gateway.ainvoke(creative, "same prompt", "model"),
+        )
+
+    first, second, third = asyncio.run(run())
+    assert (precise.calls, creative.calls) == (1, 1)
+    assert first.content == second.content != third.content
+    assert gateway.stats()["model"]["coalesced"] == 1
@@ -0,0 +1,45 @@
+import pytest
+
+from rag_chatbot.services.vector_backends import InMemoryBackend, NamespacedBackend
+
+
+class FlakyRenameBackend(InMemoryBackend):
+    """In-memory collection where the next rename to a chosen name fails"""
+
+    failing_name = None
+
+    def rename(self, new_name):
+        if new_name == FlakyRenameBackend.failing_name:
+            FlakyRenameBackend.failing_name = None
+            raise RuntimeError(f"cannot rename to {new_name}")
+        super().rename(new_name)
+
+
+def backend_with_live_namespace():
+    FlakyRenameBackend.failing_name = None
+    backend = NamespacedBackend("docs", FlakyRenameBackend, lambda metadata: metadata["repo"])
+    backend.add(["old"], [[1.0, 0.0]], ["old text"], [{"repo": "demo"}])
+    backend.begin_replace("demo")
+    backend.add(["new"], [[0.0, 1.0]], ["new text"], [{"repo": "demo"}])
+    return backend
+
+
+def test_commit_replace_swaps_staging_in():
+    backend = backend_with_live_namespace()
+    backend.commit_replace("demo")
+    assert backend.namespaces["demo"].name == "docs__demo"
+    assert [record["id"] for record in backend.get()] == ["new"]
+
+
+@pytest.mark.parametrize("failing_name", ["docs__demo", "docs__demo__retired"])
+def test_failed_rename_keeps_live_data_and_staging(failing_name):
+    backend = backend_with_live_namespace()
+    FlakyRenameBackend.failing_name = failing_name
+    with pytest.raises(RuntimeError):
+        backend.commit_replace("demo")
+
+    assert backend.namespaces["demo"].name == "docs__demo"
+    assert [record["id"] for record in backend.get()] == ["old"]
+
+    backend.commit_replace("demo")
+    assert [record["id"] for record in backend.get()] == ["new"]
@@ -0,0 +1,31 @@
+import os
+
+from rag_chatbot.services.symbol_index import SymbolIndex
+
+
+METADATA = {'symbol_names': ['align_reads', 'AlignTask'], 'symbol_kinds': ['function', 'class'], 'repo_name': 'demo'}
+
+
+def test_add_keeps_one_posting_per_chunk(tmp_path):
+    index = SymbolIndex(str(tmp_path))
+    index.add('chunk-1', '', METADATA)
+    index.add('chunk-1', '', METADATA)
+    index.add('chunk-2', '', METADATA)
+    assert [hit['id'] for hit in index.lookup('align_reads')] == ['chunk-1', 'chunk-2']
+
+    index.remove_ids(['chunk-1'])
+    index.add('chunk-1', '', METADATA)
+    assert [hit['id'] for hit in index.lookup('align_reads')] == ['chunk-2', 'chunk-1']
+
+
+def test_match_query_reloads_an_index_saved_elsewhere(tmp_path):
+    serving = SymbolIndex(str(tmp_path))
+    assert serving.match_query("What does `align_reads` do?") == []
+
+    ingesting = SymbolIndex(str(tmp_path))
+    ingesting.add('chunk-1', '', METADATA)
+    ingesting.save()
+    # Make the change visible even where mtimes are coarse
+    os.utime(ingesting.path, ns=(0, os.stat(ingesting.path).st_mtime_ns + 1_000_000_000))
+
+    assert [hit['id'] for hit in serving.match_query("What does `align_reads` do?")] == ['chunk-1']
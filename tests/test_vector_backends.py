@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from rag_chatbot.services.vector_backends import create_backend
+
+DIMENSION = 384
+
+
+def random_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("kind", ["memory", "chroma"])
+def test_backends_behave_identically(kind, tmp_path):
+    """Every backend must behave identically for add/upsert/query/get/delete/count"""
+    rng = np.random.default_rng(0)
+    backend = create_backend(kind, "conformance", persist_directory=str(tmp_path))
+    vectors = random_vectors(rng, 6)
+    ids = [f"doc_{i}" for i in range(6)]
+    metadatas = [
+        {"repo_name": "shesmu" if i % 2 else "vidarr", "chunk_index": i, "language": "java"}
+        for i in range(6)
+    ]
+    documents = [f"document {i}" for i in range(6)]
+
+    backend.add(ids, vectors.tolist(), documents, metadatas)
+    assert backend.count() == 6, "count after add"
+
+    hits = backend.query(vectors[3].tolist(), n_results=3)
+    assert hits[0]["id"] == "doc_3", "exact vector should rank first"
+    assert abs(hits[0]["distance"]) < 1e-4, "self distance should be ~0"
+    assert [h["distance"] for h in hits] == sorted(h["distance"] for h in hits), "results sorted by distance"
+
+    filtered = backend.query(vectors[3].tolist(), n_results=6, where={"repo_name": "vidarr"})
+    assert {h["id"] for h in filtered} == {"doc_0", "doc_2", "doc_4"}, "equality filter"
+
+    ranged = backend.get(where={"$and": [{"repo_name": "shesmu"}, {"chunk_index": {"$gte": 3}}]})
+    assert {r["id"] for r in ranged} == {"doc_3", "doc_5"}, "$and/$gte filter"
+
+    with_embeddings = backend.query(vectors[0].tolist(), n_results=1, include_embeddings=True)
+    assert np.allclose(with_embeddings[0]["embedding"], vectors[0], atol=1e-5), "embeddings round-trip"
+
+    assert backend.existing_ids(["doc_1", "missing"]) == {"doc_1"}, "existing_ids"
+
+    backend.upsert(["doc_1"], [vectors[5].tolist()], ["replaced"], [{"repo_name": "shesmu", "chunk_index": 1}])
+    assert backend.count() == 6, "upsert must not grow the collection"
+    assert backend.get(ids=["doc_1"])[0]["content"] == "replaced", "upsert replaces content"
+
+    backend.delete(where={"repo_name": "vidarr"})
+    assert backend.count() == 3, "delete by filter"
+    backend.delete(ids=["doc_5"])
+    assert backend.existing_ids(ids) == {"doc_1", "doc_3"}, "delete by id"
+
+    backend.drop()
+    assert backend.count() == 0, "drop empties the collection"
@@ -0,0 +1,87 @@
+from rag_chatbot.utils.wdl_parser import extract_wdl_blocks
+
+
+WELL_FORMED = """version 1.0
+
+struct Sample {
+  String name
+}
+
+task count {
+  input {
+    File bam
+  }
+  command <<<
+    awk '{print $1}' ~{bam} | wc -l   # }}}
+  >>>
+  output {
+    Int n = read_int(stdout())
+  }
+}
+
+workflow main {
+  call count
+}
+"""
+
+
+def blocks(content):
+    return [(block.kind, block.name) for block in extract_wdl_blocks(content)]
+
+
+def test_finds_top_level_blocks():
+    assert blocks(WELL_FORMED) == [("struct", "Sample"), ("task", "count"), ("workflow", "main")]
+
+
+def test_block_text_and_lines():
+    task = extract_wdl_blocks(WELL_FORMED)[1]
+    assert task.text(WELL_FORMED).startswith("task count {")
+    assert task.text(WELL_FORMED).endswith("}")
+    assert (task.start_line, task.end_line) == (7, 17)
+
+
+def test_quoted_brace_in_command_section():
+    content = """task strip {
+  command {
+    sed 's/{//' in.txt > out.txt
+  }
+}
+
+task after {
+  command { echo done }
+}
+"""
+    assert blocks(content) == [("task", "strip"), ("task", "after")]
+
+
+def test_unclosed_command_section_keeps_later_blocks():
+    content = """task broken {
+  command { echo {
+}
+
+task after {
+  command { echo done }
+}
+
+workflow main {
+  call after
+}
+"""
+    found = extract_wdl_blocks(content)
+    assert [(block.kind, block.name) for block in found] == [
+        ("task", "broken"), ("task", "after"), ("workflow", "main")
+    ]
+    assert found[0].text(content).endswith("}")
+
+
+def test_block_open_at_end_of_file_runs_to_the_end():
+    content = "task truncated {\n  command { echo hi }\n"
+    found = extract_wdl_blocks(content)
+    assert [(block.name, block.end) for block in found] == [("truncated", len(content))]
+
+
+def test_byte_offsets_match_utf8_encoding():
+    content = 'struct Café {\n  String né = "é"\n}\ntask t {\n  command <<< echo "ü" >>>\n}\n'
+    encoded = content.encode("utf-8")
+    for block in extract_wdl_blocks(content):
+        assert encoded[block.start_byte:block.end_byte].decode("utf-8") == block.text(content)